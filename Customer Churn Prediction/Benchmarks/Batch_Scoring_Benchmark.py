@@ -0,0 +1,67 @@
+import argparse
+import filecmp
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import psutil
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+
+from Batch_Scoring import ChurnScorer, score_file
+from Forest_Engine import compile_forest, save_forest
+from Synthetic_Telco import write_csv
+
+
+def _loaded_uss(model_path, forest_path, input_csv):
+    # Private memory of a fresh process once a scorer is loaded and has scored a chunk.
+    ChurnScorer(model_path, forest_path=forest_path).score(pd.read_csv(input_csv, nrows=10_000))
+    return psutil.Process().memory_full_info().uss
+
+
+def worker_uss(model_path, forest_path, input_csv, workers):
+    with ProcessPoolExecutor(workers) as pool:
+        return max(pool.map(_loaded_uss, [model_path] * workers, [forest_path] * workers, [input_csv] * workers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scoring throughput on a synthetic cleaned Telco file")
+    parser.add_argument('--model', required=True, help="artifact saved by RandomForest.py --engineer")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_csv = write_csv('cleaned', args.rows, os.path.join(tmp, "input.csv"))
+        forest_path = save_forest(compile_forest(ChurnScorer(args.model).model), os.path.join(tmp, "model.forest"))
+        outputs = []
+        for workers in dict.fromkeys(args.workers):
+            for name, forest in (('model', None), ('forest', forest_path)):
+                output_csv = os.path.join(tmp, f"scores_{name}_{workers}.csv")
+                stats = score_file(args.model, input_csv, output_csv, args.chunksize, workers, forest_path=forest)
+                print(f"{workers:>2} workers, {name:<6}: {stats['rows']:,} rows in {stats['seconds']:.1f} s, "
+                      f"{stats['rows_per_sec']:,.0f} rows/sec, peak RSS {stats['peak_rss_mb']:.0f} MB")
+                outputs.append(output_csv)
+
+        # Each worker unpickles a private copy of the model; the compiled forest's pages are shared.
+        workers = max(2, max(args.workers))
+        for name, forest in (('model', None), ('forest', forest_path)):
+            print(f"private memory per worker ({workers} workers), {name:<6}: "
+                  f"{worker_uss(args.model, forest, input_csv, workers) / 2**20:.0f} MB")
+
+        # Every worker count writes the same file, and it matches scoring the rows in one piece.
+        assert all(filecmp.cmp(outputs[0], o, shallow=False) for o in outputs[1:])
+        head = pd.read_csv(input_csv, nrows=5_000)
+        expected = ChurnScorer(args.model).score(head)['churn_probability'].to_numpy()
+        written = pd.read_csv(outputs[0], nrows=5_000)['churn_probability'].to_numpy()
+        assert np.allclose(expected, written)
+        print("outputs identical across worker counts and with the compiled forest")
+
+
+if __name__ == "__main__":
+    main()
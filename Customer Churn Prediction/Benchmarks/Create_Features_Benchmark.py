@@ -0,0 +1,92 @@
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Feature_Engineering import create_features, detect_scaled, find_bool_cols, match_labels, normalize_column_names
+from Synthetic_Telco import make_cleaned, make_raw
+
+
+# The row-wise / per-column versions create_features used before vectorization.
+def legacy_detect_scaled(df):
+    return {c: abs(df[c].mean()) < 1e-3 and abs(df[c].std() - 1.0) < 1e-2
+            for c in df.select_dtypes(include=['number', 'bool']).columns}
+
+
+def legacy_bool_cols(df):
+    return [c for c in df.columns if df[c].dropna().isin([True, False, 0, 1]).all()]
+
+
+def legacy_raw_flags(df):
+    return (df['InternetService'].apply(lambda x: False if str(x).lower() == 'no' else True),
+            df['InternetService'].apply(lambda x: True if str(x).lower() == 'fiber optic' else False),
+            df['Contract'].apply(lambda x: True if 'year' in str(x) else False))
+
+
+def vectorized_raw_flags(df):
+    return (match_labels(df['InternetService'], lambda x: x.lower() != 'no'),
+            match_labels(df['InternetService'], lambda x: x.lower() == 'fiber optic'),
+            match_labels(df['Contract'], lambda x: 'year' in x))
+
+
+def timed(fn, *args):
+    # Wall time from an untraced run; tracemalloc slows pandas down, so peak
+    # memory comes from a second, traced run.
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="create_features wall time and memory on synthetic Telco data")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    cleaned = normalize_column_names(make_cleaned(args.rows))
+    raw = make_raw(args.rows)
+    print(f"synthetic rows: {args.rows:,}")
+
+    for name, legacy, vectorized, frame in [
+        ("detect_scaled", legacy_detect_scaled, detect_scaled, cleaned),
+        ("bool column scan", legacy_bool_cols, find_bool_cols, cleaned),
+        ("raw label flags", legacy_raw_flags, vectorized_raw_flags, raw),
+    ]:
+        _, old_s, old_mb = timed(legacy, frame)
+        _, new_s, new_mb = timed(vectorized, frame)
+        print(f"{name:>18}: legacy {old_s:6.2f} s / {old_mb:7.1f} MB peak | "
+              f"vectorized {new_s:6.2f} s / {new_mb:7.1f} MB peak | {old_s / new_s:5.1f}x")
+
+    for name, frame in [("cleaned schema", cleaned), ("raw schema", raw)]:
+        out, elapsed, peak = timed(lambda f: create_features(f.copy()), frame)
+        int64_mb = sum(out[c].astype('Int64').memory_usage(deep=True, index=False)
+                       for c in out.columns if out[c].dtype == np.uint8 or str(out[c].dtype) == 'UInt8') / 2**20
+        compact_mb = sum(out[c].memory_usage(deep=True, index=False)
+                         for c in out.columns if out[c].dtype == np.uint8 or str(out[c].dtype) == 'UInt8') / 2**20
+        print(f"create_features {name}: {elapsed:.2f} s, {peak:.0f} MB peak, "
+              f"output {out.memory_usage(deep=True).sum() / 2**20:.0f} MB "
+              f"(0/1 columns {compact_mb:.0f} MB as uint8 vs {int64_mb:.0f} MB as Int64)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+
+from Dataset_IO import load_frame, save_frame
+from Feature_Engineering import create_features
+from Synthetic_Telco import make_cleaned
+
+CLEANED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Chern_Cleaned.csv")
+SELECTED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Churn_SelectedFeatures.csv")
+PROJECTED = ['tenure', 'MonthlyCharges', 'Churn_Yes']
+
+
+def disk_mb(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2**20
+    return os.path.getsize(path) / 2**20
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(name, df, tmp):
+    csv_path = os.path.join(tmp, f"{name}.csv")
+    npds_path = os.path.join(tmp, f"{name}.npds")
+    save_frame(df, csv_path)
+    save_frame(df, npds_path)
+
+    csv_load, from_csv = best_of(lambda: load_frame(csv_path))
+    npds_load, from_npds = best_of(lambda: load_frame(npds_path))
+    # Copy-on-write maps are lazy; touching every column makes the timing honest.
+    npds_touch, _ = best_of(lambda: load_frame(npds_path).sum(numeric_only=True))
+    cols = [c for c in PROJECTED if c in df.columns]
+    csv_cols, _ = best_of(lambda: load_frame(csv_path, cols))
+    npds_cols, _ = best_of(lambda: load_frame(npds_path, cols))
+
+    assert_frame_equal(df.reset_index(drop=True), from_npds)
+    lost = [c for c in df.columns if from_csv[c].dtype != df[c].dtype]
+    print(f"{name} ({len(df):,} rows x {df.shape[1]} cols)")
+    print(f"  disk       CSV {disk_mb(csv_path):8.1f} MB | npds {disk_mb(npds_path):8.1f} MB")
+    print(f"  full load  CSV {csv_load * 1000:8.1f} ms | npds {npds_load * 1000:8.1f} ms "
+          f"({npds_touch * 1000:.1f} ms incl. reading every numeric column)")
+    print(f"  {len(cols)} columns  CSV {csv_cols * 1000:8.1f} ms | npds {npds_cols * 1000:8.1f} ms")
+    print(f"  dtypes changed by the CSV round-trip: {len(lost)} {lost[:6]}{' ...' if len(lost) > 6 else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs .npds dataset load time, size and dtype fidelity")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="rows in the synthetic featured dataset")
+    args = parser.parse_args()
+
+    cleaned = pd.read_csv(CLEANED_CSV)
+    with contextlib.redirect_stdout(io.StringIO()):
+        featured = create_features(cleaned)
+        synthetic = create_features(make_cleaned(args.rows))
+    with tempfile.TemporaryDirectory() as tmp:
+        compare("cleaned", cleaned, tmp)
+        compare("featured", featured, tmp)
+        compare("selected", pd.read_csv(SELECTED_CSV), tmp)
+        compare("featured_synthetic", synthetic, tmp)
+
+
+if __name__ == "__main__":
+    main()
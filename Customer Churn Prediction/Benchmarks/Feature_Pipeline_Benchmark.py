@@ -0,0 +1,74 @@
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+
+from Feature_Engineering import FeaturePipeline, create_features
+
+CLEANED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Chern_Cleaned.csv")
+
+
+def latency_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(int(len(samples) * 0.99) - 1, 0)]
+
+
+def check_dtypes(df, pipeline, batches):
+    # Every batch gets the 0/1 dtypes chosen at fit, whatever its own missing values.
+    expected = pipeline.transform(df).dtypes
+    for batch in batches.values():
+        assert pipeline.transform(batch).dtypes.equals(expected)
+    gappy = df.assign(PaperlessBilling_Yes=df['PaperlessBilling_Yes'].astype(object))
+    gappy.loc[0, 'PaperlessBilling_Yes'] = None
+    try:
+        pipeline.transform(gappy)
+        raise AssertionError("missing values in a column fitted as uint8 were accepted")
+    except ValueError:
+        pass
+    with contextlib.redirect_stdout(io.StringIO()):
+        nullable = FeaturePipeline().fit(gappy)
+    assert nullable.transform(df.iloc[[1]])['PaperlessBilling_Yes'].dtype == 'UInt8'
+    assert nullable.transform(gappy)['PaperlessBilling_Yes'].isna().sum() == 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="create_features vs fitted FeaturePipeline.transform latency")
+    parser.add_argument('--input', default=CLEANED_CSV)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = FeaturePipeline().fit(df)
+    batches = {
+        "1 row": df.iloc[[0]],
+        "10k rows": df.sample(10_000, replace=True, random_state=0).reset_index(drop=True),
+    }
+
+    check_dtypes(df, pipeline, batches)
+    print("transform output dtypes match the fit for every batch")
+
+    for name, batch in batches.items():
+        repeat = args.repeat if len(batch) == 1 else max(args.repeat // 10, 5)
+        with contextlib.redirect_stdout(io.StringIO()):
+            base = latency_ms(lambda: create_features(batch.copy()), repeat)
+        fitted = latency_ms(lambda: pipeline.transform(batch), repeat)
+        print(f"{name:>9}: create_features p50 {base[0]:.2f} ms (p99 {base[1]:.2f}) | "
+              f"transform p50 {fitted[0]:.2f} ms (p99 {fitted[1]:.2f}) | {base[0] / fitted[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
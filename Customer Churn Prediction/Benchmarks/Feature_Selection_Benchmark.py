@@ -0,0 +1,121 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import mutual_info_classif
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+
+from Feature_Selection import (CORRELATION_THRESHOLD, TARGET, high_correlation_pairs, mutual_information,
+                               permutation_importances, select_features)
+
+CLEANED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Chern_Cleaned.csv")
+SELECTED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Churn_SelectedFeatures.csv")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def notebook_pairs(features, threshold):
+    # Telco_Data_Feature_Engineering.ipynb, as written.
+    corr_matrix = features.corr()
+    corr_pairs = corr_matrix.abs().unstack().sort_values(ascending=False)
+    return [(a, b) for a, b in corr_pairs.index if a != b and corr_matrix.loc[a, b] > threshold]
+
+
+def wide_frame(n_rows, n_cols, seed=0):
+    # Groups of 10 noisy copies of a shared factor, so some pairs clear the threshold.
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(n_rows, n_cols // 10 + 1))
+    noise = rng.normal(size=(n_rows, n_cols)) * rng.uniform(0.1, 2.0, n_cols)
+    X = factors[:, np.arange(n_cols) // 10] + noise
+    df = pd.DataFrame(X, columns=[f"f{i:05d}" for i in range(n_cols)])
+    df[TARGET] = (X[:, :5].sum(axis=1) + rng.normal(size=n_rows) > 0).astype(np.uint8)
+    return df
+
+
+def check_missing_values(features, block_size=40):
+    # With gaps, every coefficient matches pandas' pairwise-complete corr(),
+    # on tiles that mix complete and gappy columns too.
+    rng = np.random.default_rng(1)
+    gappy = features.astype(float)
+    for c in gappy.columns[::3]:
+        gappy.loc[rng.random(len(gappy)) < 0.2, c] = np.nan
+    # Gaps that follow another column shift the coefficient mean-filling would give.
+    gappy.loc[gappy['tenure'] > gappy['tenure'].median(), 'MonthlyCharges'] = np.nan
+    expected = gappy.corr()
+    pairs = high_correlation_pairs(gappy, threshold=-2, block_size=block_size)
+    for a, b, value in pairs.itertuples(index=False):
+        assert np.isclose(value, expected.loc[a, b], rtol=0, atol=1e-10), (a, b, value, expected.loc[a, b])
+    defined = expected.notna().to_numpy()
+    assert len(pairs) == (defined.sum() - np.trace(defined)) // 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature selection: notebook passes vs blocked/parallel engine")
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--cols', type=int, default=2_000)
+    parser.add_argument('--notebook-cols', type=int, default=250,
+                        help="columns the notebook's pair loop is timed on")
+    args = parser.parse_args()
+
+    df = pd.read_csv(CLEANED_CSV)
+    features = df.drop(columns=[TARGET])
+
+    t_old, old = timed(lambda: notebook_pairs(features, CORRELATION_THRESHOLD))
+    t_new, new = timed(lambda: high_correlation_pairs(features))
+    assert {frozenset(p) for p in old} == {frozenset(p) for p in zip(new.feature_a, new.feature_b)}
+    print(f"Telco correlated pairs: notebook {t_old * 1000:.1f} ms, blocked {t_new * 1000:.1f} ms, "
+          f"same {len(new)} pairs")
+
+    t_old, mi_knn = timed(lambda: pd.Series(mutual_info_classif(features, df[TARGET], random_state=0),
+                                            index=features.columns))
+    t_new, mi_hist = timed(lambda: mutual_information(df))
+    rho = spearmanr(mi_knn, mi_hist.reindex(mi_knn.index)).statistic
+    print(f"Telco mutual information: kNN {t_old * 1000:.0f} ms, histogram {t_new * 1000:.0f} ms, "
+          f"rank correlation {rho:.3f}")
+
+    t_sel, (selected, _) = timed(lambda: select_features(df))
+    assert list(selected.columns) == list(pd.read_csv(SELECTED_CSV, nrows=0).columns)
+    print(f"Telco selection: {t_sel:.2f} s, same {selected.shape[1] - 1} features as the committed SelectedFeatures CSV")
+
+    check_missing_values(features)
+    print("Telco with 20% gaps: every coefficient matches pandas' pairwise-complete corr()")
+
+    t_perm, perm = timed(lambda: permutation_importances(df))
+    print(f"Telco permutation importance: {t_perm:.2f} s, top 3 {list(perm.index[:3])}")
+    model = RandomForestClassifier(n_estimators=50, random_state=0, n_jobs=-1).fit(features, df[TARGET])
+    permutation_importances(df, n_repeats=1, model=model)
+    assert model.n_jobs == -1
+
+    wide = wide_frame(args.rows, args.cols)
+    wide_features = wide.drop(columns=[TARGET])
+    print(f"\nwide synthetic: {args.rows:,} rows x {args.cols:,} columns")
+    t_new, new = timed(lambda: high_correlation_pairs(wide_features, threshold=0.7))
+    print(f"  correlated pairs: blocked {t_new:.2f} s ({len(new)} pairs)")
+    # The notebook does a .loc lookup per pair (about 18 minutes at 2,000 columns),
+    # so by default it is timed on a narrower slice.
+    subset = wide_features.iloc[:, :args.notebook_cols]
+    t_old, old = timed(lambda: notebook_pairs(subset, 0.7))
+    t_new, new = timed(lambda: high_correlation_pairs(subset, threshold=0.7))
+    assert {frozenset(p) for p in old} == {frozenset(p) for p in zip(new.feature_a, new.feature_b)}
+    print(f"  first {subset.shape[1]} columns: notebook {t_old:.2f} s, blocked {t_new:.3f} s, same {len(new)} pairs")
+
+    sample_cols = wide_features.columns[:10]
+    t_knn, _ = timed(lambda: mutual_info_classif(wide_features[sample_cols], wide[TARGET], random_state=0))
+    t_hist, _ = timed(lambda: mutual_information(wide))
+    print(f"  mutual information: kNN ~{t_knn * args.cols / len(sample_cols):.1f} s (timed on 10 columns), "
+          f"histogram {t_hist:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.ensemble import RandomForestClassifier
+
+from Forest_Engine import REDUCED_TOLERANCE, compile_forest, load_forest, save_forest
+from RandomForest import RANDOM_STATE, feature_matrix, load_model, load_training_data
+from Synthetic_Telco import make_cleaned
+
+SELECTED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Churn_SelectedFeatures.csv")
+BATCH_SIZES = (1, 100, 100_000)
+
+
+def model_and_rows(args):
+    # A saved artifact scores synthetic cleaned rows through its own pipeline;
+    # otherwise a forest is fitted on the SelectedFeatures CSV and scores
+    # bootstrapped copies of its rows.
+    if args.model:
+        artifact = load_model(args.model)
+        frame = make_cleaned(args.rows)
+        target = artifact.get('target')
+        frame = frame.drop(columns=[c for c in [target, 'customerID'] if c in frame.columns])
+        if artifact.get('pipeline') is not None:
+            frame = artifact['pipeline'].transform(frame)
+        X = feature_matrix(frame, target, artifact['features']).to_numpy(dtype=np.float32)
+        return artifact['model'], X
+    X, y = load_training_data(SELECTED_CSV)
+    model = RandomForestClassifier(n_estimators=args.trees, max_depth=args.max_depth,
+                                   min_samples_leaf=args.min_samples_leaf, n_jobs=1,
+                                   random_state=RANDOM_STATE).fit(X.to_numpy(dtype=np.float32), y)
+    rng = np.random.default_rng(0)
+    return model, X.to_numpy(dtype=np.float32)[rng.integers(0, len(X), args.rows)]
+
+
+def per_tree_loop(model):
+    # OnlineScorer's path so far: each tree's predict_proba without the forest's dispatch.
+    def predict_proba(X):
+        total = 0
+        for tree in model.estimators_:
+            total = total + tree.predict_proba(X, check_input=False)
+        return total / len(model.estimators_)
+    return predict_proba
+
+
+def latency(fn, X, batch, budget):
+    # Median seconds per call over as many calls as fit in `budget` seconds.
+    samples, spent, start = [], 0.0, 0
+    while spent < budget or len(samples) < 3:
+        rows = X[start:start + batch]
+        start = (start + batch) % max(len(X) - batch, 1)
+        t = time.perf_counter()
+        fn(rows)
+        samples.append(time.perf_counter() - t)
+        spent += samples[-1]
+    return float(np.median(samples))
+
+
+def check(model, X, forest, reduced, loaded):
+    expected = model.predict_proba(X)
+    assert np.array_equal(forest.predict_proba(X), expected)
+    assert np.array_equal(loaded.predict_proba(X), expected)
+    assert np.array_equal(forest.predict(X), model.predict(X))
+    reduced_error = np.abs(reduced.predict_proba(X) - expected).max()
+    assert reduced_error <= REDUCED_TOLERANCE
+
+    # Missing values follow each split's missing_go_to_left, as in sklearn.
+    gappy = X[:5_000].copy()
+    gappy[np.random.default_rng(1).random(gappy.shape) < 0.1] = np.nan
+    assert np.array_equal(forest.predict_proba(gappy), model.predict_proba(gappy))
+    return reduced_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled forest vs sklearn predict_proba at batch sizes 1, 100 "
+                                                 "and 100k")
+    parser.add_argument('--model', default=None, help="artifact saved by RandomForest.py (default: fit one here)")
+    parser.add_argument('--trees', type=int, default=300)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--min-samples-leaf', type=int, default=1)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--budget', type=float, default=2.0, help="seconds of timed calls per small-batch case")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        model, X = model_and_rows(args)
+        model.n_jobs = 1
+
+        with tempfile.TemporaryDirectory() as tmp:
+            forest = compile_forest(model)
+            reduced = compile_forest(model, 'float32')
+            loaded = load_forest(save_forest(forest, os.path.join(tmp, "model.forest")))
+            reduced_error = check(model, X, forest, reduced, loaded)
+            print(f"forest: {forest.n_trees} trees, {forest.meta['n_nodes']:,} nodes, max depth "
+                  f"{forest.meta['max_depth']}, {forest.nbytes / 2**20:.1f} MB compiled")
+            print(f"float64 probabilities identical to sklearn on {len(X):,} rows (and with NaNs); "
+                  f"float32 within {reduced_error:.1e} (tolerance {REDUCED_TOLERANCE:.1e})")
+
+            engines = [('sklearn predict_proba', model.predict_proba),
+                       ('sklearn per-tree loop', per_tree_loop(model)),
+                       ('compiled float64 (mmap)', loaded.predict_proba),
+                       ('compiled float32', reduced.predict_proba)]
+            print(f"\n{'engine':<26} {'batch':>7} {'latency ms':>11} {'rows/sec':>12}")
+            for batch in BATCH_SIZES:
+                batch = min(batch, len(X))
+                for name, fn in engines:
+                    seconds = latency(fn, X, batch, args.budget if batch < len(X) else 0)
+                    print(f"{name:<26} {batch:>7,} {seconds * 1e3:>11.3f} {batch / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+from prometheus_client.parser import text_string_to_metric_families
+from sklearn.ensemble import RandomForestClassifier
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Churn_Metrics
+from Batch_Scoring import score_file
+from Feature_Engineering import FeaturePipeline, create_features
+from Online_Scoring import OnlineScorer, make_server
+from RandomForest import RANDOM_STATE, TARGET, load_training_data, save_model
+from Synthetic_Telco import CLEANED_CSV
+
+SECTIONS = ('churn_label', 'scale_check', 'binning', 'service_detection', 'flags', 'bool_casting')
+
+
+def fit_model(tmp, trees):
+    pipeline = FeaturePipeline()
+    X, y = quiet(load_training_data, CLEANED_CSV, TARGET, pipeline)
+    model = RandomForestClassifier(n_estimators=trees, min_samples_leaf=5, n_jobs=1,
+                                   random_state=RANDOM_STATE).fit(X, y)
+    path = os.path.join(tmp, "model.joblib")
+    save_model(path, model, X.columns, pipeline, target=TARGET)
+    return path
+
+
+def scrape(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.status == 200
+        assert response.headers['Content-Type'] == Churn_Metrics.CONTENT_TYPE
+        text = response.read().decode('utf-8')
+    samples = {}
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            samples[(sample.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return samples
+
+
+def value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def check_scrape(tmp, model_path, cleaned, records):
+    # A known workload through every instrumented path, then both endpoints scraped.
+    metrics = Churn_Metrics.enable(port=0)
+    for _ in range(2):
+        quiet(create_features, cleaned)
+    for workers in (1, 2):
+        score_file(model_path, CLEANED_CSV, os.path.join(tmp, f"scores_{workers}.csv"), 2_000, workers)
+    scorer = OnlineScorer(model_path)
+    for record in records[:50]:
+        scorer.score_record(record)
+
+    server = make_server(scorer, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    try:
+        served = scrape(f"http://{host}:{port}/metrics")
+    finally:
+        server.shutdown()
+        server.server_close()
+    samples = scrape(f"http://127.0.0.1:{metrics.server.server_address[1]}/metrics")
+    assert served == samples
+
+    assert value(samples, 'churn_create_features_rows_total') == 2 * len(cleaned)
+    assert value(samples, 'churn_create_features_seconds_count') == 2
+    for section in SECTIONS:
+        assert value(samples, 'churn_create_features_section_seconds_count', section=section) == 2, section
+    total = sum(value(samples, 'churn_create_features_section_seconds_sum', section=s) for s in SECTIONS)
+    assert abs(total - value(samples, 'churn_create_features_seconds_sum')) < 1e-3
+    # Pool workers' chunks are counted in the parent as they are written.
+    assert value(samples, 'churn_scored_rows_total', path='batch') == 2 * len(cleaned)
+    assert value(samples, 'churn_scoring_seconds_count', path='batch') == 2 * -(-len(cleaned) // 2_000)
+    assert value(samples, 'churn_scored_rows_total', path='online') == 50
+    assert value(samples, 'churn_scoring_seconds_bucket', path='online', le='+Inf') == 50
+
+    metrics_port = metrics.server.server_address[1]
+    Churn_Metrics.disable()
+    quiet(create_features, cleaned)
+    assert metrics.collect()[2].samples[0].value == 2 * len(cleaned)
+    try:
+        scrape(f"http://127.0.0.1:{metrics_port}/metrics")
+        raise AssertionError("metrics endpoint still serving after disable()")
+    except (urllib.error.URLError, ConnectionError):
+        pass
+    return len(samples)
+
+
+def interleaved(fn, items, rounds):
+    # Median seconds per item with metrics disabled and enabled. Each item
+    # runs in both modes back to back, in alternating order, so drift in
+    # machine speed hits both alike.
+    metrics = Churn_Metrics.ChurnMetrics()
+    samples = {None: [], metrics: []}
+    for round_ in range(rounds):
+        for i, item in enumerate(items):
+            for mode in ((None, metrics) if (round_ + i) % 2 == 0 else (metrics, None)):
+                Churn_Metrics._install(mode)
+                start = time.perf_counter()
+                fn(item)
+                samples[mode].append(time.perf_counter() - start)
+    Churn_Metrics._install(None)
+    return statistics.median(samples[None]), statistics.median(samples[metrics])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Churn metrics: scrape /metrics after a known workload, and the "
+                                                 "cost of instrumentation on create_features and online scoring")
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--max-overhead', type=float, default=0.05, help="allowed enabled overhead")
+    args = parser.parse_args()
+
+    cleaned = pd.read_csv(CLEANED_CSV)
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = fit_model(tmp, args.trees)
+        records = cleaned.drop(columns=[TARGET]).to_dict('records')
+        n_samples = check_scrape(tmp, model_path, cleaned, records)
+        print(f"/metrics scraped ({n_samples} samples) from its own port and the scoring server: section, row "
+              f"and scoring counts match the workload, pool workers included; disable() stops recording")
+
+        scorer = OnlineScorer(model_path)
+        cases = [('create_features (7k rows)', lambda _: quiet(create_features, cleaned), range(10)),
+                 ('score_record', scorer.score_record, records[:500])]
+        print(f"\n{'path':<28} {'disabled ms':>12} {'enabled ms':>11} {'overhead':>9}")
+        over = []
+        for name, fn, items in cases:
+            disabled, enabled = interleaved(fn, items, args.rounds)
+            ratio = enabled / disabled - 1
+            print(f"{name:<28} {disabled * 1e3:>12.3f} {enabled * 1e3:>11.3f} {ratio:>9.1%}")
+            over.append((name, ratio))
+        assert all(ratio < args.max_overhead for _, ratio in over), over
+
+
+if __name__ == "__main__":
+    main()
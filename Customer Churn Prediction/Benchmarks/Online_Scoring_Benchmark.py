@@ -0,0 +1,121 @@
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+
+from Online_Scoring import OnlineScorer, make_server
+from RandomForest import RANDOM_STATE, TARGET, feature_matrix, load_training_data, save_model
+
+CLEANED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Chern_Cleaned.csv")
+SELECTED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Churn_SelectedFeatures.csv")
+
+
+def percentiles_ms(samples):
+    samples = np.sort(np.asarray(samples) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def timed(fn, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return percentiles_ms(samples)
+
+
+def check_without_pipeline(rows):
+    # A model trained without --engineer keeps raw dummy names such as
+    # 'Contract_One year'; online scores must match batch scoring on them.
+    X, y = load_training_data(SELECTED_CSV, TARGET)
+    model = RandomForestClassifier(n_estimators=50, min_samples_leaf=5, n_jobs=1,
+                                   random_state=RANDOM_STATE).fit(X, y)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.joblib")
+        save_model(path, model, X.columns, target=TARGET)
+        scorer = OnlineScorer(path)
+        df = pd.read_csv(SELECTED_CSV, nrows=rows)
+        expected = scorer._scorer.score(df)['churn_probability'].to_numpy()
+        online = [scorer.score_record(r) for r in df.drop(columns=[TARGET]).to_dict('records')]
+    assert np.array_equal(expected, online)
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online churn scoring latency against a local client")
+    parser.add_argument('--model', required=True, help="artifact saved by RandomForest.py --engineer")
+    parser.add_argument('--input', default=CLEANED_CSV)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    scorer = OnlineScorer(args.model)
+    batch = scorer._scorer
+    df = pd.read_csv(args.input)
+    df = df.drop(columns=[c for c in [batch.target] if c in df.columns])
+    records = df.to_dict('records')
+
+    # The single-record path must reproduce the DataFrame path exactly.
+    expected = feature_matrix(batch.pipeline.transform(df), batch.target, batch.features)
+    vectors = np.array([scorer.features.vector(r) for r in records])
+    assert np.array_equal(expected.to_numpy(dtype=float), vectors)
+    assert np.array_equal(batch.model.predict_proba(expected.iloc[:500])[:, 1],
+                          [scorer.score_record(r) for r in records[:500]])
+    print(f"single-record features match the pipeline on all {len(records)} rows")
+    n = min(args.requests, len(records))
+    print(f"model trained without the pipeline: online scores match batch scoring on {check_without_pipeline(n)} rows")
+
+    requests = [dict(r, customerID=f"C{i:07d}") for i, r in enumerate(records[:n])]
+
+    def one_row_dataframe(record):
+        frame = batch.pipeline.transform(pd.DataFrame([record]).drop(columns=['customerID']))
+        batch.model.predict_proba(feature_matrix(frame, batch.target, batch.features))
+
+    server = make_server(scorer, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection(*server.server_address)
+
+    def post(record):
+        connection.request('POST', '/score', body=json.dumps(record), headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return json.loads(response.read())
+
+    def get(record):
+        connection.request('GET', f"/score/{record['customerID']}")
+        return json.loads(connection.getresponse().read())
+
+    try:
+        rows = [
+            ("one-row DataFrame + predict_proba", timed(one_row_dataframe, requests[:min(n, 300)])),
+            ("in-process score_record", timed(scorer.score_record, requests)),
+            ("HTTP POST, cache miss", timed(post, requests)),
+            ("HTTP POST, cache hit", timed(post, requests)),
+            ("HTTP GET by customerID", timed(get, requests)),
+        ]
+        assert all(post(r)['cached'] for r in requests[:10])
+        # A missing value arrives as a fresh NaN object each time and must still hit.
+        gap = dict(requests[0], customerID="C-missing", TotalCharges=float('nan'))
+        assert not scorer.score(gap)[1] and scorer.score(dict(gap, TotalCharges=float('nan')))[1]
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
+
+    for name, (p50, p99) in rows:
+        print(f"{name:>34}: p50 {p50:7.3f} ms | p99 {p99:7.3f} ms")
+    print(f"cache: {len(scorer.cache)} entries, {scorer.cache.hits} hits, {scorer.cache.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
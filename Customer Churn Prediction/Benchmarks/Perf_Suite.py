@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Feature_Engineering
+from Feature_Engineering import create_features, detect_scaled, normalize_column_names
+from Synthetic_Telco import make_cleaned, make_raw
+
+BASELINE_FILE = os.path.join(PROJECT_DIR, "Benchmarks", "baselines", "create_features.json")
+METRICS = ('seconds', 'peak_mb')
+# Wall-time differences smaller than this are timer and scheduler noise.
+NOISE_FLOOR_SECONDS = 0.01
+
+
+def environment():
+    return {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'machine': platform.machine(), 'system': platform.system(), 'cpus': os.cpu_count()}
+
+
+def collect_sections(totals):
+    def hook(section, seconds):
+        totals[section] = totals.get(section, 0.0) + seconds
+    return hook
+
+
+def measure(fn, make_args, repeat):
+    # Best wall time of `repeat` untraced runs, with create_features' section
+    # times from that run; peak memory from one extra run under tracemalloc,
+    # which slows pandas down too much to time with.
+    best, best_sections = None, {}
+    for _ in range(repeat):
+        args = make_args()
+        sections = {}
+        Feature_Engineering.section_hook = collect_sections(sections)
+        gc.collect()
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn(*args)
+            elapsed = time.perf_counter() - start
+        finally:
+            Feature_Engineering.section_hook = None
+        if best is None or elapsed < best:
+            best, best_sections = elapsed, sections
+
+    args = make_args()
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {'seconds': best, 'peak_mb': peak / 2**20}
+    if best_sections:
+        result['sections'] = best_sections
+    return result
+
+
+def run_suite(n_rows, repeat):
+    cleaned = make_cleaned(n_rows)
+    raw = make_raw(n_rows)
+    normalized = normalize_column_names(cleaned)
+    cases = {
+        'detect_scaled': (detect_scaled, lambda: (normalized,)),
+        'create_features_cleaned': (create_features, lambda: (cleaned.copy(),)),
+        'create_features_raw': (create_features, lambda: (raw.copy(),)),
+    }
+    return {name: measure(fn, make_args, repeat) for name, (fn, make_args) in cases.items()}
+
+
+def compare(baseline, results, tolerance):
+    # A metric regresses when it is more than `tolerance` above the baseline.
+    regressions = []
+    for case, current in results['cases'].items():
+        base = baseline['cases'].get(case)
+        if base is None:
+            continue
+        for metric in METRICS:
+            if metric not in base or metric not in current or current[metric] <= base[metric] * (1 + tolerance):
+                continue
+            if metric != 'seconds' or current[metric] - base[metric] > NOISE_FLOOR_SECONDS:
+                regressions.append((case, metric, base[metric], current[metric]))
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"{'case':<26} {'seconds':>9} {'peak_MB':>9} {'vs base':>8}")
+    for case, r in results['cases'].items():
+        base = (baseline or {}).get('cases', {}).get(case)
+        change = f"{r['seconds'] / base['seconds']:.2f}x" if base else '-'
+        print(f"{case:<26} {r['seconds']:>9.3f} {r['peak_mb']:>9.1f} {change:>8}")
+        for section, seconds in sorted(r.get('sections', {}).items(), key=lambda kv: -kv[1]):
+            print(f"  {section:<24} {seconds:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and memory-profile create_features on synthetic Telco data, "
+                                                 "flagging regressions against a JSON baseline")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed slowdown or memory growth, as a fraction")
+    parser.add_argument('--update-baseline', action='store_true', help="write this run as the new baseline")
+    parser.add_argument('--output', default=None, help="also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    results = {'suite': 'create_features', 'rows': args.rows, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'environment': environment(), 'cases': run_suite(args.rows, args.repeat)}
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        if baseline['rows'] != args.rows:
+            print(f"baseline was taken at {baseline['rows']:,} rows, not {args.rows:,}; not comparing")
+            baseline = None
+    print_results(results, baseline)
+
+    for path in [args.output, args.baseline if args.update_baseline else None]:
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+            with open(path, 'w') as file:
+                json.dump(results, file, indent=4)
+            print("Saved results to:", path)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.tolerance)
+        for case, metric, before, after in regressions:
+            print(f"REGRESSION {case} {metric}: {before:.3f} -> {after:.3f} ({after / before:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
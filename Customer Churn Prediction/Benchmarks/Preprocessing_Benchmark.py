@@ -0,0 +1,146 @@
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "SRC"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Dataset_IO import iter_chunks
+from Feature_Engineering import create_features
+from Preprocessing import NUM_COLUMNS, SCALED_SUFFIX, StreamingPreprocessor, clean_dataset, load_or_fit, stream_clean
+from Synthetic_Telco import RAW_CSV, write_csv
+
+
+def streamed(preprocessor, path, chunksize):
+    return pd.concat([preprocessor.transform(chunk) for chunk in iter_chunks(path, chunksize)])
+
+
+def check_against_notebook(expected, result):
+    # Same rows and dummies; raw columns as read, scaled copies as the notebook scales them.
+    assert result.index.equals(expected.index)
+    assert list(expected.columns) == [c for c in result.columns if not c.endswith(SCALED_SUFFIX)]
+    others = [c for c in expected.columns if c not in NUM_COLUMNS]
+    assert result[others].equals(expected[others])
+    for c in NUM_COLUMNS:
+        assert np.allclose(result[c + SCALED_SUFFIX], expected[c], rtol=0, atol=1e-12), c
+
+
+def check_telco(tmp):
+    raw = pd.read_csv(RAW_CSV)
+    whole = StreamingPreprocessor().fit([raw])
+    chunked = StreamingPreprocessor().fit(iter_chunks(RAW_CSV, 500))
+    result = streamed(chunked, RAW_CSV, 1000)
+    check_against_notebook(clean_dataset(raw), result)
+    totals = pd.to_numeric(raw['TotalCharges'], errors='coerce')
+    assert chunked.plan_['fill'] == totals.median() == whole._plan()['fill']
+    assert np.array_equal(chunked.plan_['low'], whole.plan_['low'])
+    assert np.allclose(chunked.plan_['mean'], whole.plan_['mean'], rtol=1e-14)
+    assert np.array_equal(result[NUM_COLUMNS[:2]].to_numpy(), raw[NUM_COLUMNS[:2]].to_numpy())
+
+    # A tighter IQR factor drops rows; the fences on raw values drop the same ones.
+    tight = StreamingPreprocessor(0.3).fit(iter_chunks(RAW_CSV, 700))
+    expected = clean_dataset(raw, 0.3)
+    assert len(expected) < len(raw)
+    check_against_notebook(expected, streamed(tight, RAW_CSV, 1000))
+
+    # create_features sees raw numbers, so it no longer warns about scaled input.
+    for frame, warns in ((clean_dataset(raw), True), (result, False)):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            create_features(frame)
+        assert ("WARNING: Numeric columns seem scaled" in out.getvalue()) == warns
+
+    # The saved state transforms exactly as the fitted one; unseen categories get zero dummies.
+    state = os.path.join(tmp, "telco_preprocessor.joblib")
+    chunked.save(state)
+    loaded = StreamingPreprocessor.load(state)
+    assert streamed(loaded, RAW_CSV, 1000).equals(result)
+    odd = raw.head(3).assign(Contract='Four year')
+    contract = [c for c in result.columns if c.startswith('Contract_')]
+    assert not loaded.transform(odd)[contract].to_numpy().any()
+
+    # load_or_fit reuses a state only for the same input bytes and iqr_factor.
+    reused_state = os.path.join(tmp, "reused.joblib")
+    assert load_or_fit(RAW_CSV, reused_state, 1000)[1]
+    assert not load_or_fit(RAW_CSV, reused_state, 1000)[1]
+    tight_state, refitted = load_or_fit(RAW_CSV, reused_state, 1000, iqr_factor=0.3)
+    assert refitted and tight_state.iqr_factor == 0.3
+    other_export = os.path.join(tmp, "other_export.csv")
+    raw.head(2000).to_csv(other_export, index=False)
+    other, refitted = load_or_fit(other_export, reused_state, 1000, iqr_factor=0.3)
+    assert refitted and other.rows_seen_ == 2000
+    chunked.save(reused_state)
+    assert load_or_fit(RAW_CSV, reused_state, 1000)[1]
+
+
+def measured(fn, *args):
+    # Timed on its own, then run again under tracemalloc for the peak.
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def notebook_clean(input_csv, output_csv):
+    cleaned = clean_dataset(pd.read_csv(input_csv))
+    cleaned.to_csv(output_csv, index=False)
+    return len(cleaned)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing: notebook clean_dataset vs a StreamingPreprocessor "
+                                                 "fitted over chunks, and reusing its saved state")
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_telco(tmp)
+        print("Telco: same rows, dummies and raw values as clean_dataset, scaled copies within 1e-12; "
+              "fit is chunk-order independent; create_features no longer warns; saved state reproduces and is only "
+              "reused for the input and iqr_factor it was fitted with")
+
+        synthetic = write_csv('raw', args.rows, os.path.join(tmp, 'raw.csv'))
+        state = os.path.join(tmp, 'preprocessor.joblib')
+        print(f"\nsynthetic raw rows: {args.rows:,} ({os.path.getsize(synthetic) / 2**20:.0f} MB CSV)")
+        kept, old_s, old_mb = measured(notebook_clean, synthetic, os.path.join(tmp, 'notebook.csv'))
+        (preprocessor, fitted), fit_s, fit_mb = measured(load_or_fit, synthetic, state, args.chunksize, 1.5, True)
+        stats, clean_s, clean_mb = measured(stream_clean, synthetic, os.path.join(tmp, 'streamed.csv'),
+                                            preprocessor, args.chunksize)
+        start = time.perf_counter()
+        reused, refitted = load_or_fit(synthetic, state, args.chunksize)
+        load_s = time.perf_counter() - start
+        assert fitted and not refitted and stats['kept'] == kept
+        assert np.array_equal(reused.plan_['high'], preprocessor.plan_['high'])
+        print(f"  notebook        : {old_s:6.2f} s, {old_mb:7.1f} MB peak")
+        print(f"  streaming fit   : {fit_s:6.2f} s, {fit_mb:7.1f} MB peak")
+        print(f"  streaming clean : {clean_s:6.2f} s, {clean_mb:7.1f} MB peak")
+        print(f"  reused state    : {load_s * 1e3:6.1f} ms to hash the input and load instead of refitting")
+
+        # Same cleaned rows as the notebook, read back a chunk at a time.
+        for old, new in zip(iter_chunks(os.path.join(tmp, 'notebook.csv'), args.chunksize),
+                            iter_chunks(os.path.join(tmp, 'streamed.csv'), args.chunksize)):
+            assert np.allclose(new[[c + SCALED_SUFFIX for c in NUM_COLUMNS]].to_numpy(), old[NUM_COLUMNS].to_numpy(),
+                               rtol=0, atol=1e-9)
+        print("  streamed output matches the notebook's scaled values row for row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLEANED_CSV = os.path.join(PROJECT_DIR, "Data", "Telco_Customer_Chern_Cleaned.csv")
+RAW_CSV = os.path.join(PROJECT_DIR, "Data", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+
+def _resample(source, n_rows, seed):
+    # Bootstrap real Telco rows so category mixes and correlations stay realistic.
+    rng = np.random.default_rng(seed)
+    return source.iloc[rng.integers(0, len(source), n_rows)].reset_index(drop=True), rng
+
+
+def make_cleaned(n_rows, seed=0):
+    df, rng = _resample(pd.read_csv(CLEANED_CSV), n_rows, seed)
+    for c in ['tenure', 'MonthlyCharges', 'TotalCharges']:
+        df[c] = df[c] + rng.normal(0, 0.01, n_rows)
+    return df
+
+
+def make_raw(n_rows, seed=0):
+    raw = pd.read_csv(RAW_CSV)
+    raw['TotalCharges'] = pd.to_numeric(raw['TotalCharges'], errors='coerce')
+    df, rng = _resample(raw, n_rows, seed)
+    df['customerID'] = [f"SYN-{i:08d}" for i in range(n_rows)]
+    df['MonthlyCharges'] = (df['MonthlyCharges'] + rng.normal(0, 0.5, n_rows)).round(2)
+    return df
+
+
+def write_csv(kind, n_rows, path, seed=0, chunk_rows=250_000):
+    # Written in slices so multi-million-row files never sit in memory whole.
+    make = make_cleaned if kind == 'cleaned' else make_raw
+    written = 0
+    while written < n_rows:
+        rows = min(chunk_rows, n_rows - written)
+        make(rows, seed + written).to_csv(path, index=False, mode='w' if written == 0 else 'a',
+                                          header=(written == 0))
+        written += rows
+    return path
@@ -0,0 +1,155 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+from threadpoolctl import threadpool_limits
+
+from Dataset_IO import iter_chunks
+from Forest_Engine import load_forest
+from RandomForest import MODEL_FILE, feature_matrix, load_model
+
+INPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\Telco_Customer_Chern_Cleaned.csv"
+OUTPUT_DIR = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\scored"
+OUTPUT_CSV = os.path.join(OUTPUT_DIR, "Telco_Customer_Churn_Scores.csv")
+
+ID_COLUMN = 'customerID'
+THRESHOLD = 0.5
+
+# Set to a callable(path, rows, seconds) per scored chunk ('batch') or record
+# ('online'), as Churn_Metrics does; None costs one check per chunk.
+score_hook = None
+
+class ChurnScorer:
+    # The saved model, feature list and fitted FeaturePipeline, loaded once and
+    # applied to any number of chunks. sklearn copies every tree's nodes out of
+    # the artifact when it unpickles the model, so each process holds a
+    # private copy of the forest. With forest_path the trees come from a
+    # forest compiled by Forest_Engine instead: its flat arrays stay
+    # memory-mapped, so every process scoring with it shares one copy of the
+    # pages, and the unpickled model is dropped. That costs per-core speed on
+    # large chunks (see Forest_Engine), in exchange for memory that does not
+    # grow with the number of workers.
+
+    def __init__(self, model_path, threshold=THRESHOLD, mmap_mode='r', forest_path=None):
+        artifact = load_model(model_path, mmap_mode=mmap_mode)
+        self.features = artifact['features']
+        self.pipeline = artifact.get('pipeline')
+        self.target = artifact.get('target')
+        self.threshold = threshold
+        if forest_path:
+            self.model = load_forest(forest_path, mmap_mode)
+            if self.model.features is not None and self.model.features != list(self.features):
+                raise ValueError(f"{forest_path} was compiled for different features than {model_path}")
+        else:
+            self.model = artifact['model']
+            # Chunks are already spread over processes; one thread per forest avoids oversubscription.
+            self.model.n_jobs = 1
+
+    def score(self, chunk, start_row=0):
+        ids = chunk[ID_COLUMN] if ID_COLUMN in chunk.columns else pd.RangeIndex(start_row, start_row + len(chunk))
+        frame = chunk.drop(columns=[c for c in [ID_COLUMN, self.target] if c in chunk.columns])
+        if self.pipeline is not None:
+            frame = self.pipeline.transform(frame)
+        X = feature_matrix(frame, self.target, self.features)
+        proba = self.model.predict_proba(X)[:, 1]
+        return pd.DataFrame({ID_COLUMN: np.asarray(ids), 'churn_probability': proba,
+                             'churn_prediction': (proba >= self.threshold).astype(np.uint8)})
+
+_worker_scorer = None
+
+def _init_worker(model_path, threshold, forest_path):
+    global _worker_scorer
+    threadpool_limits(limits=1)
+    _worker_scorer = ChurnScorer(model_path, threshold, forest_path=forest_path)
+
+def _timed_score(scorer, chunk, start_row):
+    start = time.perf_counter()
+    scores = scorer.score(chunk, start_row)
+    return scores, time.perf_counter() - start
+
+def _score_in_worker(chunk, start_row):
+    return _timed_score(_worker_scorer, chunk, start_row)
+
+def _tree_rss(process):
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return rss
+
+def score_file(model_path, input_path, output_csv, chunksize=100_000, workers=None, threshold=THRESHOLD,
+               forest_path=None):
+    # Chunks are scored out of order by the pool but written in input order;
+    # at most 2 * workers chunks are in flight, which bounds memory.
+    workers = workers or os.cpu_count() or 1
+    process = psutil.Process()
+    peak_rss = process.memory_info().rss
+    start = time.perf_counter()
+    rows = chunks = 0
+
+    def write(scored):
+        nonlocal rows, chunks
+        scores, seconds = scored
+        if score_hook is not None:
+            score_hook('batch', len(scores), seconds)
+        scores.to_csv(output_csv, index=False, mode='w' if chunks == 0 else 'a', header=(chunks == 0))
+        rows += len(scores)
+        chunks += 1
+
+    if workers == 1:
+        scorer = ChurnScorer(model_path, threshold, forest_path=forest_path)
+        with threadpool_limits(limits=1):
+            for chunk in iter_chunks(input_path, chunksize):
+                write(_timed_score(scorer, chunk, rows))
+                peak_rss = max(peak_rss, process.memory_info().rss)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model_path, threshold, forest_path)) as pool:
+            pending = deque()
+            next_row = 0
+            for chunk in iter_chunks(input_path, chunksize):
+                pending.append(pool.submit(_score_in_worker, chunk, next_row))
+                next_row += len(chunk)
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+                    peak_rss = max(peak_rss, _tree_rss(process))
+            while pending:
+                write(pending.popleft().result())
+                peak_rss = max(peak_rss, _tree_rss(process))
+
+    seconds = time.perf_counter() - start
+    return {'rows': rows, 'chunks': chunks, 'workers': workers, 'seconds': seconds,
+            'rows_per_sec': rows / seconds if seconds else float('inf'), 'peak_rss_mb': peak_rss / 2**20}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score subscriber rows with a saved churn model")
+    parser.add_argument('--model', default=MODEL_FILE)
+    parser.add_argument('--input', default=INPUT_CSV, help="CSV, .npds dataset directory, or Parquet when pyarrow is installed")
+    parser.add_argument('--output', default=OUTPUT_CSV)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=None, help="scoring processes (default: all cores)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--forest', default=None,
+                        help="forest compiled by Forest_Engine.py; workers share its mapped pages instead of "
+                             "each holding a copy of the model")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="serve Prometheus metrics on 127.0.0.1:<port>/metrics while scoring")
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok = True)
+    if args.metrics_port is not None:
+        import Churn_Metrics
+        # This file runs as __main__, not as the Batch_Scoring module enable() hooks.
+        score_hook = Churn_Metrics.enable(args.metrics_port).scored
+
+    stats = score_file(args.model, args.input, args.output, args.chunksize, args.workers, args.threshold,
+                       args.forest)
+    print(f"Scored {stats['rows']} rows in {stats['chunks']} chunks on {stats['workers']} workers: "
+          f"{stats['seconds']:.1f} s, {stats['rows_per_sec']:,.0f} rows/sec, peak RSS {stats['peak_rss_mb']:.0f} MB")
+    print("Saved scores to:", args.output)
@@ -0,0 +1,131 @@
+import threading
+from bisect import bisect_left
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, start_http_server
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from prometheus_client.utils import floatToGoString
+
+import Batch_Scoring
+import Feature_Engineering
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# One online record takes under a millisecond; a create_features section or
+# a scored batch chunk up to about a minute.
+LATENCY_BUCKETS = (1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0)
+
+# The ChurnMetrics being recorded into, set by enable().
+active = None
+
+class ChurnMetrics:
+    # Fed by Feature_Engineering.section_hook / rows_hook and
+    # Batch_Scoring.score_hook. Observations are kept as plain bucket counts
+    # and turned into Prometheus histograms and counters only when /metrics
+    # is scraped, so recording costs a bisect and a few additions under a
+    # lock (the online scorer records from several request threads).
+
+    def __init__(self, registry=None):
+        self.registry = CollectorRegistry() if registry is None else registry
+        self.server = None
+        self._lock = threading.Lock()
+        # section -> [bucket counts, seconds]
+        self._sections = {}
+        # [bucket counts, seconds, rows] over whole create_features calls
+        self._features = self._series(0)
+        # 'batch' / 'online' -> [bucket counts, seconds, rows]
+        self._scoring = {}
+        self.registry.register(self)
+
+    @staticmethod
+    def _series(rows=None):
+        series = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+        return series if rows is None else series + [rows]
+
+    @staticmethod
+    def _add(series, seconds):
+        series[0][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        series[1] += seconds
+
+    def section(self, section, seconds):
+        with self._lock:
+            series = self._sections.get(section)
+            if series is None:
+                series = self._sections[section] = self._series()
+            self._add(series, seconds)
+
+    def features(self, rows, seconds):
+        with self._lock:
+            self._add(self._features, seconds)
+            self._features[2] += rows
+
+    def scored(self, path, rows, seconds):
+        with self._lock:
+            series = self._scoring.get(path)
+            if series is None:
+                series = self._scoring[path] = self._series(0)
+            self._add(series, seconds)
+            series[2] += rows
+
+    @staticmethod
+    def _buckets(counts):
+        cumulative, buckets = 0, []
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), counts):
+            cumulative += count
+            buckets.append((floatToGoString(bound), cumulative))
+        return buckets
+
+    def collect(self):
+        with self._lock:
+            sections = {k: (list(v[0]), v[1]) for k, v in self._sections.items()}
+            features = (list(self._features[0]), self._features[1], self._features[2])
+            scoring = {k: (list(v[0]), v[1], v[2]) for k, v in self._scoring.items()}
+
+        section_seconds = HistogramMetricFamily('churn_create_features_section_seconds',
+                                                "Time spent in each stage of create_features", labels=['section'])
+        for section, (counts, seconds) in sections.items():
+            section_seconds.add_metric([section], self._buckets(counts), seconds)
+        counts, seconds, rows = features
+        feature_seconds = HistogramMetricFamily('churn_create_features_seconds', "Duration of create_features calls")
+        feature_seconds.add_metric([], self._buckets(counts), seconds)
+        feature_rows = CounterMetricFamily('churn_create_features_rows', "Rows engineered by create_features",
+                                           value=rows)
+
+        scoring_seconds = HistogramMetricFamily('churn_scoring_seconds',
+                                                "Duration of scoring a batch chunk or an online record",
+                                                labels=['path'])
+        scored_rows = CounterMetricFamily('churn_scored_rows', "Rows scored", labels=['path'])
+        for path, (counts, seconds, rows) in scoring.items():
+            scoring_seconds.add_metric([path], self._buckets(counts), seconds)
+            scored_rows.add_metric([path], rows)
+        return [section_seconds, feature_seconds, feature_rows, scoring_seconds, scored_rows]
+
+    def exposition(self):
+        return generate_latest(self.registry)
+
+def _install(metrics):
+    # Points every hook at metrics, or clears them all for None.
+    Feature_Engineering.section_hook = metrics.section if metrics is not None else None
+    Feature_Engineering.rows_hook = metrics.features if metrics is not None else None
+    Batch_Scoring.score_hook = metrics.scored if metrics is not None else None
+
+def enable(port=None, addr='127.0.0.1', registry=None):
+    # Records into a new ChurnMetrics; with a port, also serves /metrics on
+    # addr:port (0 picks a free one).
+    global active
+    metrics = ChurnMetrics(registry)
+    if port is not None:
+        metrics.server, _ = start_http_server(port, addr, registry=metrics.registry)
+    disable()
+    _install(metrics)
+    active = metrics
+    return metrics
+
+def disable():
+    global active
+    metrics, active = active, None
+    _install(None)
+    if metrics is not None and metrics.server is not None:
+        metrics.server.shutdown()
+        metrics.server.server_close()
+    return metrics
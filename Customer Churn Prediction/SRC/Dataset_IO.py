@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+
+# A dataset directory (<name>.npds) holds one .npy file per column plus
+# schema.json with each column's name, kind and pandas dtype. Columns are
+# read independently and memory-mapped, so a stage that needs three columns
+# touches only those three files, and dtypes (uint8 flags, nullable UInt8,
+# categoricals such as tenure_group) come back exactly as they were written.
+# The row index is not stored, as with the CSVs written with index=False.
+
+DATASET_SUFFIX = '.npds'
+SCHEMA_FILE = 'schema.json'
+FORMAT_VERSION = 1
+
+def _column_file(i, part='values'):
+    return f"{i:04d}.{part}.npy"
+
+def _is_text(values):
+    return all(isinstance(v, str) for v in values)
+
+def write_dataset(df, path):
+    if not df.columns.is_unique:
+        raise ValueError("Dataset columns must be unique")
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    schema = {'version': FORMAT_VERSION, 'rows': len(df), 'columns': []}
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        dtype = series.dtype
+        entry = {'name': name, 'dtype': str(dtype)}
+        if isinstance(dtype, pd.CategoricalDtype):
+            if not (_is_text(dtype.categories) or dtype.categories.dtype.kind in 'biuf'):
+                raise TypeError(f"Column {name!r}: categories must be text or numbers")
+            entry.update(kind='category', categories=dtype.categories.tolist(), ordered=bool(dtype.ordered))
+            np.save(os.path.join(tmp_path, _column_file(i)), series.cat.codes.to_numpy())
+        elif dtype == object or isinstance(dtype, pd.StringDtype):
+            # Text is stored as codes into a table of distinct values; missing values get code -1.
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            if not _is_text(uniques):
+                raise TypeError(f"Column {name!r}: object columns must hold text (or missing values)")
+            entry.update(kind='text', values=list(uniques))
+            np.save(os.path.join(tmp_path, _column_file(i)), codes.astype(np.int32 if len(uniques) > 32_000 else np.int16))
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            # Nullable Int64/UInt8/boolean/Float64: raw values plus a missing-value mask.
+            numpy_dtype = dtype.numpy_dtype
+            if numpy_dtype == object:
+                raise TypeError(f"Column {name!r}: unsupported dtype {dtype}")
+            entry.update(kind='masked')
+            np.save(os.path.join(tmp_path, _column_file(i)),
+                    series.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0)))
+            np.save(os.path.join(tmp_path, _column_file(i, 'mask')), series.isna().to_numpy())
+        else:
+            entry.update(kind='numpy')
+            np.save(os.path.join(tmp_path, _column_file(i)), series.to_numpy())
+        schema['columns'].append(entry)
+
+    with open(os.path.join(tmp_path, SCHEMA_FILE), 'w') as file:
+        json.dump(schema, file, indent=4)
+
+    # Swap the finished directory in so readers never see a half-written dataset.
+    old_path = path + '.old'
+    if os.path.exists(path):
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE), 'r') as file:
+        schema = json.load(file)
+    if schema.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported dataset version {schema.get('version')}")
+    return schema
+
+def dataset_columns(path):
+    return [c['name'] for c in read_schema(path)['columns']]
+
+def _read_column(path, i, entry, rows, mmap_mode):
+    values = np.load(os.path.join(path, _column_file(i)), mmap_mode=mmap_mode)
+    if rows is not None:
+        values = values[rows]
+    # A plain ndarray view still reads from the mapping but keeps np.memmap out of pandas.
+    values = values.view(np.ndarray)
+    kind = entry['kind']
+    if kind == 'numpy':
+        return values
+    if kind == 'category':
+        dtype = pd.CategoricalDtype(entry['categories'], ordered=entry['ordered'])
+        return pd.Categorical.from_codes(values, dtype=dtype)
+    if kind == 'text':
+        uniques = np.array(entry['values'] + [np.nan], dtype=object)
+        text = uniques[values]
+        return pd.array(text, dtype=entry['dtype']) if entry['dtype'] != 'object' else text
+    mask = np.load(os.path.join(path, _column_file(i, 'mask')), mmap_mode=mmap_mode)
+    if rows is not None:
+        mask = mask[rows]
+    array = pd.array(values, dtype=entry['dtype'])
+    array[mask.view(np.ndarray)] = pd.NA
+    return array
+
+def read_dataset(path, columns=None, rows=None, mmap_mode='c'):
+    # columns: load only these (in this order). rows: a slice or index array.
+    # Numeric columns stay memory-mapped copy-on-write, so loading is close to
+    # free and later edits never reach the file.
+    schema = read_schema(path)
+    entries = {c['name']: (i, c) for i, c in enumerate(schema['columns'])}
+    names = list(entries) if columns is None else list(columns)
+    unknown = [c for c in names if c not in entries]
+    if unknown:
+        raise KeyError(f"{path} has no columns {unknown}")
+    data = {name: _read_column(path, *entries[name], rows, mmap_mode) for name in names}
+    n_rows = schema['rows'] if rows is None else len(range(schema['rows'])[rows]) if isinstance(rows, slice) else len(rows)
+    return pd.DataFrame(data, index=pd.RangeIndex(n_rows), columns=names, copy=False)
+
+def iter_dataset(path, chunksize, columns=None):
+    rows = read_schema(path)['rows']
+    for start in range(0, rows, chunksize):
+        yield read_dataset(path, columns, slice(start, min(start + chunksize, rows)))
+
+def is_dataset(path):
+    return path.endswith(DATASET_SUFFIX) or os.path.isfile(os.path.join(path, SCHEMA_FILE))
+
+def iter_chunks(path, chunksize):
+    # Chunked reading for every format load_frame accepts.
+    if is_dataset(path):
+        yield from iter_dataset(path, chunksize)
+    elif path.lower().endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet in chunks needs pyarrow (pip install pyarrow)") from None
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def load_frame(path, columns=None):
+    # One entry point for every stage: dataset directories, Parquet (needs pyarrow) or CSV.
+    if is_dataset(path):
+        return read_dataset(path, columns)
+    if path.lower().endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_csv(path, usecols=columns)
+    return df if columns is None else df[list(columns)]
+
+def save_frame(df, path):
+    if path.endswith(DATASET_SUFFIX):
+        return write_dataset(df, path)
+    if path.lower().endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+def content_digest(path):
+    # Files hash their bytes; directories hash relative names and bytes in sorted order.
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                digest.update(os.path.relpath(full, path).encode('utf-8') + b'\0')
+                _update_from_file(digest, full)
+    else:
+        _update_from_file(digest, path)
+    return digest.hexdigest()
+
+def _update_from_file(digest, path):
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
@@ -0,0 +1,507 @@
+import pandas as pd
+import numpy as np
+import argparse
+import joblib
+import os
+
+import seaborn as sns
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+
+from Dataset_IO import iter_chunks
+
+INPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\Telco_Customer_Chern_Cleaned.csv"
+VISUALS_DIR = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Visuals"
+FINDINGS_TXT = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Reports\EDA_Findings.txt"
+
+TARGET = 'Churn_Yes'
+HIST_BINS = 1024
+KDE_GRIDSIZE = 200
+
+class StreamingHistogram:
+    # Counts on a grid of bins whose width is a power of two. When new values
+    # fall outside the n_bins window the width doubles and neighbouring bins
+    # merge, so memory stays at n_bins counters and any two histograms merge
+    # exactly, whatever order the chunks arrive in. Until a column shows more
+    # than n_bins distinct values their exact counts are kept as well, so
+    # discrete columns (tenure, SeniorCitizen) get exact quantiles and bins.
+    __slots__ = ('n_bins', 'width', 'start', 'counts', 'values', 'value_counts')
+
+    def __init__(self, n_bins=HIST_BINS):
+        self.n_bins = n_bins
+        self.width = None
+        self.start = 0
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.values = np.empty(0)
+        self.value_counts = np.empty(0, dtype=np.int64)
+
+    def copy(self):
+        other = StreamingHistogram(self.n_bins)
+        other.width, other.start, other.counts = self.width, self.start, self.counts.copy()
+        other.values, other.value_counts = self.values, self.value_counts
+        return other
+
+    def _add_exact(self, values, counts):
+        if self.values is None:
+            return
+        if values is None:
+            self.values = self.value_counts = None
+            return
+        uniques, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        if len(uniques) > self.n_bins:
+            self.values = self.value_counts = None
+        else:
+            weights = np.concatenate([self.value_counts, counts])
+            self.values = uniques
+            self.value_counts = np.bincount(inverse, weights=weights, minlength=len(uniques)).astype(np.int64)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def _occupied(self):
+        nonzero = np.flatnonzero(self.counts)
+        return self.start + int(nonzero[0]), self.start + int(nonzero[-1])
+
+    def _coarsen(self):
+        start = self.start // 2
+        idx = (self.start + np.arange(self.n_bins)) // 2 - start
+        self.counts = np.bincount(idx, weights=self.counts, minlength=self.n_bins)[:self.n_bins].astype(np.int64)
+        self.start = start
+        self.width *= 2
+
+    def _cover(self, low, high):
+        # Make room for values in [low, high]; the width only grows when the
+        # occupied bins and the new ones span more than n_bins.
+        if self.width is None:
+            span = high - low if high > low else max(abs(low), 1.0)
+            self.width = 2.0 ** np.ceil(np.log2(span / self.n_bins))
+            self.start = int(np.floor(low / self.width))
+        occupied = self._occupied() if self.counts.any() else None
+        while True:
+            lo, hi = int(np.floor(low / self.width)), int(np.floor(high / self.width))
+            if occupied is not None:
+                lo, hi = min(lo, occupied[0]), max(hi, occupied[1])
+            if hi - lo < self.n_bins:
+                break
+            self._coarsen()
+            occupied = self._occupied() if occupied is not None else None
+
+        if lo < self.start or hi >= self.start + self.n_bins:
+            start = lo if lo < self.start else hi - self.n_bins + 1
+            counts = np.zeros(self.n_bins, dtype=np.int64)
+            if occupied is not None:
+                a, b = occupied
+                counts[a - start:b - start + 1] = self.counts[a - self.start:b - self.start + 1]
+            self.start, self.counts = start, counts
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self._cover(values.min(), values.max())
+        idx = (np.floor(values / self.width) - self.start).astype(np.int64)
+        self.counts += np.bincount(idx, minlength=self.n_bins)
+        if self.values is not None:
+            self._add_exact(*np.unique(values, return_counts=True))
+
+    def merge(self, other):
+        if other.width is None or not other.counts.any():
+            return self
+        if self.width is None:
+            self.width, self.start, self.counts = other.width, other.start, other.counts.copy()
+            self.values, self.value_counts = other.values, other.value_counts
+            return self
+        self._add_exact(other.values, other.value_counts)
+        other = other.copy()
+        while self.width < other.width:
+            self._coarsen()
+        while other.width < self.width:
+            other._coarsen()
+        lo, hi = other._occupied()
+        self._cover(lo * other.width, hi * other.width)
+        while other.width < self.width:
+            other._coarsen()
+        lo, hi = other._occupied()
+        self.counts[lo - self.start:hi - self.start + 1] += other.counts[lo - other.start:hi - other.start + 1]
+        return self
+
+    def edges(self):
+        return (self.start + np.arange(self.n_bins + 1)) * self.width
+
+    def centers(self):
+        return (self.start + np.arange(self.n_bins) + 0.5) * self.width
+
+    def points(self):
+        # (positions, counts): the exact values when kept, else the bin centres.
+        if self.values is not None:
+            return self.values, self.value_counts
+        keep = self.counts > 0
+        return self.centers()[keep], self.counts[keep]
+
+    def quantile(self, q):
+        if self.values is not None:
+            # np.quantile's linear interpolation between order statistics.
+            cumulative = np.cumsum(self.value_counts)
+            position = (cumulative[-1] - 1) * q
+            below, above = np.searchsorted(cumulative, [np.floor(position), np.ceil(position)], side='right')
+            return float(self.values[below] + (position - np.floor(position)) * (self.values[above] - self.values[below]))
+        # Linear interpolation inside the bin holding the q-th value.
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        return float(np.interp(q * cumulative[-1], cumulative, self.edges()))
+
+    def rebin(self, edges):
+        # Counts per display bin; the last bin includes its right edge, as in np.histogram.
+        positions, counts = self.points()
+        idx = np.clip(np.searchsorted(edges, positions, side='right') - 1, 0, len(edges) - 2)
+        return np.bincount(idx, weights=counts, minlength=len(edges) - 1)
+
+class Moments:
+    # Count, mean, sum of squared deviations, min and max of each column,
+    # ignoring missing values. Two sets merge exactly (Chan et al.'s update
+    # of Welford's running variance), so chunks can be summarized separately.
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self, n_columns):
+        self.count = np.zeros(n_columns, dtype=np.int64)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    @classmethod
+    def from_values(cls, X):
+        moments = cls(X.shape[1])
+        valid = ~np.isnan(X)
+        moments.count = valid.sum(axis=0)
+        moments.mean = np.divide(np.where(valid, X, 0).sum(axis=0), moments.count,
+                                 out=np.zeros(X.shape[1]), where=moments.count > 0)
+        moments.m2 = (np.where(valid, X - moments.mean, 0) ** 2).sum(axis=0)
+        moments.min = np.fmin.reduce(X, axis=0, initial=np.inf)
+        moments.max = np.fmax.reduce(X, axis=0, initial=-np.inf)
+        return moments
+
+    def merge(self, other):
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        share = np.divide(other.count, count, out=np.zeros(len(count)), where=count > 0)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * share
+        self.mean = self.mean + delta * share
+        self.count = count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        return self
+
+    def std(self, ddof=1):
+        return np.sqrt(np.divide(self.m2, self.count - ddof, out=np.full(len(self.count), np.nan),
+                                 where=self.count > ddof))
+
+class CoMoments:
+    # Count, mean vector and co-moment matrix of rows with no missing value,
+    # merged the same way as Moments, so the correlation matrix needs no second pass.
+    __slots__ = ('count', 'mean', 'comoment')
+
+    def __init__(self, n_columns):
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.comoment = np.zeros((n_columns, n_columns))
+
+    @classmethod
+    def from_values(cls, X):
+        moments = cls(X.shape[1])
+        X = X[~np.isnan(X).any(axis=1)]
+        if len(X):
+            moments.count = len(X)
+            moments.mean = X.mean(axis=0)
+            deviations = X - moments.mean
+            moments.comoment = deviations.T @ deviations
+        return moments
+
+    def merge(self, other):
+        count = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.count * other.count / count
+            self.mean = self.mean + delta * other.count / count
+            self.count = count
+        return self
+
+    def correlation(self):
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.comoment / np.outer(scale, scale)
+
+def _class_key(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+class ChurnStatistics:
+    # Everything Telco_Data_EDA.ipynb plots and reports, gathered in one pass
+    # over chunks of the cleaned dataset: per-class moments and histograms of
+    # the numeric columns, per-class value counts of the others, co-moments for
+    # the correlation matrix and the class counts. Statistics of separate
+    # chunks (or files) merge exactly, and the visuals and findings are drawn
+    # from these aggregates alone.
+
+    def __init__(self, target=TARGET, n_bins=HIST_BINS):
+        self.target = target
+        self.n_bins = n_bins
+        self.rows = 0
+        self.columns = None
+        self.numeric_cols = None
+        self.categorical_cols = None
+        self.classes = {}
+        self.moments = {}
+        self.histograms = {}
+        self.value_counts = {}
+        self.comoments = None
+
+    def _layout(self, chunk):
+        # numeric_cols is the notebook's numerical_cols (select_dtypes(number)),
+        # which also puts a numeric target into the correlation matrix.
+        self.columns = list(chunk.columns)
+        self.numeric_cols = chunk.select_dtypes(include=np.number).columns.tolist()
+        self.categorical_cols = [c for c in self.columns if c not in self.numeric_cols and c != self.target]
+        self.comoments = CoMoments(len(self.numeric_cols))
+
+    @property
+    def feature_cols(self):
+        return [c for c in self.numeric_cols if c != self.target]
+
+    def update(self, chunk):
+        if self.columns is None:
+            self._layout(chunk)
+        elif list(chunk.columns) != self.columns:
+            raise ValueError("Chunk columns differ from the first chunk's")
+        self.rows += len(chunk)
+
+        class_codes, class_values = pd.factorize(chunk[self.target], sort=True)
+        X = chunk[self.feature_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        for code, value in enumerate(class_values):
+            key = _class_key(value)
+            rows = class_codes == code
+            self.classes[key] = self.classes.get(key, 0) + int(rows.sum())
+            part = Moments.from_values(X[rows])
+            self.moments[key] = self.moments[key].merge(part) if key in self.moments else part
+            for j, column in enumerate(self.feature_cols):
+                self.histograms.setdefault((column, key), StreamingHistogram(self.n_bins)).update(X[rows, j])
+
+        # (value, class) pairs counted through one bincount per column.
+        n_classes = len(class_values)
+        labelled = class_codes >= 0
+        for column in self.categorical_cols:
+            codes, values = pd.factorize(chunk[column], sort=True, use_na_sentinel=False)
+            counts = np.bincount(codes[labelled] * n_classes + class_codes[labelled],
+                                 minlength=len(values) * n_classes)
+            index = pd.MultiIndex.from_product([values, [_class_key(v) for v in class_values]],
+                                               names=[column, self.target])
+            part = pd.Series(counts, index=index)
+            part = part[part > 0]
+            self.value_counts[column] = (self.value_counts[column].add(part, fill_value=0).astype(np.int64)
+                                         if column in self.value_counts else part)
+
+        self.comoments.merge(CoMoments.from_values(chunk[self.numeric_cols].to_numpy(dtype=np.float64,
+                                                                                      na_value=np.nan)))
+        return self
+
+    def merge(self, other):
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns, self.numeric_cols = other.columns, other.numeric_cols
+            self.categorical_cols = other.categorical_cols
+            self.comoments = CoMoments(len(self.numeric_cols))
+        elif other.columns != self.columns:
+            raise ValueError("Cannot merge statistics of datasets with different columns")
+        self.rows += other.rows
+        for key, count in other.classes.items():
+            self.classes[key] = self.classes.get(key, 0) + count
+        for key, moments in other.moments.items():
+            if key in self.moments:
+                self.moments[key].merge(moments)
+            else:
+                self.moments[key] = Moments(len(self.feature_cols)).merge(moments)
+        for key, hist in other.histograms.items():
+            self.histograms.setdefault(key, StreamingHistogram(self.n_bins)).merge(hist)
+        for column, counts in other.value_counts.items():
+            self.value_counts[column] = (self.value_counts[column].add(counts, fill_value=0).astype(np.int64)
+                                         if column in self.value_counts else counts.copy())
+        self.comoments.merge(other.comoments)
+        return self
+
+    def column_moments(self):
+        total = Moments(len(self.feature_cols))
+        for moments in self.moments.values():
+            total.merge(moments)
+        return total
+
+    def histogram(self, column, key=None):
+        if key is not None:
+            return self.histograms[(column, key)]
+        total = StreamingHistogram(self.n_bins)
+        for k in self.classes:
+            if (column, k) in self.histograms:
+                total.merge(self.histograms[(column, k)])
+        return total
+
+    def churn_rate(self):
+        # Percent of rows in the positive class: 'Yes' for a Churn label
+        # column, True/1 for Churn_Yes, as the notebook computed it.
+        positive = self.classes.get('Yes', self.classes.get(True, 0))
+        total = sum(self.classes.values())
+        return positive / total * 100 if total else None
+
+    def correlation(self):
+        return pd.DataFrame(self.comoments.correlation(), index=self.numeric_cols, columns=self.numeric_cols)
+
+    def describe(self):
+        # DataFrame.describe() for the numeric features; quartiles are read
+        # off the histograms, so they are exact to within one fine bin.
+        moments = self.column_moments()
+        quartiles = [[self.histogram(c).quantile(q) for c in self.feature_cols] for q in (0.25, 0.5, 0.75)]
+        return pd.DataFrame([moments.count, moments.mean, moments.std(), moments.min, *quartiles, moments.max],
+                            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                            columns=self.feature_cols)
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+def collect_statistics(input_path, chunksize=100_000, target=TARGET, n_bins=HIST_BINS):
+    stats = ChurnStatistics(target, n_bins)
+    for chunk in iter_chunks(input_path, chunksize):
+        stats.update(chunk)
+    return stats
+
+def auto_bin_edges(hist, low, high, count):
+    # np.histogram_bin_edges(bins='auto') as of numpy 2, which seaborn's
+    # histplot uses: the Sturges width, or the Freedman-Diaconis width if
+    # narrower, but never under half the square-root rule's width.
+    if not high > low:
+        return np.array([low - 0.5, low + 0.5])
+    sturges = (high - low) / (np.log2(count) + 1)
+    fd = 2 * (hist.quantile(0.75) - hist.quantile(0.25)) * count ** (-1 / 3)
+    width = min(max(fd, (high - low) / np.sqrt(count) / 2), sturges)
+    n_bins = max(1, min(int(np.ceil((high - low) / width)), hist.n_bins))
+    return np.linspace(low, high, n_bins + 1)
+
+def binned_kde(hist, low, high, std, count, scale):
+    # Gaussian KDE with Scott's bandwidth evaluated from the histogram points,
+    # over the class's own range, scaled to counts per display bin.
+    grid = np.linspace(low, high, KDE_GRIDSIZE)
+    bandwidth = std * count ** (-1 / 5)
+    if not bandwidth > 0:
+        return grid, np.zeros_like(grid)
+    positions, counts = hist.points()
+    z = (grid[:, None] - positions) / bandwidth
+    density = (np.exp(-0.5 * z ** 2) @ counts) / (bandwidth * np.sqrt(2 * np.pi) * count)
+    return grid, density * count * scale
+
+def render_distribution(stats, column, path):
+    j = stats.feature_cols.index(column)
+    total = stats.column_moments()
+    hist = stats.histogram(column)
+    edges = auto_bin_edges(hist, total.min[j], total.max[j], total.count[j])
+
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    handles = []
+    for i, key in enumerate(sorted(stats.classes, key=str)):
+        color = f"C{i}"
+        class_hist = stats.histograms.get((column, key))
+        moments = stats.moments[key]
+        if class_hist is None or not moments.count[j]:
+            continue
+        counts = class_hist.rebin(edges)
+        ax.stairs(counts, edges, fill=True, color=to_rgba(color, 0.25))
+        ax.stairs(counts, edges, color=color)
+        grid, curve = binned_kde(class_hist, moments.min[j], moments.max[j], moments.std()[j],
+                                 moments.count[j], edges[1] - edges[0])
+        ax.plot(grid, curve, color=color)
+        handles.append(Patch(facecolor=to_rgba(color, 0.25), edgecolor=color, label=str(key)))
+    ax.legend(handles=handles, title=stats.target)
+    ax.set_xlabel(column)
+    ax.set_ylabel("Count")
+    ax.set_title(f"{column} Distribution by Churn")
+    fig.tight_layout()
+    fig.savefig(path)
+
+def render_counts(stats, column, path):
+    counts = stats.value_counts[column].unstack(fill_value=0)
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    x = np.arange(len(counts))
+    width = 0.8 / len(counts.columns)
+    for i, key in enumerate(counts.columns):
+        ax.bar(x - 0.4 + width * (i + 0.5), counts[key], width, color=f"C{i}", label=str(key))
+    ax.set_xticks(x, [str(v) for v in counts.index], rotation=45)
+    ax.legend(title=stats.target)
+    ax.set_xlabel(column)
+    ax.set_ylabel("count")
+    ax.set_title(f"{column} vs Churn")
+    fig.tight_layout()
+    fig.savefig(path)
+
+def render_heatmap(stats, path):
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
+    sns.heatmap(stats.correlation(), annot=True, cmap="coolwarm", fmt=".2f", ax=ax)
+    ax.set_title("Correlation Heatmap (Numerical Features)")
+    fig.tight_layout()
+    fig.savefig(path)
+
+def render_visuals(stats, visuals_dir):
+    # The notebook's figures: count plots for text columns, a histogram with
+    # KDE per numeric column and the correlation heatmap.
+    written = []
+    for column in stats.categorical_cols:
+        if stats.value_counts[column].index.get_level_values(0).dtype == object:
+            written.append(os.path.join(visuals_dir, f"{column}_vs_Churn.png"))
+            render_counts(stats, column, written[-1])
+    for column in stats.feature_cols:
+        written.append(os.path.join(visuals_dir, f"{column}_distribution_by_Churn.png"))
+        render_distribution(stats, column, written[-1])
+    written.append(os.path.join(visuals_dir, "correlation_heatmap.png"))
+    render_heatmap(stats, written[-1])
+    return written
+
+def findings_text(stats):
+    return f"""
+1. Dataset contains {stats.rows} rows and {len(stats.columns)} columns.
+2. Churn distribution is imbalanced with approx {stats.churn_rate():.2f}% churn rate.
+3. Tenure, MonthlyCharges, and Contract type show clear patterns with churn.
+4. Customers with month-to-month contracts, no dependents, and low tenure have higher churn.
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EDA visuals and findings from one streaming pass over the cleaned dataset")
+    parser.add_argument('--input', default=INPUT_CSV, help="CSV, Parquet or .npds dataset directory")
+    parser.add_argument('--visuals-dir', default=VISUALS_DIR)
+    parser.add_argument('--findings', default=FINDINGS_TXT)
+    parser.add_argument('--target', default=TARGET)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--save-stats', default=None, help="also save the aggregates (joblib) to this path")
+    parser.add_argument('--from-stats', default=None, help="render from saved aggregates instead of reading --input")
+    args = parser.parse_args()
+    os.makedirs(args.visuals_dir, exist_ok = True)
+    os.makedirs(os.path.dirname(args.findings) or '.', exist_ok = True)
+
+    if args.from_stats:
+        stats = ChurnStatistics.load(args.from_stats)
+    else:
+        stats = collect_statistics(args.input, args.chunksize, args.target)
+    if args.save_stats:
+        stats.save(args.save_stats)
+        print("Saved statistics to:", args.save_stats)
+
+    print("Shape: ", (stats.rows, len(stats.columns)))
+    print(stats.describe())
+    for path in render_visuals(stats, args.visuals_dir):
+        print("Saved", path)
+    with open(args.findings, "w") as f:
+        f.write(findings_text(stats))
+    print("EDA complete. Churn rate calculated:", stats.churn_rate())
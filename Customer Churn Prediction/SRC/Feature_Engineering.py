@@ -1,25 +1,61 @@
 import pandas as pd
 import numpy as np
-# import joblib
+import joblib
+import argparse
 import os
+import tempfile
+import time
+
+import psutil
+
+from Dataset_IO import iter_chunks, load_frame, save_frame
 
 INPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\Telco_Customer_Chern_Cleaned.csv"
 OUTPUT_DIR = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\processed"
 OUTPUT_CSV = os.path.join(OUTPUT_DIR, "Telco_Customer_Churn_Featured.csv")
-os.makedirs(OUTPUT_DIR, exist_ok = True)
+
+SERVICE_KEYS = ['PhoneService','MultipleLines','OnlineSecurity','OnlineBackup',
+                'DeviceProtection','TechSupport','StreamingTV','StreamingMovies']
+TENURE_QUANTILE_LABELS = ['Q1','Q2','Q3','Q4','Q5']
+CONTRACT_TERMS = ['Month-to-month', 'One year', 'Two year']
+SCALED_CHECK_COLS = ['tenure','MonthlyCharges','TotalCharges']
+
+# Set to a callable(section, seconds) to time the stages of create_features,
+# as Benchmarks/Perf_Suite.py does. Left as None it costs one check per stage.
+section_hook = None
+# Set to a callable(rows, seconds) called once per create_features call, as
+# Churn_Metrics does for row throughput; None costs one check per call.
+rows_hook = None
+
+class _SectionClock:
+    __slots__ = ('hook', 'rows_hook', 'start', 'last')
+
+    def __init__(self):
+        self.hook = section_hook
+        self.rows_hook = rows_hook
+        self.last = time.perf_counter() if self.hook is not None or self.rows_hook is not None else 0.0
+        self.start = self.last
+
+    def mark(self, section):
+        if self.hook is not None:
+            now = time.perf_counter()
+            self.hook(section, now - self.last)
+            self.last = now
+
+    def finish(self, rows):
+        if self.rows_hook is not None:
+            self.rows_hook(rows, time.perf_counter() - self.start)
 
 def normalize_column_names(dataFrame):
     col_map = {c: c.strip().replace(' ','_').replace('(','').replace(')','') for c in dataFrame.columns}
     dataFrame = dataFrame.rename(columns = col_map)
     return dataFrame
 
-def detect_scaled(dataFrame, cols = ['tenure','MonthlyCharges','TotalCharges']):
-    scaled = {}
-    for c in dataFrame.columns:
-        mean = dataFrame[c].mean()
-        std = dataFrame[c].std()
-        scaled[c] = (abs(mean) < 1e-3 and abs(std - 1.0) < 1e-2)
-    return scaled
+def detect_scaled(dataFrame, cols = SCALED_CHECK_COLS):
+    cols = list(dataFrame.columns) if cols is None else [c for c in cols if c in dataFrame.columns]
+    numeric = dataFrame[cols].select_dtypes(include=['number', 'bool'])
+    flags = (numeric.mean().abs() < 1e-3) & ((numeric.std() - 1.0).abs() < 1e-2)
+    return {c: bool(flags.get(c, False)) for c in cols}
 
 def safe_divide(a, b, fill_with=0):
     with np.errstate(divide='ignore', invalid='ignore'):
@@ -28,7 +64,91 @@ def safe_divide(a, b, fill_with=0):
         res = np.where(np.isnan(res), fill_with, res)
     return res
 
-def create_features(df):
+def columns_with_true(df, cols):
+    # Which of cols hold at least one True/1, checked block-wise instead of column by column.
+    frame = df[cols]
+    found = set(frame.select_dtypes(include='bool').any().loc[lambda s: s].index)
+    numeric = frame.select_dtypes(include='number')
+    if len(numeric.columns):
+        values = numeric.to_numpy(dtype=float, na_value=np.nan)
+        found.update(numeric.columns[(values == 1).any(axis=0)])
+    for c in frame.columns.difference(found).difference(numeric.columns):
+        if frame[c].dtype != bool and frame[c].dropna().isin([True,1]).any():
+            found.add(c)
+    return found
+
+def find_service_cols(df, has_true=None):
+    if has_true is None:
+        candidates = [c for c in df.columns if any(k in c for k in SERVICE_KEYS)]
+        has_true = columns_with_true(df, candidates).__contains__
+
+    service_cols = []
+    for k in SERVICE_KEYS:
+        candidates = [c for c in df.columns if k in c]
+        for c in candidates:
+            if c.endswith('_Yes') or c.endswith('_True') or has_true(c):
+                service_cols.append(c)
+        if not any(k in c for c in service_cols) and candidates:
+            service_cols.extend(candidates)
+
+    service_cols = list(dict.fromkeys(service_cols))
+
+    if not service_cols:
+        boolean_cols = df.select_dtypes(include=['bool','int','int64']).columns.tolist()
+        for c in boolean_cols:
+            if any(k.lower() in c.lower() for k in SERVICE_KEYS):
+                service_cols.append(c)
+    return service_cols
+
+def is_bool_like(series):
+    # Text columns usually fail on their first rows, so check those before the full column.
+    head = series.iloc[:1024]
+    if not head[head.notna()].isin([True, False, 0, 1]).all():
+        return False
+    return series.dropna().isin([True, False, 0, 1]).all()
+
+def find_bool_cols(df):
+    found = set(df.select_dtypes(include='bool').columns)
+    numeric = df.select_dtypes(include='number')
+    if len(numeric.columns):
+        values = numeric.to_numpy(dtype=float, na_value=np.nan)
+        found.update(numeric.columns[((values == 0) | (values == 1) | np.isnan(values)).all(axis=0)])
+    for c in df.columns.difference(found).difference(numeric.columns):
+        if is_bool_like(df[c]):
+            found.add(c)
+    return [c for c in df.columns if c in found]
+
+def compact_bool_dtypes(df, bool_cols):
+    # 0/1 columns as uint8; nullable UInt8 only where values are missing.
+    if not bool_cols:
+        return {}
+    has_na = df[bool_cols].isna().any()
+    return {c: ('UInt8' if has_na[c] else 'uint8') for c in bool_cols}
+
+def count_services(df, service_cols):
+    services = df[service_cols]
+    labels = services.select_dtypes(include='object')
+    if len(labels.columns):
+        # Raw Yes/No columns count their 'Yes' answers.
+        counts = labels.eq('Yes').sum(axis=1)
+        if len(labels.columns) < len(service_cols):
+            counts = counts + services.drop(columns=labels.columns).sum(axis=1)
+    else:
+        counts = services.sum(axis=1)
+    if counts.dtype.kind in 'iub' and len(service_cols) < 255:
+        counts = counts.astype(np.uint8)
+    return counts
+
+def match_labels(series, predicate):
+    # Evaluate predicate once per distinct label and broadcast back by code.
+    codes, uniques = pd.factorize(series)
+    flags = np.array([predicate(str(u)) for u in uniques] + [predicate(str(np.nan))], dtype=bool)
+    return pd.Series(flags[codes], index=series.index)
+
+def create_features(df, plan=None, cast_bools=True):
+    # plan carries dataset-level decisions (see stream_features) so a chunk
+    # is engineered exactly as it would be inside the full frame.
+    clock = _SectionClock()
     df = normalize_column_names(df)
 
     if 'Churn' not in df.columns:
@@ -42,11 +162,13 @@ def create_features(df):
                 df['Churn_Label'] = 'Unknown'
     else:
         df['Churn_Label'] = df['Churn'].astype(str)
+    clock.mark('churn_label')
 
-    scaled_flags = detect_scaled(df)
-    if any(scaled_flags.values()):
+    scaled_flags = plan['scaled_flags'] if plan is not None and 'scaled_flags' in plan else detect_scaled(df)
+    if any(scaled_flags.values()) and (plan is None or not plan.get('warned')):
         print("WARNING: Numeric columns seem scaled (means ~0, std ~1).")
         print("It's recommended to run feature engineering on unscaled raw numbers or re-create raw versions.")
+    clock.mark('scale_check')
 
     if 'TotalCharges' in df.columns and 'tenure' in df.columns:
         
@@ -56,37 +178,30 @@ def create_features(df):
 
     if 'tenure' in df.columns:
         try:
-            if df['tenure'].mean() > 5:  
+            tenure_mean = plan['tenure_mean'] if plan is not None and 'tenure_mean' in plan else df['tenure'].mean()
+            if tenure_mean > 5:  
                 bins = [0, 12, 24, 48, 60, np.inf]
                 labels = ['0-12', '13-24', '25-48', '49-60', '61+']
                 df['tenure_group'] = pd.cut(df['tenure'], bins=bins, labels=labels, right=False)
+            elif plan is not None and 'tenure_ranker' in plan:
+                ranker = plan['tenure_ranker']
+                df['tenure_group'] = pd.cut(ranker.rank(df['tenure']), bins=ranker.quantile_edges(5),
+                                            labels=TENURE_QUANTILE_LABELS, include_lowest=True)
             else:
-                df['tenure_group'] = pd.qcut(df['tenure'].rank(method='first'), q=5, labels=['Q1','Q2','Q3','Q4','Q5'])
+                df['tenure_group'] = pd.qcut(df['tenure'].rank(method='first'), q=5, labels=TENURE_QUANTILE_LABELS)
         except Exception as e:
             df['tenure_group'] = np.nan
+    clock.mark('binning')
 
-    service_keys = ['PhoneService','MultipleLines','OnlineSecurity','OnlineBackup',
-                    'DeviceProtection','TechSupport','StreamingTV','StreamingMovies']
-    service_cols = []
-    for k in service_keys:
-        candidates = [c for c in df.columns if k in c]
-        for c in candidates:
-            if c.endswith('_Yes') or c.endswith('_True') or df[c].dropna().isin([True,1]).any():
-                service_cols.append(c)
-        if not any(k in c for c in service_cols) and candidates:
-            service_cols.extend(candidates)
-
-    service_cols = list(dict.fromkeys(service_cols))
-
-    if not service_cols:
-        boolean_cols = df.select_dtypes(include=['bool','int','int64']).columns.tolist()
-        for c in boolean_cols:
-            if any(k.lower() in c.lower() for k in service_keys):
-                service_cols.append(c)
+    if plan is not None and 'service_cols' in plan:
+        service_cols = plan['service_cols']
+    else:
+        service_cols = find_service_cols(df)
     if service_cols:
-        df['num_services'] = df[service_cols].sum(axis=1)
+        df['num_services'] = count_services(df, service_cols)
     else:
         df['num_services'] = 0
+    clock.mark('service_detection')
 
     internet_cols = [c for c in df.columns if c.lower().startswith('internetservice')]
     if internet_cols:
@@ -100,8 +215,8 @@ def create_features(df):
         df['is_fiber'] = df.get(fiber_col, False)
     else:
         if 'InternetService' in df.columns:
-            df['has_internet'] = df['InternetService'].apply(lambda x: False if str(x).lower() == 'no' else True)
-            df['is_fiber'] = df['InternetService'].apply(lambda x: True if str(x).lower() == 'fiber optic' else False)
+            df['has_internet'] = match_labels(df['InternetService'], lambda x: x.lower() != 'no')
+            df['is_fiber'] = match_labels(df['InternetService'], lambda x: x.lower() == 'fiber optic')
         else:
             df['has_internet'] = False
             df['is_fiber'] = False
@@ -111,11 +226,12 @@ def create_features(df):
         df['long_term_contract'] = df[[c for c in contract_cols if ('two' in c.lower() or 'one' in c.lower())]].any(axis=1)
 
         if 'Contract_Two_year' in df.columns or 'Contract_One_year' in df.columns:
-            df['contract_term'] = np.where(df.get('Contract_Two_year', False), 'Two year',
-                                 np.where(df.get('Contract_One_year', False), 'One year', 'Month-to-month'))
+            df['contract_term'] = pd.Categorical(np.where(df.get('Contract_Two_year', False), 'Two year',
+                                 np.where(df.get('Contract_One_year', False), 'One year', 'Month-to-month')),
+                                 categories=CONTRACT_TERMS)
     else:
         if 'Contract' in df.columns:
-            df['long_term_contract'] = df['Contract'].apply(lambda x: True if 'year' in str(x) else False)
+            df['long_term_contract'] = match_labels(df['Contract'], lambda x: 'year' in x)
         else:
             df['long_term_contract'] = False
 
@@ -136,15 +252,355 @@ def create_features(df):
     else:
         df['tenure_x_monthly'] = np.nan
         df['charges_per_service'] = np.nan
+    clock.mark('flags')
 
-    bool_cols = [c for c in df.columns if df[c].dropna().isin([True, False, 0, 1]).all()]
-    for c in bool_cols:
-        df[c] = df[c].astype('Int64')
+    if cast_bools:
+        bool_cols = plan['bool_cols'] if plan is not None and 'bool_cols' in plan else find_bool_cols(df)
+        df = df.astype(compact_bool_dtypes(df, bool_cols))
+        if df['Churn_Label'].dtype == object:
+            df['Churn_Label'] = df['Churn_Label'].astype('category')
+    clock.mark('bool_casting')
+    clock.finish(len(df))
 
     return df
 
+class StreamingTenureRanker:
+    # Reproduces Series.rank(method='first') across chunks: a row's rank is the
+    # number of smaller values in the whole file, plus equal values seen before it.
+
+    def __init__(self, value_counts):
+        value_counts = value_counts.sort_index()
+        self._values = value_counts.index.to_numpy()
+        self._less = np.concatenate([[0], np.cumsum(value_counts.to_numpy())[:-1]])
+        self._seen = np.zeros(len(self._values), dtype=np.int64)
+        self.count = int(value_counts.sum())
+
+    def rank(self, series):
+        ranks = np.full(len(series), np.nan)
+        values = series.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        idx = np.searchsorted(self._values, values[valid])
+        order_within = pd.Series(idx).groupby(idx).cumcount().to_numpy()
+        ranks[valid] = self._less[idx] + self._seen[idx] + order_within + 1
+        np.add.at(self._seen, idx, 1)
+        return pd.Series(ranks, index=series.index)
+
+    def quantile_edges(self, q):
+        # Same edges pd.qcut derives from ranks 1..N.
+        return pd.Series(np.arange(1, self.count + 1, dtype=float)).quantile(np.linspace(0, 1, q + 1)).to_numpy()
+
+class _RunningMoments:
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if not n:
+            return
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        total = self.count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+def _unify_dtypes(seen):
+    dtype_overrides = {}
+    for c, dtypes in seen.items():
+        if len(dtypes) > 1 and all(np.issubdtype(d, np.number) for d in dtypes):
+            dtype_overrides[c] = np.float64
+    return dtype_overrides
+
+def _with_churn_label(chunk):
+    # The label column create_features adds before detect_scaled looks at the frame.
+    if 'Churn' in chunk.columns:
+        return chunk.assign(Churn_Label=chunk['Churn'].astype(str))
+    if 'Churn_Yes' in chunk.columns:
+        return chunk.assign(Churn_Label=chunk['Churn_Yes'].map({1: 'Yes', 0: 'No', True: 'Yes', False: 'No'}))
+    return chunk
+
+def scan_dataset(input_path, chunksize):
+    # Pass 1: every dataset-level statistic create_features would take from the full frame.
+    moments, has_true, dtypes_seen, tenure_counts = {}, {}, {}, None
+    columns = None
+    for chunk in iter_chunks(input_path, chunksize):
+        chunk = _with_churn_label(normalize_column_names(chunk))
+        columns = chunk.columns
+        for c in chunk.columns:
+            dtypes_seen.setdefault(c, set()).add(chunk[c].dtype)
+            has_true[c] = has_true.get(c, False) or bool(chunk[c].dropna().isin([True,1]).any())
+            if c in SCALED_CHECK_COLS and (chunk[c].dtype == bool or np.issubdtype(chunk[c].dtype, np.number)):
+                moments.setdefault(c, _RunningMoments()).update(chunk[c].to_numpy(dtype=float))
+        if 'tenure' in chunk.columns:
+            counts = chunk['tenure'].value_counts()
+            tenure_counts = counts if tenure_counts is None else tenure_counts.add(counts, fill_value=0)
+
+    scaled_flags = {c: bool(abs(m.mean) < 1e-3 and abs(m.std() - 1.0) < 1e-2) for c, m in moments.items()}
+    plan = {'scaled_flags': scaled_flags}
+    if 'tenure' in moments:
+        plan['tenure_mean'] = moments['tenure'].mean
+    if tenure_counts is not None:
+        plan['tenure_ranker'] = StreamingTenureRanker(tenure_counts.astype(np.int64))
+    if columns is not None:
+        plan['service_cols'] = find_service_cols(pd.DataFrame(columns=columns).astype(
+            {c: next(iter(d)) for c, d in dtypes_seen.items() if len(d) == 1}), has_true=has_true.get)
+    return plan, _unify_dtypes(dtypes_seen)
+
+def stream_features(input_path, output_csv, chunksize=100_000):
+    # Reads any format iter_chunks accepts; the output is appended as CSV.
+    process = psutil.Process()
+    peak_rss = process.memory_info().rss
+
+    plan, dtype_overrides = scan_dataset(input_path, chunksize)
+    peak_rss = max(peak_rss, process.memory_info().rss)
+    if any(plan['scaled_flags'].values()):
+        print("WARNING: Numeric columns seem scaled (means ~0, std ~1).")
+        print("It's recommended to run feature engineering on unscaled raw numbers or re-create raw versions.")
+    plan['warned'] = True
+
+    # Pass 2 engineers each chunk and spools it uncast, because which output
+    # columns count as boolean is only known once every chunk has been seen.
+    rows = 0
+    bool_candidates = None
+    with tempfile.TemporaryDirectory() as spool:
+        spooled = []
+        for chunk in iter_chunks(input_path, chunksize):
+            # Numeric columns typed differently across chunks are read as float64 throughout.
+            chunk = normalize_column_names(chunk)
+            if dtype_overrides:
+                chunk = chunk.astype(dtype_overrides)
+            feat = create_features(chunk, plan=plan, cast_bools=False)
+            chunk_bools = set(find_bool_cols(feat))
+            bool_candidates = chunk_bools if bool_candidates is None else bool_candidates & chunk_bools
+            path = os.path.join(spool, f"chunk_{len(spooled):06d}.pkl")
+            feat.to_pickle(path)
+            spooled.append(path)
+            rows += len(feat)
+            peak_rss = max(peak_rss, process.memory_info().rss)
+
+        # Pass 3: cast with the dataset-wide boolean columns and append to the output.
+        for n, path in enumerate(spooled):
+            feat = pd.read_pickle(path)
+            feat = feat.astype(compact_bool_dtypes(feat, [c for c in feat.columns if c in bool_candidates]))
+            feat.to_csv(output_csv, index=False, mode='w' if n == 0 else 'a', header=(n == 0))
+            os.remove(path)
+            peak_rss = max(peak_rss, process.memory_info().rss)
+
+    return {'rows': rows, 'chunks': len(spooled), 'peak_rss_mb': peak_rss / 2**20}
+
+class FeaturePipeline:
+    # create_features split into fit (discover columns, tenure bins, boolean
+    # outputs once) and transform (apply the stored plan with vectorized ops).
+    # Tenure quantile bins are learned as tenure values, so rows tied exactly
+    # on a quantile edge always land in the lower bin instead of being split
+    # by row order as rank(method='first') does.
+
+    def fit(self, df):
+        df = normalize_column_names(df)
+        columns = list(df.columns)
+        self.input_columns_ = columns
+
+        if 'Churn' in columns:
+            self.label_source_ = ('astype', 'Churn')
+        elif 'Churn_Yes' in columns:
+            self.label_source_ = ('map', 'Churn_Yes')
+        else:
+            possible = [c for c in columns if 'churn' in c.lower()]
+            self.label_source_ = ('astype', possible[0]) if possible else ('constant', 'Unknown')
+
+        labelled = df.assign(Churn_Label=self._churn_label(df))
+        if any(detect_scaled(labelled).values()):
+            print("WARNING: Numeric columns seem scaled (means ~0, std ~1).")
+            print("It's recommended to run feature engineering on unscaled raw numbers or re-create raw versions.")
+
+        self.tenure_bins_ = None
+        if 'tenure' in columns:
+            tenure = df['tenure'].dropna().to_numpy(dtype=float)
+            if df['tenure'].mean() > 5:
+                self.tenure_bins_ = ('fixed', np.array([0, 12, 24, 48, 60, np.inf]),
+                                     ['0-12', '13-24', '25-48', '49-60', '61+'])
+            elif len(tenure):
+                self.tenure_bins_ = ('quantile', np.quantile(tenure, np.linspace(0, 1, 6)), TENURE_QUANTILE_LABELS)
+
+        self.service_cols_ = find_service_cols(labelled)
+
+        internet_cols = [c for c in columns if c.lower().startswith('internetservice')]
+        if internet_cols:
+            self.internet_plan_ = ('dummies', internet_cols,
+                                   next((c for c in internet_cols if 'no' in c.lower()), None),
+                                   next((c for c in internet_cols if 'fiber' in c.lower()), None))
+        elif 'InternetService' in columns:
+            self.internet_plan_ = ('raw',)
+        else:
+            self.internet_plan_ = ('none',)
+
+        contract_cols = [c for c in columns if c.lower().startswith('contract')]
+        if contract_cols:
+            self.contract_plan_ = ('dummies', [c for c in contract_cols if ('two' in c.lower() or 'one' in c.lower())],
+                                   'Contract_Two_year' in columns or 'Contract_One_year' in columns)
+        elif 'Contract' in columns:
+            self.contract_plan_ = ('raw',)
+        else:
+            self.contract_plan_ = ('none',)
+
+        self.autopay_col_ = next((c for c in ['PaymentMethod_Credit_card_automatic',
+                                              'PaymentMethod_Credit_card_(automatic)'] if c in columns), None)
+        self.family_cols_ = [c for c in ['Partner_Yes', 'Dependents_Yes'] if c in columns]
+
+        out = self._build(df)
+        self.bool_cols_ = find_bool_cols(out)
+        self.output_columns_ = list(out.columns)
+        # Chosen once here so every transformed batch gets the training dtypes.
+        self.output_dtypes_ = compact_bool_dtypes(out, self.bool_cols_)
+        return self
+
+    def _churn_label(self, df):
+        kind, source = self.label_source_
+        if kind == 'map':
+            return df[source].map({1: 'Yes', 0: 'No', True: 'Yes', False: 'No'})
+        if kind == 'astype':
+            return df[source].astype(str)
+        return source
+
+    def _tenure_group(self, tenure):
+        kind, edges, labels = self.tenure_bins_
+        values = tenure.to_numpy(dtype=float)
+        if kind == 'fixed':
+            # [edge, next_edge) bins; negative or missing tenure gets no group.
+            codes = np.searchsorted(edges, values, side='right') - 1
+            codes[(values < edges[0]) | np.isnan(values)] = -1
+        else:
+            # (edge, next_edge] bins, clipped to the training range for unseen values.
+            codes = np.searchsorted(edges[1:-1], values, side='left')
+            codes[np.isnan(values)] = -1
+        return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+    def _build(self, df):
+        out = {}
+        out['Churn_Label'] = self._churn_label(df)
+
+        has_charges = 'TotalCharges' in df.columns and 'tenure' in df.columns
+        if has_charges:
+            tenure = df['tenure'].to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out['avg_charges_per_month'] = np.where(tenure > 0, df['TotalCharges'].to_numpy(dtype=float) / tenure,
+                                                        df['MonthlyCharges'] if 'MonthlyCharges' in df.columns else np.nan)
+        else:
+            out['avg_charges_per_month'] = np.nan
+
+        if self.tenure_bins_ is not None:
+            out['tenure_group'] = self._tenure_group(df['tenure'])
+        elif 'tenure' in df.columns:
+            out['tenure_group'] = np.nan
+
+        num_services = count_services(df, self.service_cols_) if self.service_cols_ else 0
+        out['num_services'] = num_services
+
+        kind = self.internet_plan_[0]
+        if kind == 'dummies':
+            _, internet_cols, no_col, fiber_col = self.internet_plan_
+            out['has_internet'] = ~df[no_col] if no_col else df[internet_cols].any(axis=1)
+            out['is_fiber'] = df[fiber_col] if fiber_col else False
+        elif kind == 'raw':
+            out['has_internet'] = match_labels(df['InternetService'], lambda x: x.lower() != 'no')
+            out['is_fiber'] = match_labels(df['InternetService'], lambda x: x.lower() == 'fiber optic')
+        else:
+            out['has_internet'] = False
+            out['is_fiber'] = False
+
+        kind = self.contract_plan_[0]
+        if kind == 'dummies':
+            _, long_cols, has_term = self.contract_plan_
+            out['long_term_contract'] = df[long_cols].any(axis=1)
+            if has_term:
+                two = df['Contract_Two_year'] if 'Contract_Two_year' in df.columns else False
+                one = df['Contract_One_year'] if 'Contract_One_year' in df.columns else False
+                out['contract_term'] = pd.Categorical(np.where(two, 'Two year', np.where(one, 'One year', 'Month-to-month')),
+                                                      categories=CONTRACT_TERMS)
+        elif kind == 'raw':
+            out['long_term_contract'] = match_labels(df['Contract'], lambda x: 'year' in x)
+        else:
+            out['long_term_contract'] = False
+
+        out['is_autopay'] = df[self.autopay_col_].fillna(False) if self.autopay_col_ else False
+        out['is_electronic_check'] = (df['PaymentMethod_Electronic_check'].fillna(False)
+                                      if 'PaymentMethod_Electronic_check' in df.columns else False)
+
+        if self.family_cols_:
+            family = False
+            for c in self.family_cols_:
+                family = family | df[c]
+            out['family_flag'] = family
+        else:
+            out['family_flag'] = False
+
+        if 'tenure' in df.columns and 'MonthlyCharges' in df.columns:
+            out['tenure_x_monthly'] = df['tenure'] * df['MonthlyCharges']
+            out['charges_per_service'] = df['MonthlyCharges'] / (num_services + 1)
+        else:
+            out['tenure_x_monthly'] = np.nan
+            out['charges_per_service'] = np.nan
+
+        return pd.concat([df, pd.DataFrame(out, index=df.index)], axis=1)
+
+    def transform(self, df):
+        df = normalize_column_names(df)
+        missing = [c for c in self.input_columns_ if c not in df.columns]
+        if missing:
+            raise ValueError(f"Input is missing columns seen during fit: {missing}")
+        out = self._build(df[self.input_columns_])
+        # Pipelines saved before the cast map was recorded choose it per batch.
+        dtypes = getattr(self, 'output_dtypes_', None) or compact_bool_dtypes(out, self.bool_cols_)
+        strict = [c for c, dtype in dtypes.items() if dtype == 'uint8']
+        if strict:
+            has_na = out[strict].isna().any()
+            if has_na.any():
+                raise ValueError(f"Missing values in columns that had none during fit: {has_na[has_na].index.tolist()}")
+        out = out.astype(dtypes, copy=False)
+        if out['Churn_Label'].dtype == object:
+            out['Churn_Label'] = out['Churn_Label'].astype('category')
+        return out[self.output_columns_]
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
 if __name__ == "__main__":
-    df = pd.read_csv(INPUT_CSV)
-    df_feat = create_features(df)
-    df_feat.to_csv(OUTPUT_CSV, index=False)
-    print("Saved featured dataset to:", OUTPUT_CSV)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create churn features from the cleaned Telco dataset")
+    parser.add_argument('--input', default=INPUT_CSV, help="CSV, Parquet or .npds dataset directory")
+    parser.add_argument('--output', default=OUTPUT_CSV,
+                        help="a .npds path keeps the output dtypes (categoricals, uint8 flags) without a CSV round-trip")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="stream the input in chunks of this many rows instead of loading it whole")
+    parser.add_argument('--save-pipeline', default=None,
+                        help="also fit a FeaturePipeline on the input and save it (joblib) to this path")
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok = True)
+
+    if args.chunksize:
+        if not args.output.lower().endswith('.csv'):
+            parser.error("--chunksize appends CSV chunks; use a .csv --output")
+        stats = stream_features(args.input, args.output, args.chunksize)
+        print(f"Streamed {stats['rows']} rows in {stats['chunks']} chunks, peak RSS {stats['peak_rss_mb']:.0f} MB")
+    else:
+        df = load_frame(args.input)
+        df_feat = create_features(df)
+        save_frame(df_feat, args.output)
+    print("Saved featured dataset to:", args.output)
+
+    if args.save_pipeline:
+        FeaturePipeline().fit(load_frame(args.input)).save(args.save_pipeline)
+        print("Saved fitted feature pipeline to:", args.save_pipeline)
\ No newline at end of file
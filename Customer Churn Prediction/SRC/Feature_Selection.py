@@ -0,0 +1,173 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+
+from Dataset_IO import load_frame, save_frame
+
+INPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\Telco_Customer_Chern_Cleaned.csv"
+OUTPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\Telco_Customer_Churn_SelectedFeatures.csv"
+
+TARGET = 'Churn_Yes'
+IMPORTANCE_THRESHOLD = 0.005
+CORRELATION_THRESHOLD = 0.85
+
+def feature_importances(df, target=TARGET, random_state=42, n_jobs=-1):
+    # Trees are built in parallel; with a fixed random_state the importances
+    # are identical to a single-core fit.
+    features = [col for col in df.columns if col != target]
+    rf = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs)
+    rf.fit(df[features], df[target])
+    return pd.Series(rf.feature_importances_, index=features).sort_values(ascending=False)
+
+# The selection step of Telco_Data_Feature_Engineering.ipynb: drop every
+# feature whose RandomForest importance is below the threshold.
+def select_features(df, target=TARGET, threshold=IMPORTANCE_THRESHOLD, random_state=42, n_jobs=-1):
+    importances = feature_importances(df, target, random_state, n_jobs)
+    low_importance_features = importances[importances < threshold].index
+    return df.drop(columns=low_importance_features), importances
+
+def _standardized(df, dtype):
+    # Standardized columns with missing values set to 0, plus the mask of
+    # observed values (None when nothing is missing).
+    X = df.to_numpy(dtype=dtype, na_value=np.nan)
+    mean = np.nanmean(X, axis=0)
+    std = np.nanstd(X, axis=0, ddof=1)
+    constant = ~(std > 0)
+    std[constant] = 1
+    Z = (X - mean) / std
+    missing = np.isnan(Z)
+    Z[missing] = 0
+    Z[:, constant] = 0
+    return Z, (~missing).astype(dtype) if missing.any() else None
+
+def _pairwise_tile(Zi, Zj, Mi, Mj):
+    # Pearson over the rows where both columns are observed, as DataFrame.corr
+    # computes it, from sums over those rows. Standardizing first keeps the
+    # sums well conditioned and does not change the coefficient.
+    n = Mi.T @ Mj
+    si, sj = Zi.T @ Mj, Mi.T @ Zj
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = Zi.T @ Zj - si * sj / n
+        var = ((Zi * Zi).T @ Mj - si * si / n) * (Mi.T @ (Zj * Zj) - sj * sj / n)
+        return np.where(var > 0, cov / np.sqrt(var), np.nan)
+
+def high_correlation_pairs(df, threshold=CORRELATION_THRESHOLD, absolute=False, block_size=512, dtype=np.float64):
+    # Pearson correlation of every column pair, computed block by block as
+    # Z_i.T @ Z_j on standardized columns, keeping only pairs above the
+    # threshold. Memory stays at one block x block tile instead of the full
+    # p x p matrix plus its unstacked, sorted copy. absolute=False matches the
+    # notebook, which kept pairs with corr > threshold. Tiles touching columns
+    # with missing values use only the rows both columns have, like the
+    # pandas corr() this replaces.
+    columns = df.columns
+    Z, M = _standardized(df, dtype)
+    n, p = Z.shape
+    gappy = M is not None and (M == 0).any(axis=0)
+    found = []
+    for i in range(0, p, block_size):
+        Zi = Z[:, i:i + block_size]
+        for j in range(i, p, block_size):
+            Zj = Z[:, j:j + block_size]
+            if M is not None and (gappy[i:i + block_size].any() or gappy[j:j + block_size].any()):
+                tile = _pairwise_tile(Zi, Zj, M[:, i:i + block_size], M[:, j:j + block_size])
+            else:
+                tile = Zi.T @ Zj / (n - 1)
+            score = np.abs(tile) if absolute else tile
+            hits = score > threshold
+            if i == j:
+                hits &= np.triu(np.ones_like(hits), k=1)
+            a, b = np.nonzero(hits)
+            found.extend(zip(columns[a + i], columns[b + j], tile[a, b].tolist()))
+    found.sort(key=lambda pair: -abs(pair[2]))
+    return pd.DataFrame(found, columns=['feature_a', 'feature_b', 'correlation'])
+
+def _discretize(values, n_bins):
+    # Few distinct values are used as they are; continuous columns go into
+    # quantile bins (ties merge bins, so constant stretches never split).
+    finite = values[~np.isnan(values)]
+    uniques = np.unique(finite)
+    if len(uniques) <= n_bins:
+        codes = np.searchsorted(uniques, values)
+    else:
+        edges = np.unique(np.quantile(finite, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        codes = np.searchsorted(edges, values, side='right')
+    # Missing values get their own bin.
+    codes[np.isnan(values)] = codes.max(initial=0) + 1
+    return codes
+
+def _mi_block(X, y_codes, n_classes, n_bins):
+    scores = np.empty(X.shape[1])
+    p_y = np.bincount(y_codes, minlength=n_classes) / len(y_codes)
+    for k in range(X.shape[1]):
+        codes = _discretize(X[:, k], n_bins)
+        n_x = codes.max() + 1
+        joint = np.bincount(codes * n_classes + y_codes, minlength=n_x * n_classes).reshape(n_x, n_classes)
+        p_xy = joint / len(y_codes)
+        p_x = p_xy.sum(axis=1, keepdims=True)
+        nonzero = p_xy > 0
+        scores[k] = (p_xy[nonzero] * np.log(p_xy[nonzero] / (p_x * p_y)[nonzero])).sum()
+    return scores
+
+def mutual_information(df, target=TARGET, n_bins=32, sample_size=200_000, n_jobs=-1, block_size=64, random_state=42):
+    # Histogram estimate of I(feature; target) in nats, on at most sample_size
+    # rows, with blocks of columns scored in parallel. A fast stand-in for
+    # mutual_info_classif's k-nearest-neighbour estimator when ranking features.
+    features = [c for c in df.columns if c != target]
+    frame = df
+    if sample_size is not None and len(df) > sample_size:
+        frame = df.sample(sample_size, random_state=random_state)
+    y_codes, classes = pd.factorize(frame[target], sort=True)
+    X = frame[features].to_numpy(dtype=np.float64, na_value=np.nan)
+    blocks = [slice(i, i + block_size) for i in range(0, len(features), block_size)]
+    scores = Parallel(n_jobs=n_jobs)(delayed(_mi_block)(X[:, block], y_codes, len(classes), n_bins) for block in blocks)
+    return pd.Series(np.concatenate(scores), index=features).sort_values(ascending=False)
+
+def permutation_importances(df, target=TARGET, n_repeats=5, test_size=0.25, model=None, n_jobs=-1, random_state=42):
+    # Drop in held-out score when each feature is shuffled. Features are
+    # permuted in parallel; the model predicts single-threaded inside each worker.
+    features = [c for c in df.columns if c != target]
+    X_train, X_test, y_train, y_test = train_test_split(df[features], df[target], test_size=test_size,
+                                                        stratify=df[target], random_state=random_state)
+    if model is None:
+        model = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs).fit(X_train, y_train)
+    # A caller's model gets its own n_jobs back afterwards.
+    params = model.get_params()
+    if 'n_jobs' in params:
+        model.set_params(n_jobs=1)
+    try:
+        result = permutation_importance(model, X_test, y_test, n_repeats=n_repeats, n_jobs=n_jobs,
+                                        random_state=random_state)
+    finally:
+        if 'n_jobs' in params:
+            model.set_params(n_jobs=params['n_jobs'])
+    return pd.DataFrame({'importance_mean': result.importances_mean, 'importance_std': result.importances_std},
+                        index=features).sort_values('importance_mean', ascending=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drop low-importance features from the cleaned Telco dataset")
+    parser.add_argument('--input', default=INPUT_CSV)
+    parser.add_argument('--output', default=OUTPUT_CSV, help="CSV, Parquet or .npds dataset directory")
+    parser.add_argument('--threshold', type=float, default=IMPORTANCE_THRESHOLD)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--diagnostics', action='store_true',
+                        help="also print highly correlated pairs, mutual information and permutation importances")
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok = True)
+
+    df = load_frame(args.input)
+    if args.diagnostics:
+        features = df.drop(columns=[TARGET])
+        print(high_correlation_pairs(features))
+        print(mutual_information(df, n_jobs=args.n_jobs))
+        print(permutation_importances(df, n_jobs=args.n_jobs))
+
+    selected, importances = select_features(df, threshold=args.threshold, n_jobs=args.n_jobs)
+    print(importances)
+    save_frame(selected, args.output)
+    print("Saved selected features to:", args.output)
@@ -0,0 +1,336 @@
+import numpy as np
+import argparse
+import json
+import math
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import Batch_Scoring
+import Churn_Metrics
+from Batch_Scoring import ID_COLUMN, THRESHOLD, ChurnScorer
+from Forest_Engine import compile_forest
+from RandomForest import MODEL_FILE
+
+HOST = '127.0.0.1'
+PORT = 8765
+CACHE_SIZE = 100_000
+CACHE_TTL = 300
+
+def _normalize(name):
+    return name.strip().replace(' ','_').replace('(','').replace(')','')
+
+def _missing(v):
+    return v is None or (isinstance(v, float) and math.isnan(v))
+
+def _flag(v):
+    return bool(v) and not _missing(v)
+
+def _invert(v):
+    # pandas ~ on the column: logical not for booleans, bitwise not for integers.
+    return not v if isinstance(v, (bool, np.bool_)) else ~int(v)
+
+class RecordFeatures:
+    # FeaturePipeline.transform followed by feature_matrix for a single record
+    # (a dict), computed on plain Python values straight into the model's
+    # feature vector. Every lookup the pipeline does by column is resolved once
+    # here into a position in that vector.
+
+    def __init__(self, pipeline, features, target=None):
+        self.pipeline = pipeline
+        self.features = list(features)
+        self._position = {name: i for i, name in enumerate(self.features)}
+        self._target = target
+        self._input_columns = pipeline.input_columns_ if pipeline is not None else None
+
+    def _set(self, vector, name, value):
+        # Text values become their get_dummies column; numbers go in as they are.
+        if isinstance(value, str):
+            i = self._position.get(f"{name}_{value}")
+            if i is not None:
+                vector[i] = 1.0
+            return
+        i = self._position.get(name)
+        if i is not None:
+            vector[i] = np.nan if value is None else value
+
+    def vector(self, record):
+        vector = np.zeros(len(self.features))
+        if self.pipeline is None:
+            # Models trained without the pipeline keep feature_matrix's raw column names.
+            for name, value in record.items():
+                if name not in (self._target, ID_COLUMN, 'Churn_Label'):
+                    self._set(vector, name, value)
+            return vector
+
+        record = {_normalize(k): v for k, v in record.items()}
+        missing = [c for c in self._input_columns if c not in record]
+        if missing:
+            raise ValueError(f"Input is missing columns seen during fit: {missing}")
+        for c in self._input_columns:
+            if c not in (self._target, ID_COLUMN, 'Churn_Label'):
+                self._set(vector, c, record[c])
+        for name, value in self._engineered(record).items():
+            self._set(vector, name, value)
+        return vector
+
+    def _engineered(self, r):
+        p = self.pipeline
+        out = {}
+        tenure = r.get('tenure')
+
+        if 'TotalCharges' in r and tenure is not None:
+            if not _missing(tenure) and tenure > 0:
+                out['avg_charges_per_month'] = r['TotalCharges'] / tenure
+            else:
+                out['avg_charges_per_month'] = r.get('MonthlyCharges', np.nan)
+        else:
+            out['avg_charges_per_month'] = np.nan
+
+        if p.tenure_bins_ is not None:
+            kind, edges, labels = p.tenure_bins_
+            if not _missing(tenure):
+                if kind == 'fixed':
+                    code = bisect_right(edges, tenure) - 1 if tenure >= edges[0] else -1
+                else:
+                    code = bisect_left(edges[1:-1], tenure)
+                if 0 <= code < len(labels):
+                    out['tenure_group'] = labels[code]
+        elif tenure is not None:
+            out['tenure_group'] = np.nan
+
+        num_services = 0
+        for c in p.service_cols_:
+            v = r[c]
+            if isinstance(v, str):
+                num_services += v == 'Yes'
+            elif not _missing(v):
+                num_services += v
+        out['num_services'] = num_services
+
+        kind = p.internet_plan_[0]
+        if kind == 'dummies':
+            _, internet_cols, no_col, fiber_col = p.internet_plan_
+            out['has_internet'] = _invert(r[no_col]) if no_col else any(_flag(r[c]) for c in internet_cols)
+            out['is_fiber'] = r[fiber_col] if fiber_col else False
+        elif kind == 'raw':
+            label = str(r['InternetService']).lower()
+            out['has_internet'] = label != 'no'
+            out['is_fiber'] = label == 'fiber optic'
+        else:
+            out['has_internet'] = False
+            out['is_fiber'] = False
+
+        kind = p.contract_plan_[0]
+        if kind == 'dummies':
+            _, long_cols, has_term = p.contract_plan_
+            out['long_term_contract'] = any(_flag(r[c]) for c in long_cols)
+            if has_term:
+                if _flag(r.get('Contract_Two_year', False)):
+                    out['contract_term'] = 'Two year'
+                elif _flag(r.get('Contract_One_year', False)):
+                    out['contract_term'] = 'One year'
+                else:
+                    out['contract_term'] = 'Month-to-month'
+        elif kind == 'raw':
+            out['long_term_contract'] = 'year' in str(r['Contract'])
+        else:
+            out['long_term_contract'] = False
+
+        autopay = r[p.autopay_col_] if p.autopay_col_ else False
+        out['is_autopay'] = False if _missing(autopay) else autopay
+        check = r.get('PaymentMethod_Electronic_check', False)
+        out['is_electronic_check'] = False if _missing(check) else check
+
+        family = False
+        for c in p.family_cols_:
+            family = family | r[c]
+        out['family_flag'] = family
+
+        if tenure is not None and 'MonthlyCharges' in r:
+            out['tenure_x_monthly'] = tenure * r['MonthlyCharges']
+            out['charges_per_service'] = r['MonthlyCharges'] / (num_services + 1)
+        else:
+            out['tenure_x_monthly'] = np.nan
+            out['charges_per_service'] = np.nan
+        return out
+
+class ScoreCache:
+    # LRU of recent scores keyed by customer ID. An entry is served while it is
+    # younger than ttl and was computed from the same record (or the request
+    # only names the customer); anything else is rescored.
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self._entries = OrderedDict()
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, fingerprint=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, stored_fingerprint, value = entry
+                if expires <= self._clock():
+                    del self._entries[key]
+                elif fingerprint is None or fingerprint == stored_fingerprint:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, fingerprint, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, fingerprint, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def evict_expired(self):
+        now = self._clock()
+        with self._lock:
+            expired = [k for k, (expires, _, _) in self._entries.items() if expires <= now]
+            for k in expired:
+                del self._entries[k]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+class OnlineScorer:
+    def __init__(self, model_path, threshold=THRESHOLD, cache_size=CACHE_SIZE, cache_ttl=CACHE_TTL, forest_path=None):
+        self._scorer = ChurnScorer(model_path, threshold, forest_path=forest_path)
+        # One row walks every tree at once in the compiled forest, which gives
+        # the same probabilities as the model without its per-tree dispatch.
+        if forest_path:
+            self._forest = self._scorer.model
+        else:
+            self._forest = compile_forest(self._scorer.model, features=self._scorer.features)
+        self.features = RecordFeatures(self._scorer.pipeline, self._scorer.features, self._scorer.target)
+        self.cache = ScoreCache(cache_size, cache_ttl)
+        self.threshold = threshold
+
+    def score_record(self, record):
+        hook = Batch_Scoring.score_hook
+        start = time.perf_counter() if hook is not None else 0.0
+        X = self.features.vector(record).reshape(1, -1)
+        probability = float(self._forest.predict_proba(X)[0, 1])
+        if hook is not None:
+            hook('online', 1, time.perf_counter() - start)
+        return probability
+
+    def score(self, record):
+        customer_id = record.get(ID_COLUMN)
+        fingerprint = None
+        if customer_id is not None:
+            # Serialized rather than hashed as a tuple: a float NaN hashes by
+            # identity, so a record with a missing value would never match.
+            fingerprint = hash(json.dumps({k: v for k, v in record.items() if k != ID_COLUMN},
+                                          sort_keys=True, default=str))
+            cached = self.cache.get(customer_id, fingerprint)
+            if cached is not None:
+                return cached, True
+        probability = self.score_record(record)
+        if customer_id is not None:
+            self.cache.put(customer_id, fingerprint, probability)
+        return probability, False
+
+    def cached(self, customer_id):
+        return self.cache.get(customer_id)
+
+    def response(self, probability, customer_id=None, cached=False):
+        return {ID_COLUMN: customer_id, 'churn_probability': probability,
+                'churn_prediction': int(probability >= self.threshold), 'cached': cached}
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    # POST /score with one record (or a list) as JSON; GET /score/<customerID>
+    # answers from the cache; GET /health reports cache counters; GET /metrics
+    # serves Prometheus metrics while Churn_Metrics is enabled.
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path != '/score':
+            return self._reply(404, {'error': 'not found'})
+        scorer = self.server.scorer
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            records = payload if isinstance(payload, list) else [payload]
+            results = []
+            for record in records:
+                if not isinstance(record, dict):
+                    raise TypeError(f"expected a JSON object per record, got {type(record).__name__}")
+                probability, cached = scorer.score(record)
+                results.append(scorer.response(probability, record.get(ID_COLUMN), cached))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {'error': str(e)})
+        self._reply(200, results if isinstance(payload, list) else results[0])
+
+    def do_GET(self):
+        scorer = self.server.scorer
+        if self.path == '/health':
+            cache = scorer.cache
+            return self._reply(200, {'status': 'ok', 'cache_size': len(cache),
+                                     'cache_hits': cache.hits, 'cache_misses': cache.misses})
+        if self.path == '/metrics' and Churn_Metrics.active is not None:
+            body = Churn_Metrics.active.exposition()
+            self.send_response(200)
+            self.send_header('Content-Type', Churn_Metrics.CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path.startswith('/score/'):
+            customer_id = unquote(self.path[len('/score/'):])
+            probability = scorer.cached(customer_id)
+            if probability is None:
+                return self._reply(404, {'error': f"no recent score for {customer_id}"})
+            return self._reply(200, scorer.response(probability, customer_id, True))
+        self._reply(404, {'error': 'not found'})
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(scorer, host=HOST, port=PORT):
+    server = ThreadingHTTPServer((host, port), _ScoringHandler)
+    server.daemon_threads = True
+    server.scorer = scorer
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve churn scores over HTTP from a resident model")
+    parser.add_argument('--model', default=MODEL_FILE)
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE)
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL, help="seconds a cached score stays valid")
+    parser.add_argument('--forest', default=None, help="forest compiled by Forest_Engine.py (default: compile at startup)")
+    parser.add_argument('--metrics', action='store_true', help="record Prometheus metrics and serve them at /metrics")
+    args = parser.parse_args()
+    if args.metrics:
+        Churn_Metrics.enable()
+
+    scorer = OnlineScorer(args.model, args.threshold, args.cache_size, args.cache_ttl, args.forest)
+    server = make_server(scorer, args.host, args.port)
+    print(f"Scoring on http://{args.host}:{server.server_address[1]}/score")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
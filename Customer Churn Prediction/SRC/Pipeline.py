@@ -0,0 +1,255 @@
+import pandas as pd
+import numpy as np
+import argparse
+import contextlib
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+
+import sklearn
+
+import Dataset_IO
+import EDA_Statistics
+import Feature_Engineering
+import Feature_Selection
+import Preprocessing
+import RandomForest
+from Dataset_IO import content_digest, load_frame, save_frame
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every path is relative to the project unless the config says otherwise,
+# so the same config runs on Windows and Linux.
+DEFAULT_CONFIG = {
+    'raw_input': os.path.join(PROJECT_DIR, 'Data', 'WA_Fn-UseC_-Telco-Customer-Churn.csv'),
+    'work_dir': os.path.join(PROJECT_DIR, 'Data', 'pipeline'),
+    'stages': {
+        # 'chunksize': N cleans with Preprocessing.StreamingPreprocessor instead.
+        'cleaned': {'iqr_factor': 1.5},
+        'featured': {},
+        # 'cleaned' reproduces the notebook, which selected on the cleaned columns.
+        'selected': {'source': 'featured', 'threshold': Feature_Selection.IMPORTANCE_THRESHOLD},
+        'trained': {'cv': 5, 'n_iter': None, 'max_trees': 1000, 'n_jobs': -1},
+    },
+}
+
+def _clean(inputs, out_dir, params):
+    if params.get('chunksize'):
+        # Streaming keeps raw numeric columns next to <col>_scaled copies and
+        # saves the fitted state beside the output for later exports.
+        output = os.path.join(out_dir, 'cleaned.csv')
+        preprocessor, _ = Preprocessing.load_or_fit(inputs['raw'], os.path.join(out_dir, 'preprocessor.joblib'),
+                                                    params['chunksize'], params.get('iqr_factor', 1.5))
+        stats = Preprocessing.stream_clean(inputs['raw'], output, preprocessor, params['chunksize'])
+        return output, {'rows': stats['rows'], 'kept': stats['kept']}
+    output = os.path.join(out_dir, 'cleaned.npds')
+    save_frame(Preprocessing.clean_dataset(load_frame(inputs['raw']), params.get('iqr_factor', 1.5)), output)
+    return output, {}
+
+def _featurize(inputs, out_dir, params):
+    output = os.path.join(out_dir, 'featured.npds')
+    with contextlib.redirect_stdout(sys.stderr):
+        save_frame(Feature_Engineering.create_features(load_frame(inputs['cleaned'])), output)
+    return output, {}
+
+def _select(inputs, out_dir, params):
+    source = params.get('source', 'featured')
+    df = load_frame(inputs[source])
+    target = Feature_Selection.TARGET
+    if source == 'featured':
+        # Categorical outputs (tenure_group, contract_term) enter as their model dummies.
+        df = RandomForest.feature_matrix(df, target).assign(**{target: df[target]})
+    selected, importances = Feature_Selection.select_features(
+        df, target, params.get('threshold', Feature_Selection.IMPORTANCE_THRESHOLD))
+    output = os.path.join(out_dir, 'selected.npds')
+    save_frame(selected, output)
+    return output, {'kept': selected.shape[1] - 1, 'dropped': len(importances) - selected.shape[1] + 1}
+
+def _train(inputs, out_dir, params):
+    X, y = RandomForest.load_training_data(inputs['selected'])
+    search = RandomForest.search_hyperparameters(X, y, cv=params.get('cv', 5), n_iter=params.get('n_iter'),
+                                                 n_jobs=params.get('n_jobs', -1))
+    model, growth = RandomForest.grow_forest(X, y, search.best_params_, max_trees=params.get('max_trees', 1000),
+                                             n_jobs=params.get('n_jobs', -1))
+    output = os.path.join(out_dir, 'model.joblib')
+    RandomForest.save_model(output, model, X.columns, target=RandomForest.TARGET, best_params=search.best_params_,
+                            cv_score=search.best_score_, oob_history=growth['history'])
+    return output, {'cv_score': search.best_score_, 'best_params': search.best_params_,
+                    'n_estimators': model.n_estimators}
+
+class Stage:
+    __slots__ = ('name', 'run', 'modules', '_inputs')
+
+    def __init__(self, name, inputs, run, modules):
+        self.name = name
+        self._inputs = inputs
+        self.run = run
+        self.modules = modules
+
+    def inputs(self, params):
+        return self._inputs(params) if callable(self._inputs) else self._inputs
+
+    def code_digest(self):
+        # The stage function plus every module whose code decides its output.
+        digest = hashlib.sha256(inspect.getsource(self.run).encode('utf-8'))
+        for module in self.modules:
+            with open(module.__file__, 'rb') as file:
+                digest.update(file.read())
+        return digest.hexdigest()
+
+STAGES = [
+    Stage('cleaned', ['raw'], _clean, [Preprocessing, EDA_Statistics, Dataset_IO]),
+    Stage('featured', ['cleaned'], _featurize, [Feature_Engineering, Dataset_IO]),
+    Stage('selected', lambda params: [params.get('source', 'featured')], _select,
+          [Feature_Selection, RandomForest, Dataset_IO]),
+    Stage('trained', ['selected'], _train, [RandomForest, Dataset_IO]),
+]
+STAGE_NAMES = [s.name for s in STAGES]
+
+LIBRARY_VERSIONS = {'pandas': pd.__version__, 'numpy': np.__version__, 'scikit-learn': sklearn.__version__}
+
+class PipelineRunner:
+    # Stage outputs live in work_dir/<stage>/<key>/, where key hashes the
+    # stage's code, its parameters, library versions and the content hash of
+    # each input. A stage whose key already has a manifest is not re-run, and
+    # because keys use output content, a change that leaves an output
+    # byte-identical stops invalidation there.
+
+    def __init__(self, config=None):
+        self.config = merge_config(DEFAULT_CONFIG, config or {})
+        self.work_dir = self.config['work_dir']
+
+    def _raw_digest(self, path):
+        # Raw inputs can be large; reuse the last hash while size and mtime are unchanged.
+        cache_file = os.path.join(self.work_dir, 'raw_hashes.json')
+        cache = {}
+        if os.path.exists(cache_file):
+            with open(cache_file, 'r') as file:
+                cache = json.load(file)
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = cache.get(os.path.abspath(path))
+        if entry is not None and entry['signature'] == signature:
+            return entry['hash']
+        digest = content_digest(path)
+        cache[os.path.abspath(path)] = {'signature': signature, 'hash': digest}
+        with open(cache_file, 'w') as file:
+            json.dump(cache, file, indent=4)
+        return digest
+
+    def stage_key(self, stage, params, input_hashes):
+        payload = {'stage': stage.name, 'code': stage.code_digest(), 'params': params,
+                   'libraries': LIBRARY_VERSIONS, 'inputs': input_hashes}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def run(self, until=None, force=()):
+        os.makedirs(self.work_dir, exist_ok = True)
+        last = STAGE_NAMES.index(until) if until else len(STAGES) - 1
+        raw = self.config['raw_input']
+        results = {'raw': {'path': raw, 'hash': self._raw_digest(raw)}}
+        report = {'started': time.strftime('%Y-%m-%dT%H:%M:%S'), 'stages': []}
+
+        for stage in STAGES[:last + 1]:
+            params = self.config['stages'].get(stage.name, {})
+            start = time.perf_counter()
+            input_names = stage.inputs(params)
+            missing = [n for n in input_names if n not in results]
+            if missing:
+                raise ValueError(f"Stage {stage.name!r} reads {missing}, which is not an earlier stage")
+            key = self.stage_key(stage, params, {n: results[n]['hash'] for n in input_names})
+            stage_dir = os.path.join(self.work_dir, stage.name, key[:16])
+            manifest_file = os.path.join(stage_dir, 'manifest.json')
+
+            if os.path.exists(manifest_file) and stage.name not in force:
+                with open(manifest_file, 'r') as file:
+                    manifest = json.load(file)
+                status = 'cached'
+            else:
+                manifest = self._execute(stage, params, {n: results[n]['path'] for n in input_names}, key, stage_dir)
+                status = 'ran'
+
+            seconds = time.perf_counter() - start
+            results[stage.name] = {'path': os.path.join(stage_dir, manifest['output']), 'hash': manifest['output_hash']}
+            report['stages'].append({'stage': stage.name, 'status': status, 'seconds': seconds, 'key': key,
+                                     'output': results[stage.name]['path'],
+                                     'run_seconds': manifest['run_seconds'], 'info': manifest['info']})
+
+        report['total_seconds'] = sum(s['seconds'] for s in report['stages'])
+        runs_dir = os.path.join(self.work_dir, 'runs')
+        os.makedirs(runs_dir, exist_ok = True)
+        with open(os.path.join(runs_dir, time.strftime('%Y%m%d-%H%M%S') + '.json'), 'w') as file:
+            json.dump(report, file, indent=4, default=str)
+        return report
+
+    def _execute(self, stage, params, input_paths, key, stage_dir):
+        tmp_dir = stage_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        start = time.perf_counter()
+        output, info = stage.run(input_paths, tmp_dir, params)
+        run_seconds = time.perf_counter() - start
+        manifest = {'stage': stage.name, 'key': key, 'params': params, 'inputs': input_paths,
+                    'output': os.path.relpath(output, tmp_dir), 'output_hash': content_digest(output),
+                    'run_seconds': run_seconds, 'info': info,
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as file:
+            json.dump(manifest, file, indent=4, default=str)
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        os.replace(tmp_dir, stage_dir)
+        return manifest
+
+    def prune(self, report):
+        # Drop cached outputs that the given run did not use.
+        keep = {(s['stage'], s['key'][:16]) for s in report['stages']}
+        removed = 0
+        for stage in STAGE_NAMES:
+            stage_root = os.path.join(self.work_dir, stage)
+            if not os.path.isdir(stage_root):
+                continue
+            for entry in os.listdir(stage_root):
+                if (stage, entry) not in keep:
+                    shutil.rmtree(os.path.join(stage_root, entry), ignore_errors=True)
+                    removed += 1
+        return removed
+
+def merge_config(base, override):
+    merged = dict(base)
+    for k, v in override.items():
+        merged[k] = merge_config(base[k], v) if isinstance(v, dict) and isinstance(base.get(k), dict) else v
+    return merged
+
+def print_report(report):
+    print(f"{'stage':<10} {'status':<7} {'seconds':>9} {'built in':>9}  output")
+    for s in report['stages']:
+        print(f"{s['stage']:<10} {s['status']:<7} {s['seconds']:>9.2f} {s['run_seconds']:>9.2f}  {s['output']}")
+    print(f"total {report['total_seconds']:.2f} s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run raw -> cleaned -> featured -> selected -> trained, "
+                                                 "re-running only stages whose inputs, code or parameters changed")
+    parser.add_argument('--config', default=None, help="JSON file overriding DEFAULT_CONFIG")
+    parser.add_argument('--raw-input', default=None)
+    parser.add_argument('--work-dir', default=None)
+    parser.add_argument('--until', choices=STAGE_NAMES, default=None, help="stop after this stage")
+    parser.add_argument('--force', choices=STAGE_NAMES, nargs='*', default=[], help="re-run these stages anyway")
+    parser.add_argument('--prune', action='store_true', help="delete cached outputs this run did not use")
+    args = parser.parse_args()
+
+    config = {}
+    if args.config:
+        with open(args.config, 'r') as file:
+            config = json.load(file)
+    if args.raw_input:
+        config['raw_input'] = args.raw_input
+    if args.work_dir:
+        config['work_dir'] = args.work_dir
+
+    runner = PipelineRunner(config)
+    report = runner.run(args.until, set(args.force))
+    print_report(report)
+    if args.prune:
+        print(f"Pruned {runner.prune(report)} unused cached outputs")
@@ -0,0 +1,242 @@
+import pandas as pd
+import numpy as np
+import argparse
+import joblib
+import os
+
+import psutil
+from sklearn.preprocessing import StandardScaler
+
+from Dataset_IO import content_digest, iter_chunks, load_frame, save_frame
+from EDA_Statistics import StreamingHistogram
+
+INPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\WA_Fn-UseC_-Telco-Customer-Churn.csv"
+OUTPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\Telco_Customer_Chern_Cleaned.csv"
+
+STATE_FILE = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Models\Telco_Preprocessor.joblib"
+
+NUM_COLUMNS = ['tenure','MonthlyCharges','TotalCharges']
+ID_COLUMN = 'customerID'
+SCALED_SUFFIX = '_scaled'
+# Distinct values kept exactly per column before quantiles fall back to
+# bins; the Telco export has ~6.5k distinct TotalCharges, so its median and
+# quartiles are exact.
+QUANTILE_BINS = 1 << 16
+
+# The steps of Telco_Data_Preprocessing.ipynb; on the raw Kaggle CSV the
+# output is byte-identical to the committed Telco_Customer_Chern_Cleaned.csv.
+def clean_dataset(dataFrame, iqr_factor=1.5):
+    dataFrame = dataFrame.drop(columns = ['customerID'])
+    dataFrame['TotalCharges'] = pd.to_numeric(dataFrame['TotalCharges'], errors = 'coerce')
+    dataFrame['TotalCharges'] = dataFrame['TotalCharges'].fillna(dataFrame['TotalCharges'].median())
+    dataFrame['SeniorCitizen'] = dataFrame['SeniorCitizen'].astype(int)
+    dataFrame = pd.get_dummies(dataFrame, drop_first = True)
+
+    scaler = StandardScaler()
+    dataFrame[NUM_COLUMNS] = scaler.fit_transform(dataFrame[NUM_COLUMNS])
+
+    Q1 = dataFrame[NUM_COLUMNS].quantile(0.25)
+    Q3 = dataFrame[NUM_COLUMNS].quantile(0.75)
+    IQR = Q3 - Q1
+    outliers = ((dataFrame[NUM_COLUMNS] < (Q1 - (iqr_factor * IQR))) | (dataFrame[NUM_COLUMNS] > (Q3 + (iqr_factor * IQR)))).any(axis = 1)
+    return dataFrame[~outliers]
+
+class StreamingPreprocessor:
+    # clean_dataset split into partial_fit over chunks of a raw export and a
+    # per-chunk transform, so exports of any size clean in bounded memory.
+    # partial_fit keeps only summaries: the categories seen per text column,
+    # StandardScaler.partial_fit statistics, and a StreamingHistogram per
+    # numeric column for the TotalCharges median and the IQR fences.
+    #
+    # transform emits the raw numeric columns under their own names with a
+    # <col>_scaled copy next to each, so create_features works on raw values;
+    # dummies follow as pd.get_dummies(drop_first=True) lays them out. Missing
+    # TotalCharges count as the median in the scaling statistics and
+    # quartiles, as with the notebook's fillna. Standardizing is monotone, so
+    # fences on raw values drop the rows the notebook drops on scaled ones.
+    # Categories first seen after fitting get all-zero dummies.
+    #
+    # load_or_fit records the content digest of the input it fitted on, so a
+    # saved state is only reused for that same export and iqr_factor.
+
+    def __init__(self, iqr_factor=1.5):
+        self.iqr_factor = iqr_factor
+        self.input_columns_ = None
+        self.vocabularies_ = {}
+        self.scaler_ = StandardScaler()
+        self.histograms_ = {c: StreamingHistogram(QUANTILE_BINS) for c in NUM_COLUMNS}
+        self.n_missing_ = 0
+        self.rows_seen_ = 0
+        self.plan_ = None
+        self.input_digest_ = None
+
+    @staticmethod
+    def _numbers(chunk):
+        return pd.DataFrame({c: pd.to_numeric(chunk[c], errors='coerce') for c in NUM_COLUMNS}, index=chunk.index)
+
+    def partial_fit(self, chunk):
+        chunk = chunk.drop(columns=[ID_COLUMN], errors='ignore')
+        if self.input_columns_ is None:
+            self.input_columns_ = list(chunk.columns)
+            self.vocabularies_ = {c: set() for c in chunk.columns
+                                  if c not in NUM_COLUMNS and not pd.api.types.is_numeric_dtype(chunk[c])}
+        for c, vocabulary in self.vocabularies_.items():
+            vocabulary.update(chunk[c].dropna().unique().tolist())
+
+        numbers = self._numbers(chunk)
+        self.scaler_.partial_fit(numbers.to_numpy(dtype=float))
+        for c in NUM_COLUMNS:
+            self.histograms_[c].update(numbers[c].to_numpy(dtype=float))
+        self.n_missing_ += int(numbers['TotalCharges'].isna().sum())
+        self.rows_seen_ += len(chunk)
+        self.plan_ = None
+        return self
+
+    def fit(self, chunks):
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    @property
+    def fill_value_(self):
+        return self.histograms_['TotalCharges'].quantile(0.5)
+
+    def _filled_histogram(self, column):
+        hist = self.histograms_[column]
+        if column != 'TotalCharges' or not self.n_missing_:
+            return hist
+        hist = hist.copy()
+        hist.update(np.full(self.n_missing_, self.fill_value_))
+        return hist
+
+    def scaling(self):
+        # (mean, scale) per NUM_COLUMNS, with the n_missing_ filled TotalCharges
+        # folded into the scaler's running statistics.
+        mean, var = self.scaler_.mean_.copy(), self.scaler_.var_.copy()
+        n = np.broadcast_to(self.scaler_.n_samples_seen_, mean.shape).astype(float)
+        i = NUM_COLUMNS.index('TotalCharges')
+        if self.n_missing_:
+            fill, m = self.fill_value_, self.n_missing_
+            total = n[i] + m
+            delta = fill - mean[i]
+            mean[i] += delta * m / total
+            var[i] = (var[i] * n[i] + delta * delta * n[i] * m / total) / total
+        scale = np.sqrt(var)
+        scale[scale == 0] = 1.0
+        return mean, scale
+
+    def fences(self):
+        low, high = [], []
+        for c in NUM_COLUMNS:
+            hist = self._filled_histogram(c)
+            q1, q3 = hist.quantile(0.25), hist.quantile(0.75)
+            low.append(q1 - self.iqr_factor * (q3 - q1))
+            high.append(q3 + self.iqr_factor * (q3 - q1))
+        return np.array(low), np.array(high)
+
+    def _plan(self):
+        # Category order and the derived statistics, frozen until the next
+        # partial_fit so each transformed chunk only applies them.
+        if self.plan_ is None:
+            mean, scale = self.scaling()
+            low, high = self.fences()
+            self.plan_ = {'categories': {c: sorted(v) for c, v in self.vocabularies_.items()},
+                          'mean': mean, 'scale': scale, 'low': low, 'high': high, 'fill': self.fill_value_}
+        return self.plan_
+
+    def transform(self, chunk):
+        plan = self._plan()
+        missing = [c for c in self.input_columns_ if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Input is missing columns seen during fit: {missing}")
+        numbers = self._numbers(chunk)
+        numbers['TotalCharges'] = numbers['TotalCharges'].fillna(plan['fill'])
+        values = numbers.to_numpy(dtype=float)
+        scaled = (values - plan['mean']) / plan['scale']
+
+        out = {}
+        for c in self.input_columns_:
+            if c in plan['categories']:
+                continue
+            if c in NUM_COLUMNS:
+                out[c] = numbers[c]
+                out[c + SCALED_SUFFIX] = scaled[:, NUM_COLUMNS.index(c)]
+            elif c == 'SeniorCitizen':
+                out[c] = chunk[c].astype(int)
+            else:
+                out[c] = chunk[c]
+        for c, categories in plan['categories'].items():
+            codes = pd.Categorical(chunk[c], categories=categories).codes
+            for code, category in enumerate(categories[1:], start=1):
+                out[f"{c}_{category}"] = codes == code
+
+        # NaN tenure or MonthlyCharges compare False and stay, as in clean_dataset.
+        outliers = ((values < plan['low']) | (values > plan['high'])).any(axis=1)
+        return pd.DataFrame(out, index=chunk.index)[~outliers]
+
+    def fitted_on(self, input_digest, iqr_factor):
+        # States saved before digests were recorded never match.
+        return getattr(self, 'input_digest_', None) == input_digest and self.iqr_factor == iqr_factor
+
+    def save(self, path):
+        self._plan()
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+def load_or_fit(input_path, state_path=None, chunksize=100_000, iqr_factor=1.5, refit=False):
+    # A saved state is reused only when it was fitted on input with the same
+    # content and with the same iqr_factor; otherwise (or with refit) the
+    # input is fitted again and the state overwritten. Hashing the input is
+    # one read of its bytes, far less than parsing it for a fit.
+    digest = content_digest(input_path) if state_path else None
+    if state_path and os.path.exists(state_path) and not refit:
+        preprocessor = StreamingPreprocessor.load(state_path)
+        if preprocessor.fitted_on(digest, iqr_factor):
+            return preprocessor, False
+    preprocessor = StreamingPreprocessor(iqr_factor).fit(iter_chunks(input_path, chunksize))
+    preprocessor.input_digest_ = digest
+    if state_path:
+        preprocessor.save(state_path)
+    return preprocessor, True
+
+def stream_clean(input_path, output_csv, preprocessor, chunksize=100_000):
+    # Appends each transformed chunk to the output CSV.
+    process = psutil.Process()
+    peak_rss = process.memory_info().rss
+    rows = kept = 0
+    for n, chunk in enumerate(iter_chunks(input_path, chunksize)):
+        cleaned = preprocessor.transform(chunk)
+        cleaned.to_csv(output_csv, index=False, mode='w' if n == 0 else 'a', header=(n == 0))
+        rows += len(chunk)
+        kept += len(cleaned)
+        peak_rss = max(peak_rss, process.memory_info().rss)
+    return {'rows': rows, 'kept': kept, 'peak_rss_mb': peak_rss / 2**20}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the raw Telco churn dataset")
+    parser.add_argument('--input', default=INPUT_CSV)
+    parser.add_argument('--output', default=OUTPUT_CSV, help="CSV, Parquet or .npds dataset directory")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="clean in chunks of this many rows with a StreamingPreprocessor (CSV output); "
+                             "the output keeps raw numeric columns next to <col>_scaled ones")
+    parser.add_argument('--state', default=STATE_FILE,
+                        help="fitted StreamingPreprocessor (joblib), reused when it was fitted on this same input")
+    parser.add_argument('--refit', action='store_true', help="fit the state again even if it exists")
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok = True)
+
+    if args.chunksize:
+        if not args.output.lower().endswith('.csv'):
+            parser.error("--chunksize appends CSV chunks; use a .csv --output")
+        os.makedirs(os.path.dirname(args.state) or '.', exist_ok = True)
+        preprocessor, fitted = load_or_fit(args.input, args.state, args.chunksize, refit=args.refit)
+        print(("Fitted" if fitted else "Reused") + f" preprocessing state ({preprocessor.rows_seen_} rows):",
+              args.state)
+        stats = stream_clean(args.input, args.output, preprocessor, args.chunksize)
+        print(f"Cleaned {stats['rows']} rows ({stats['kept']} kept), peak RSS {stats['peak_rss_mb']:.0f} MB")
+    else:
+        save_frame(clean_dataset(load_frame(args.input)), args.output)
+    print("Saved cleaned dataset to:", args.output)
@@ -0,0 +1,188 @@
+import pandas as pd
+import numpy as np
+import joblib
+import argparse
+import os
+import time
+import warnings
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold
+from sklearn.utils.class_weight import compute_class_weight
+from threadpoolctl import threadpool_limits
+
+from Dataset_IO import load_frame
+from Feature_Engineering import FeaturePipeline
+
+INPUT_CSV = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Data\Telco_Customer_Churn_SelectedFeatures.csv"
+MODEL_DIR = r"D:\Programming Projects\PROJECTS_\Customer Churn Prediction\Models"
+MODEL_FILE = os.path.join(MODEL_DIR, "RandomForest_Churn.joblib")
+
+TARGET = 'Churn_Yes'
+RANDOM_STATE = 42
+
+# n_estimators is not searched: the tree count is grown afterwards with
+# warm_start and stopped on the OOB score.
+PARAM_GRID = {
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 5, 20],
+    'max_features': ['sqrt', 0.5],
+    'class_weight': [None, 'balanced'],
+}
+SEARCH_TREES = 200
+
+def feature_matrix(df, target=TARGET, features=None):
+    # Model inputs from a SelectedFeatures or featured frame. Churn_Label is the
+    # target again as text; customerID carries no signal. With `features` the
+    # result is aligned to the training columns (unseen dummies dropped, missing ones 0).
+    X = df.drop(columns=[c for c in [target, 'Churn_Label', 'customerID'] if c in df.columns])
+    text_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
+    if text_cols:
+        X = pd.get_dummies(X, columns=text_cols, dtype=np.uint8)
+    if features is not None:
+        X = X.reindex(columns=features, fill_value=0)
+    return X
+
+def load_training_data(input_csv, target=TARGET, pipeline=None):
+    # Works on the SelectedFeatures CSV and on Feature_Engineering's featured output.
+    # With a FeaturePipeline the input is engineered first; the pipeline never sees
+    # the target, so it can later be applied to unlabelled rows.
+    df = load_frame(input_csv)
+    if target not in df.columns:
+        raise ValueError(f"{input_csv} has no target column {target!r}")
+    y = df[target].astype(np.uint8)
+    if pipeline is not None:
+        df = pipeline.fit_transform(df.drop(columns=[c for c in [target, 'customerID'] if c in df.columns]))
+    return feature_matrix(df, target), y
+
+def save_model(path, model, features, pipeline=None, **info):
+    # Uncompressed, so load_model can memory-map the numpy arrays.
+    joblib.dump(dict(info, model=model, features=list(features), pipeline=pipeline), path)
+
+def load_model(path, mmap_mode='r'):
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+def core_counts(n_cores=None):
+    n_cores = n_cores or joblib.cpu_count()
+    counts = [1]
+    while counts[-1] * 2 < n_cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != n_cores:
+        counts.append(n_cores)
+    return counts
+
+def search_hyperparameters(X, y, param_grid=PARAM_GRID, cv=5, n_iter=None, scoring='roc_auc',
+                           n_jobs=-1, n_estimators=SEARCH_TREES, random_state=RANDOM_STATE):
+    # Parallelism sits at the search level (one candidate/fold per worker) with
+    # single-threaded forests and BLAS inside each worker, so N cores run N
+    # fits instead of N*N threads fighting over them.
+    base = RandomForestClassifier(n_estimators=n_estimators, n_jobs=1, random_state=random_state)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    if n_iter:
+        search = RandomizedSearchCV(base, param_grid, n_iter=n_iter, scoring=scoring, cv=folds,
+                                    n_jobs=n_jobs, random_state=random_state)
+    else:
+        search = GridSearchCV(base, param_grid, scoring=scoring, cv=folds, n_jobs=n_jobs)
+    with threadpool_limits(limits=1):
+        search.fit(X, y)
+    return search
+
+def grow_forest(X, y, params=None, step=25, max_trees=1000, patience=3, tol=1e-4,
+                n_jobs=-1, random_state=RANDOM_STATE):
+    # Adds `step` trees at a time to the same forest and stops once the OOB
+    # score has not improved by more than tol for `patience` rounds. Warm
+    # starts only append trees, so the returned model is cut back to the
+    # first best_n_estimators of them: the forest that scored best_oob_score.
+    params = dict(params or {})
+    if params.get('class_weight') == 'balanced':
+        # warm_start wants fixed weights; these are exactly what 'balanced' computes on y.
+        classes = np.unique(y)
+        params['class_weight'] = dict(zip(classes, compute_class_weight('balanced', classes=classes, y=y)))
+    model = RandomForestClassifier(n_estimators=0, warm_start=True, oob_score=True, bootstrap=True,
+                                   n_jobs=n_jobs, random_state=random_state, **params)
+    history = []
+    best_score, best_trees, best_oob, stale = -np.inf, 0, None, 0
+    with warnings.catch_warnings():
+        # Small forests leave some rows without OOB votes; sklearn warns on every round.
+        warnings.filterwarnings('ignore', message='Some inputs do not have OOB scores')
+        warnings.filterwarnings('ignore', message='invalid value encountered', category=RuntimeWarning)
+        while model.n_estimators < max_trees:
+            model.n_estimators = min(model.n_estimators + step, max_trees)
+            model.fit(X, y)
+            history.append((model.n_estimators, model.oob_score_))
+            if model.oob_score_ > best_score + tol:
+                best_score, best_trees, stale = model.oob_score_, model.n_estimators, 0
+                best_oob = model.oob_decision_function_.copy()
+            else:
+                stale += 1
+                if stale >= patience:
+                    break
+    model.warm_start = False
+    if best_trees and best_trees < model.n_estimators:
+        model.estimators_ = model.estimators_[:best_trees]
+        model.n_estimators = best_trees
+        model.oob_score_, model.oob_decision_function_ = best_score, best_oob
+    return model, {'history': history, 'best_oob_score': best_score, 'best_n_estimators': best_trees}
+
+def measure_core_scaling(X, y, params=None, n_estimators=SEARCH_TREES, cores=None, repeat=1,
+                         random_state=RANDOM_STATE):
+    # Wall-clock of one forest fit at 1..N workers; trees are built in parallel by joblib.
+    timings = []
+    for n in cores or core_counts():
+        model = RandomForestClassifier(n_estimators=n_estimators, n_jobs=n, random_state=random_state, **(params or {}))
+        best = np.inf
+        with threadpool_limits(limits=1):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                model.fit(X, y)
+                best = min(best, time.perf_counter() - start)
+        timings.append((n, best))
+    base = timings[0][1]
+    return [{'cores': n, 'seconds': t, 'speedup': base / t, 'efficiency': base / t / n} for n, t in timings]
+
+def print_scaling(rows):
+    print(f"{'cores':>5} {'seconds':>9} {'speedup':>8} {'efficiency':>10}")
+    for r in rows:
+        print(f"{r['cores']:>5} {r['seconds']:>9.2f} {r['speedup']:>7.2f}x {r['efficiency']:>9.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated RandomForest churn model")
+    parser.add_argument('--input', default=INPUT_CSV, help="CSV, Parquet or .npds dataset directory")
+    parser.add_argument('--target', default=TARGET)
+    parser.add_argument('--output', default=MODEL_FILE)
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--n-iter', type=int, default=None,
+                        help="sample this many parameter combinations instead of the full grid")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--max-trees', type=int, default=1000)
+    parser.add_argument('--engineer', action='store_true',
+                        help="fit a FeaturePipeline on the input (e.g. the cleaned CSV) and train on its output")
+    parser.add_argument('--scaling', action='store_true',
+                        help="also time a single forest fit on 1..N cores")
+    args = parser.parse_args()
+
+    pipeline = FeaturePipeline() if args.engineer else None
+    X, y = load_training_data(args.input, args.target, pipeline)
+    print(f"Training data: {X.shape[0]} rows, {X.shape[1]} features, churn rate {y.mean():.3f}")
+
+    start = time.perf_counter()
+    search = search_hyperparameters(X, y, cv=args.cv, n_iter=args.n_iter, n_jobs=args.n_jobs)
+    print(f"Search: {len(search.cv_results_['params'])} candidates x {args.cv} folds "
+          f"in {time.perf_counter() - start:.1f} s on {joblib.cpu_count()} cores")
+    print("Best params:", search.best_params_)
+    print(f"Best CV {search.scoring}: {search.best_score_:.4f}")
+
+    model, growth = grow_forest(X, y, search.best_params_, max_trees=args.max_trees, n_jobs=args.n_jobs)
+    print(f"Grew {growth['history'][-1][0]} trees, kept the first {model.n_estimators}: "
+          f"best OOB accuracy {growth['best_oob_score']:.4f}")
+
+    importances = pd.Series(model.feature_importances_, index=X.columns).sort_values(ascending=False)
+    print(importances.head(15))
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok = True)
+    save_model(args.output, model, X.columns, pipeline, target=args.target, best_params=search.best_params_,
+               cv_score=search.best_score_, oob_history=growth['history'])
+    print("Saved model to:", args.output)
+
+    if args.scaling:
+        print_scaling(measure_core_scaling(X, y, search.best_params_))
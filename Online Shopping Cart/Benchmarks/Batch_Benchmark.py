@@ -0,0 +1,54 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Catalog_Benchmark import write_synthetic_catalog
+from Shopping_Cart import ShoppingCart
+
+
+def fresh_cart(tmp, template, tag):
+    catalog_file = os.path.join(tmp, f"product_{tag}.json")
+    shutil.copyfile(template, catalog_file)
+    return ShoppingCart(catalog_file, os.path.join(tmp, f"cart_{tag}.json"),
+                        os.path.join(tmp, f"cart_{tag}.journal"), compact_every=10**9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="apply_batch vs looping add_item")
+    parser.add_argument('--lines', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.json")
+        # Synthetic stock is i % 50, so skip the SKUs generated with none.
+        write_synthetic_catalog(template, args.lines + args.lines // 49 + 1)
+        lines = [{"product_id": f"P{i:07d}", "quantity": 1}
+                 for i in range(args.lines + args.lines // 49 + 1) if i % 50][:args.lines]
+
+        loop_times, batch_times = [], []
+        for r in range(args.repeat):
+            cart = fresh_cart(tmp, template, f"loop{r}")
+            start = time.perf_counter()
+            for line in lines:
+                cart.add_item(line["product_id"], line["quantity"])
+            loop_times.append(time.perf_counter() - start)
+
+            cart = fresh_cart(tmp, template, f"batch{r}")
+            start = time.perf_counter()
+            applied = cart.apply_batch(lines)
+            batch_times.append(time.perf_counter() - start)
+            assert applied and len(cart._items) == len(lines)
+
+    loop, batch = min(loop_times), min(batch_times)
+    print(f"{len(lines)} lines: add_item loop {loop * 1000:.1f} ms, apply_batch {batch * 1000:.1f} ms, "
+          f"speedup {loop / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
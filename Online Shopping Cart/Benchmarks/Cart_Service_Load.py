@@ -0,0 +1,135 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Cart_Service import CartService
+from Order_Ledger import OrderLedger
+from Shopping_Cart import PhysicalProduct
+
+
+def build_catalog(n_products, stock):
+    return {f"P{i:05d}": PhysicalProduct(f"P{i:05d}", f"Product {i}", float(100 + i), stock, 0.5)
+            for i in range(n_products)}
+
+
+def shopper(service, product_ids, sessions, seed, sold, sold_lock, ops):
+    rng = random.Random(seed)
+    local_sold = Counter()
+    done = 0
+    for _ in range(sessions):
+        sid = service.open_session()
+        for _ in range(rng.randint(1, 6)):
+            service.add_item(sid, rng.choice(product_ids), rng.randint(1, 3))
+            done += 1
+        items = service.get_items(sid)
+        if items and rng.random() < 0.3:
+            pid = rng.choice(list(items))
+            service.update_quantity(sid, pid, rng.randint(0, 5))
+            done += 1
+        if items and rng.random() < 0.2:
+            service.remove_item(sid, rng.choice(list(items)))
+            done += 1
+
+        roll = rng.random()
+        if roll < 0.5:
+            order = service.checkout(sid)
+            if order is not None:
+                local_sold.update(order[0])
+            done += 1
+        elif roll < 0.8:
+            service.close_session(sid)
+            done += 1
+        # else: abandoned, left for the reaper
+    with sold_lock:
+        sold.update(local_sold)
+        ops.append(done)
+
+
+def check_reaper_race():
+    # A session used after the reaper listed it as idle keeps its reservations;
+    # unknown session ids answer False / None instead of raising.
+    now = [0.0]
+    catalog = build_catalog(1, 10)
+    service = CartService(catalog, reservation_ttl=10, clock=lambda: now[0])
+    sid = service.open_session()
+    assert service.add_item(sid, "P00000", 4)
+    now[0] = 11.0
+    cutoff = now[0] - 10
+    assert service.get_items(sid) == {"P00000": 4}
+    assert not service.close_session(sid, if_idle_since=cutoff)
+    assert service.expire_abandoned() == 0 and catalog["P00000"].show_quantity_available == 6
+    now[0] = 30.0
+    assert service.expire_abandoned() == 1 and catalog["P00000"].show_quantity_available == 10
+    assert not service.add_item(sid, "P00000", 1) and not service.update_quantity(sid, "P00000", 1)
+    assert not service.remove_item(sid, "P00000") and not service.close_session(sid)
+    assert service.get_items(sid) is None and service.get_total(sid) is None and service.checkout(sid) is None
+
+
+def check_session_totals():
+    # Prices that float sums get wrong: session totals stay exact, like ShoppingCart's.
+    catalog = {pid: PhysicalProduct(pid, pid, price, 100, 0.5) for pid, price in (("A", 0.1), ("B", 0.2), ("C", 19.99))}
+    service = CartService(catalog)
+    sid = service.open_session()
+    assert service.add_item(sid, "A", 3) and service.add_item(sid, "B", 1) and service.add_item(sid, "C", 7)
+    assert service.get_total(sid) == Decimal("140.43")
+    assert service.update_quantity(sid, "C", 1) and service.remove_item(sid, "B")
+    assert service.get_total(sid) == Decimal("20.29")
+    assert service.checkout(sid) == ({"A": 3, "C": 1}, Decimal("20.29"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load against CartService with oversell check")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--sessions-per-worker', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=50, help="small, hot catalog to force contention")
+    parser.add_argument('--stock', type=int, default=500)
+    args = parser.parse_args()
+
+    check_reaper_race()
+    check_session_totals()
+    catalog = build_catalog(args.products, args.stock)
+    tmp = tempfile.TemporaryDirectory()
+    ledger = OrderLedger(os.path.join(tmp.name, "orders.ledger"), sync=False)
+    service = CartService(catalog, reservation_ttl=0.05, ledger=ledger)
+    service.start_reaper(interval=0.02)
+    product_ids = list(catalog)
+    sold, sold_lock, ops = Counter(), threading.Lock(), []
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.workers) as pool:
+        for w in range(args.workers):
+            pool.submit(shopper, service, product_ids, args.sessions_per_worker, w, sold, sold_lock, ops)
+    elapsed = time.perf_counter() - start
+
+    service.stop_reaper()
+    service.expire_abandoned()
+    time.sleep(0.06)
+    service.expire_abandoned()
+
+    oversold = [pid for pid, p in catalog.items() if p.show_quantity_available < 0]
+    leaked = [pid for pid, p in catalog.items()
+              if p.show_quantity_available + sold[pid] + service.reserved_quantity(pid) != args.stock]
+    unledgered = [pid for pid in catalog if ledger.product_sales(pid)["units"] != sold[pid]]
+    ledger.close()
+    tmp.cleanup()
+    total_ops = sum(ops)
+    print(f"workers={args.workers} ops={total_ops} elapsed={elapsed:.2f}s throughput={total_ops / elapsed:,.0f} ops/s")
+    print(f"units sold={sum(sold.values())} of {args.products * args.stock}, "
+          f"sold-out SKUs={sum(1 for p in catalog.values() if p.show_quantity_available == 0)}")
+    print(f"oversold SKUs={len(oversold)} stock-accounting mismatches={len(leaked)} "
+          f"ledger mismatches={len(unledgered)}")
+    if oversold or leaked or unledgered:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
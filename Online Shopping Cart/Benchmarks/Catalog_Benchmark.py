@@ -0,0 +1,104 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Catalog_Store import CatalogStore
+from Shopping_Cart import ShoppingCart
+
+
+def write_synthetic_catalog(path, n_products):
+    with open(path, 'w') as file:
+        file.write('{')
+        for i in range(n_products):
+            pid = f"P{i:07d}"
+            if i % 2:
+                p = {"type": "physical", "product_id": pid, "name": f"Product {i}",
+                     "price": float(100 + i % 5000), "quantity_available": i % 50, "weight": 0.5}
+            else:
+                p = {"type": "digital", "product_id": pid, "name": f"Product {i}",
+                     "price": float(100 + i % 5000), "quantity_available": i % 50,
+                     "download_link": f"https://example.com/d/{pid}"}
+            body = json.dumps(p, indent=4).replace('\n', '\n    ')
+            file.write(('\n    ' if i == 0 else ',\n    ') + f'"{pid}": {body}')
+        file.write('\n}')
+
+
+def load_eager(path):
+    # The pre-CatalogStore loader: parse everything, build every object.
+    with open(path, 'r') as file:
+        return {p["product_id"]: ShoppingCart._product_from_dict(p) for p in json.load(file).values()}
+
+
+def load_lazy_scan(path):
+    if os.path.exists(path + '.idx'):
+        os.remove(path + '.idx')
+    return CatalogStore(path, ShoppingCart._product_from_dict)
+
+
+def load_lazy_cached(path):
+    return CatalogStore(path, ShoppingCart._product_from_dict)
+
+
+def measure(loader, path):
+    gc.collect()
+    start = time.perf_counter()
+    catalog = loader(path)
+    elapsed = time.perf_counter() - start
+    del catalog
+
+    gc.collect()
+    tracemalloc.start()
+    catalog = loader(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return elapsed, retained, peak
+
+
+def check_replace(tmp):
+    # A product replaced under its id answers price, type and price queries from the new object.
+    path = os.path.join(tmp, "replace.json")
+    write_synthetic_catalog(path, 100)
+    catalog = CatalogStore(path, ShoppingCart._product_from_dict)
+    assert "P0000000" in catalog.price_range(100.0, 100.0)
+    replacement = ShoppingCart._product_from_dict({"type": "physical", "product_id": "P0000000", "name": "Moved",
+                                                   "price": 9999.0, "quantity_available": 3, "weight": 1.0})
+    catalog["P0000000"] = replacement
+    assert catalog.price("P0000000") == 9999.0 and catalog.product_type("P0000000") == "physical"
+    assert "P0000000" not in catalog.price_range(100.0, 100.0)
+    assert catalog.price_range(9999.0, 9999.0) == ["P0000000"] and catalog.top_by_price(1) == ["P0000000"]
+    fresh = CatalogStore(path, ShoppingCart._product_from_dict)
+    fresh["P0000000"] = replacement
+    assert fresh.top_by_price(1) == ["P0000000"] and fresh.stock("P0000000") == 3
+    os.remove(path)
+    os.remove(path + '.idx')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog startup time and memory: eager json.load vs CatalogStore")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'products':>10} {'loader':>12} {'startup_s':>10} {'retained_MB':>12} {'peak_MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        check_replace(tmp)
+        for n in args.sizes:
+            path = os.path.join(tmp, f"product_{n}.json")
+            write_synthetic_catalog(path, n)
+            for name, loader in (('eager', load_eager), ('lazy-scan', load_lazy_scan),
+                                 ('lazy-cached', load_lazy_cached)):
+                elapsed, retained, peak = measure(loader, path)
+                print(f"{n:>10} {name:>12} {elapsed:>10.3f} {retained / 2**20:>12.1f} {peak / 2**20:>9.1f}")
+            os.remove(path)
+            os.remove(path + '.idx')
+
+
+if __name__ == "__main__":
+    main()
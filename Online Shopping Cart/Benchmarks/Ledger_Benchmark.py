@@ -0,0 +1,191 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Order_Ledger import OrderLedger
+from Shopping_Cart import DigitalProduct, PhysicalProduct, ShoppingCart
+
+DAY = 86400
+
+
+def synthetic_products(n_products):
+    products = []
+    for i in range(n_products):
+        pid = f"P{i:07d}"
+        if i % 2:
+            products.append(PhysicalProduct(pid, f"Product {i}", float(100 + i % 5000) + 0.99, 10**9, 0.5))
+        else:
+            products.append(DigitalProduct(pid, f"Product {i}", float(100 + i % 5000), 10**9,
+                                           f"https://example.com/d/{pid}"))
+    return products
+
+
+def synthetic_orders(products, n_orders, days, seed=1):
+    # A few products sell far more than the rest, as in a real shop.
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(products))))
+    start = time.time() - days * DAY
+    step = days * DAY / n_orders
+    for i in range(n_orders):
+        picked = {p.show_product_id: p for p in rng.choices(products, cum_weights=cum_weights, k=rng.randint(1, 4))}
+        yield [(p, rng.randint(1, 3)) for p in picked.values()], start + i * step
+
+
+def replay(ledger_file):
+    # What answering a query costs without rollups: read every order back.
+    units, revenue, days = Counter(), defaultdict(Decimal), defaultdict(Decimal)
+    with open(ledger_file, 'rb') as file:
+        for line in file:
+            order = json.loads(line)
+            for item in order["lines"]:
+                units[item["product_id"]] += item["quantity"]
+                revenue[item["product_id"]] += Decimal(item["subtotal"])
+            days[time.strftime('%Y-%m-%d', time.localtime(order["placed_at"]))] += Decimal(order["total"])
+    return units, revenue, days
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def check_rollups(ledger, ledger_file):
+    units, revenue, days = replay(ledger_file)
+    for pid in units:
+        sales = ledger.product_sales(pid)
+        assert sales["units"] == units[pid] and sales["revenue"] == revenue[pid], pid
+    top = ledger.top_sellers(20)
+    assert [u for _, u, _ in top] == [u for _, u in units.most_common(20)]
+    for day, total in days.items():
+        assert ledger.day(day)["revenue"] == total, day
+    ordered = sorted(days)
+    assert ledger.revenue_between(ordered[0], ordered[-1]) == sum(days.values())
+    mid = ordered[len(ordered) // 3: 2 * len(ordered) // 3]
+    assert ledger.revenue_between(mid[0], mid[-1]) == sum(days[d] for d in mid)
+
+
+def state(ledger):
+    return (len(ledger), ledger.top_sellers(50), dict(ledger._days), dict(ledger._hours),
+            ledger._offsets.tobytes(), ledger._placed_at.tobytes())
+
+
+def check_checkout(tmp, products):
+    # ShoppingCart.checkout writes the order with the stock left after decrease_quantity.
+    cart = ShoppingCart(os.path.join(tmp, "missing.json"), os.path.join(tmp, "cart.json"),
+                        os.path.join(tmp, "cart.journal"), order_ledger_file=os.path.join(tmp, "shop.ledger"))
+    for p in products[:3]:
+        p.show_quantity_available = 10
+        cart.add_product(p)
+    cart.add_item(products[0].show_product_id, 2)
+    cart.add_item(products[1].show_product_id, 3)
+    expected_total = cart.get_total()
+    order = cart.checkout()
+    assert cart.get_total() == 0 and cart.checkout() is None
+    assert [(l["product_id"], l["quantity"], l["stock_delta"], l["stock_after"]) for l in order["lines"]] == \
+        [(products[0].show_product_id, 2, -2, 8), (products[1].show_product_id, 3, -3, 7)]
+    assert Decimal(order["total"]) == expected_total
+    cart.close()
+    reopened = OrderLedger(os.path.join(tmp, "shop.ledger"))
+    assert reopened.get(1) == order
+    reopened.close()
+
+
+def check_torn_write(ledger_file):
+    ledger = OrderLedger(ledger_file)
+    count = len(ledger)
+    ledger.close()
+    with open(ledger_file, 'ab') as file:
+        file.write(b'{"order_id":')
+    ledger = OrderLedger(ledger_file)
+    assert len(ledger) == count
+    product = synthetic_products(1)[0]
+    order = ledger.record([(product, 1)])
+    assert order["order_id"] == count + 1 and ledger.get(count + 1) == order
+    ledger.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order ledger: append cost, rollup queries vs replaying the log, "
+                                                 "reopen with and without the index")
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--synced-orders', type=int, default=500)
+    args = parser.parse_args()
+
+    products = synthetic_products(args.products)
+    with tempfile.TemporaryDirectory() as tmp:
+        check_checkout(tmp, synthetic_products(3))
+        ledger_file = os.path.join(tmp, "orders.ledger")
+
+        ledger = OrderLedger(ledger_file, sync=False, checkpoint_every=10**9)
+        elapsed = 0.0
+        for lines, placed_at in synthetic_orders(products, args.orders, args.days):
+            start = time.perf_counter()
+            ledger.record(lines, placed_at)
+            elapsed += time.perf_counter() - start
+        print(f"orders: {args.orders:,} over {args.days} days, {args.products:,} products, "
+              f"{os.path.getsize(ledger_file) / 2**20:.0f} MB ledger")
+        print(f"  append (no fsync): {args.orders / elapsed:,.0f} orders/s, rollups included")
+
+        synced = OrderLedger(os.path.join(tmp, "synced.ledger"))
+        samples = []
+        for lines, _ in synthetic_orders(products, args.synced_orders, 1, seed=2):
+            t = time.perf_counter()
+            synced.record(lines)
+            samples.append(time.perf_counter() - t)
+        synced.close()
+        print(f"  append (fsync per order): p50 {statistics.median(samples) * 1e6:,.0f} us")
+
+        start = time.perf_counter()
+        check_rollups(ledger, ledger_file)
+        print(f"rollups match a full replay of the ledger ({time.perf_counter() - start:.1f} s to check)")
+
+        last_day = ledger._day_keys[-1]
+        ledger._clock = lambda: ledger._placed_at[-1]
+        rng = random.Random(3)
+        start = time.perf_counter()
+        replay(ledger_file)
+        replay_us = (time.perf_counter() - start) * 1e6
+        print(f"\n{'query':<26} {'ledger us':>10} {'replay us':>14}")
+        for name, fn in (('top_sellers(10)', lambda: ledger.top_sellers(10)),
+                         ('revenue_today', ledger.revenue_today),
+                         ('revenue_between(year)', lambda: ledger.revenue_between(ledger._day_keys[0], last_day)),
+                         ('product_sales', lambda: ledger.product_sales(products[rng.randrange(len(products))]
+                                                                        .show_product_id)),
+                         ('get(order_id)', lambda: ledger.get(rng.randint(1, args.orders)))):
+            print(f"{name:<26} {per_call_us(fn, 2000):>10.1f} {replay_us:>14,.0f}")
+
+        before = state(ledger)
+        ledger.close()
+        start = time.perf_counter()
+        indexed = OrderLedger(ledger_file)
+        indexed_s = time.perf_counter() - start
+        assert state(indexed) == before
+        indexed.close()
+        os.remove(ledger_file + '.idx')
+        start = time.perf_counter()
+        rebuilt = OrderLedger(ledger_file)
+        rebuilt_s = time.perf_counter() - start
+        assert state(rebuilt) == before
+        rebuilt.close()
+        print(f"\nreopen: {indexed_s:.2f} s from the index, {rebuilt_s:.2f} s replaying the ledger; same state")
+
+        check_torn_write(ledger_file)
+        print("checkout records stock deltas; a torn last order is dropped on reopen")
+
+
+if __name__ == "__main__":
+    main()
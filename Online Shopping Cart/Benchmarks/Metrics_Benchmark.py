@@ -0,0 +1,136 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prometheus_client.parser import text_string_to_metric_families
+
+import Cart_Metrics
+from Catalog_Benchmark import write_synthetic_catalog
+from Shopping_Cart import ShoppingCart
+
+OPERATIONS = ('add_item', 'update_quantity', 'remove_item')
+
+
+def scrape(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        assert response.status == 200
+        text = response.read().decode('utf-8')
+    samples = {}
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            samples[(sample.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return samples
+
+
+def check_scrape(tmp, n_products):
+    # Drives a known mix of operations and checks the scraped series count them exactly.
+    cart = ShoppingCart(os.path.join(tmp, "product.json"), os.path.join(tmp, "scrape_cart.json"),
+                        os.path.join(tmp, "scrape.journal"), compact_every=10**9)
+    metrics = Cart_Metrics.enable(port=0)
+    port = metrics.server.server_address[1]
+    in_stock = [f"P{i:07d}" for i in range(n_products) if i % 50 >= 2][:200]
+    sold_out = [f"P{i:07d}" for i in range(n_products) if i % 50 == 0][:30]
+    for pid in in_stock:
+        assert cart.add_item(pid, 1)
+    for pid in sold_out:
+        assert not cart.add_item(pid, 1)
+    assert not cart.add_item("no-such-product", 1)
+    for pid in in_stock[:50]:
+        assert not cart.update_quantity(pid, 10**6)
+        assert cart.update_quantity(pid, 2)
+    for pid in in_stock[:120]:
+        assert cart.remove_item(pid)
+    cart._save_catalog()
+    cart._save_cart_state()
+
+    samples = scrape(port)
+    def value(name, **labels):
+        return samples.get((name, tuple(sorted(labels.items()))), 0)
+    assert value('cart_operations_total', operation='add_item', outcome='ok') == len(in_stock)
+    assert value('cart_operations_total', operation='add_item', outcome='rejected') == len(sold_out) + 1
+    assert value('cart_operations_total', operation='update_quantity', outcome='ok') == 50
+    assert value('cart_operations_total', operation='update_quantity', outcome='rejected') == 50
+    assert value('cart_operations_total', operation='remove_item', outcome='ok') == 120
+    assert value('cart_operation_seconds_count', operation='add_item') == len(in_stock) + len(sold_out) + 1
+    assert value('cart_operation_seconds_sum', operation='add_item') > 0
+    assert value('cart_stock_out_rejections_total', operation='add_item') == len(sold_out)
+    assert value('cart_stock_out_rejections_total', operation='update_quantity') == 50
+    for operation in ('save_catalog', 'save_cart_state'):
+        assert value('cart_storage_write_seconds_count', operation=operation) == 1
+
+    # Disabled, nothing is recorded and the endpoint is gone.
+    Cart_Metrics.disable()
+    cart.add_item(in_stock[-1], 1)
+    assert metrics.collect()[1].samples[0].value == len(in_stock)
+    try:
+        scrape(port)
+        raise AssertionError("metrics endpoint still serving after disable()")
+    except (urllib.error.URLError, ConnectionError):
+        pass
+    cart.close()
+    return len(samples)
+
+
+def overhead(tmp, n_products, cycles):
+    # Each cycle runs add/update/remove once per mode, in rotating order, so
+    # disk stalls and cache effects spread evenly over the modes.
+    cart = ShoppingCart(os.path.join(tmp, "product.json"), os.path.join(tmp, "cart.json"),
+                        os.path.join(tmp, "cart.journal"), compact_every=10**9)
+    raw = {op: getattr(ShoppingCart, op).__wrapped__ for op in OPERATIONS}
+    instrumented = {op: getattr(ShoppingCart, op) for op in OPERATIONS}
+    metrics = Cart_Metrics.CartMetrics()
+    modes = ('uninstrumented', 'disabled', 'enabled')
+    samples = {(mode, op): [] for mode in modes for op in OPERATIONS}
+    product_ids = [f"P{i:07d}" for i in range(n_products) if i % 50 >= 2]
+    rng = random.Random(1)
+    for cycle in range(cycles):
+        pid = rng.choice(product_ids)
+        for k in range(len(modes)):
+            mode = modes[(cycle + k) % len(modes)]
+            calls = raw if mode == 'uninstrumented' else instrumented
+            Cart_Metrics.active = metrics if mode == 'enabled' else None
+            for op, args in (('add_item', (pid, 1)), ('update_quantity', (pid, 2)), ('remove_item', (pid,))):
+                start = time.perf_counter()
+                calls[op](cart, *args)
+                samples[(mode, op)].append(time.perf_counter() - start)
+    Cart_Metrics.active = None
+    cart.close()
+    return {key: statistics.median(values) for key, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cart metrics: scrape /metrics after a known workload, and the "
+                                                 "latency cost of instrumentation on add/update/remove")
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--cycles', type=int, default=20_000)
+    parser.add_argument('--max-overhead', type=float, default=0.05, help="allowed enabled overhead per operation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_synthetic_catalog(os.path.join(tmp, "product.json"), args.products)
+        n_series = check_scrape(tmp, args.products)
+        print(f"/metrics scraped: {n_series} samples; operation, outcome, stock-out and storage counts match the "
+              f"workload; disable() stops recording and closes the endpoint")
+
+        medians = overhead(tmp, args.products, args.cycles)
+        print(f"\n{'operation':<16} {'plain us':>9} {'disabled':>9} {'enabled':>9} {'overhead':>9}")
+        over = []
+        for op in OPERATIONS:
+            base = medians[('uninstrumented', op)]
+            disabled, enabled = medians[('disabled', op)], medians[('enabled', op)]
+            print(f"{op:<16} {base * 1e6:>9.1f} {disabled * 1e6:>9.1f} {enabled * 1e6:>9.1f} "
+                  f"{enabled / base - 1:>9.1%}")
+            over.append((op, enabled / base - 1))
+        assert all(ratio < args.max_overhead for _, ratio in over), over
+
+
+if __name__ == "__main__":
+    main()
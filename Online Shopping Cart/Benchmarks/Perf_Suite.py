@@ -0,0 +1,183 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Catalog_Benchmark import write_synthetic_catalog
+from Shopping_Cart import ShoppingCart
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "cart.json")
+METRICS = ('seconds', 'peak_mb', 'p50_us')
+# Wall-time differences smaller than this are timer and scheduler noise.
+NOISE_FLOOR_SECONDS = 0.01
+
+
+def environment():
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+            'system': platform.system(), 'cpus': os.cpu_count()}
+
+
+def timed(fn, repeat, setup=lambda: None):
+    # Best wall time of `repeat` runs, then peak memory from one traced run.
+    best = None
+    for _ in range(repeat):
+        setup()
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        del result
+        best = elapsed if best is None else min(best, elapsed)
+
+    setup()
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {'seconds': best, 'peak_mb': peak / 2**20}
+
+
+def latencies(samples):
+    # A few journal writes stall on the disk, so totals are reported but only
+    # the median is compared against the baseline.
+    ordered = sorted(samples)
+    return {'total_seconds': sum(ordered), 'ops': len(ordered), 'p50_us': statistics.median(ordered) * 1e6,
+            'p99_us': ordered[int(0.99 * (len(ordered) - 1))] * 1e6, 'max_us': ordered[-1] * 1e6}
+
+
+def run_ops(cart, product_ids, n_ops, rng):
+    samples = {'add_item': [], 'update_quantity': [], 'remove_item': []}
+    for _ in range(n_ops):
+        pid = rng.choice(product_ids)
+        for op, call in (('add_item', lambda: cart.add_item(pid, 1)),
+                         ('update_quantity', lambda: cart.update_quantity(pid, 2)),
+                         ('remove_item', lambda: cart.remove_item(pid))):
+            start = time.perf_counter()
+            call()
+            samples[op].append(time.perf_counter() - start)
+    return samples
+
+
+def run_suite(n_products, n_ops, repeat, tmp):
+    catalog_file = os.path.join(tmp, "product.json")
+    cart_file = os.path.join(tmp, "cart.json")
+    journal_file = os.path.join(tmp, "cart.journal")
+    write_synthetic_catalog(catalog_file, n_products)
+
+    # Compaction rewrites the whole catalog, which _save_catalog measures on its
+    # own, so it is kept out of the per-operation latencies.
+    def open_cart():
+        return ShoppingCart(catalog_file, cart_file, journal_file, compact_every=10 * n_ops + 1)
+
+    def startup():
+        open_cart().close()
+
+    def drop_index():
+        if os.path.exists(catalog_file + '.idx'):
+            os.remove(catalog_file + '.idx')
+
+    results = {'startup_cold': timed(startup, repeat, setup=drop_index),
+               'startup_warm': timed(startup, repeat)}
+
+    cart = open_cart()
+    # Products whose synthetic stock (i % 50) is at least 2.
+    product_ids = [f"P{i:07d}" for i in range(n_products) if i % 50 >= 2]
+    rng = random.Random(1)
+    for _ in range(repeat):
+        samples = run_ops(cart, product_ids, n_ops, rng)
+        for op, values in samples.items():
+            current = latencies(values)
+            if op not in results or current['p50_us'] < results[op]['p50_us']:
+                results[op] = current
+
+    for pid in rng.sample(product_ids, 50):
+        cart.add_item(pid, 1)
+    results['save_catalog'] = timed(cart._save_catalog, repeat)
+    results['save_cart_state'] = timed(cart._save_cart_state, repeat)
+    cart.close()
+    return results
+
+
+def compare(baseline, results, tolerance):
+    # A metric regresses when it is more than `tolerance` above the baseline.
+    regressions = []
+    for case, current in results['cases'].items():
+        base = baseline['cases'].get(case)
+        if base is None:
+            continue
+        for metric in METRICS:
+            if metric not in base or metric not in current or current[metric] <= base[metric] * (1 + tolerance):
+                continue
+            if metric != 'seconds' or current[metric] - base[metric] > NOISE_FLOOR_SECONDS:
+                regressions.append((case, metric, base[metric], current[metric]))
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"{'case':<16} {'seconds':>9} {'peak_MB':>9} {'p50_us':>8} {'p99_us':>8} {'vs base':>8}")
+    for case, r in results['cases'].items():
+        base = (baseline or {}).get('cases', {}).get(case)
+        metric = 'seconds' if 'seconds' in r else 'p50_us'
+        change = f"{r[metric] / base[metric]:.2f}x" if base else '-'
+        seconds = f"{r['seconds']:.3f}" if 'seconds' in r else '-'
+        peak = f"{r['peak_mb']:.1f}" if 'peak_mb' in r else '-'
+        p50 = f"{r['p50_us']:.0f}" if 'p50_us' in r else '-'
+        p99 = f"{r['p99_us']:.0f}" if 'p99_us' in r else '-'
+        print(f"{case:<16} {seconds:>9} {peak:>9} {p50:>8} {p99:>8} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and memory-profile cart startup, add_item and catalog saves "
+                                                 "on a synthetic catalog, flagging regressions against a JSON baseline")
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--ops', type=int, default=2_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed slowdown or memory growth, as a fraction")
+    parser.add_argument('--update-baseline', action='store_true', help="write this run as the new baseline")
+    parser.add_argument('--output', default=None, help="also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = run_suite(args.products, args.ops, args.repeat, tmp)
+    results = {'suite': 'cart', 'products': args.products, 'ops': args.ops,
+               'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'environment': environment(), 'cases': cases}
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        if baseline['products'] != args.products:
+            print(f"baseline was taken with {baseline['products']:,} products, not {args.products:,}; not comparing")
+            baseline = None
+    print_results(results, baseline)
+
+    for path in [args.output, args.baseline if args.update_baseline else None]:
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w') as file:
+                json.dump(results, file, indent=4)
+            print("Saved results to:", path)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.tolerance)
+        for case, metric, before, after in regressions:
+            print(f"REGRESSION {case} {metric}: {before:.3f} -> {after:.3f} ({after / before:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Shopping_Cart import PhysicalProduct, ShoppingCart
+
+WORDS = ("wireless mouse keyboard mechanical usb charger cable laptop stand monitor webcam headset "
+         "speaker ebook course license pro mini ultra portable gaming office rgb bluetooth").split()
+
+
+def write_named_catalog(path, n_products, rng):
+    import json
+    with open(path, 'w') as file:
+        file.write('{')
+        for i in range(n_products):
+            pid = f"P{i:07d}"
+            name = " ".join(rng.sample(WORDS, 3)) + f" {i % 997}"
+            p = {"type": "physical" if i % 3 else "digital", "product_id": pid, "name": name,
+                 "price": float(rng.randint(100, 20000)), "quantity_available": rng.randint(0, 30)}
+            if i % 3:
+                p["weight"] = 0.5
+            else:
+                p["download_link"] = f"https://example.com/d/{pid}"
+            body = json.dumps(p, indent=4).replace('\n', '\n    ')
+            file.write(('\n    ' if i == 0 else ',\n    ') + f'"{pid}": {body}')
+        file.write('\n}')
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ProductSearch build and query latency")
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_file = os.path.join(tmp, "product.json")
+        write_named_catalog(catalog_file, args.products, rng)
+        cart = ShoppingCart(catalog_file, os.path.join(tmp, "cart.json"),
+                            os.path.join(tmp, "cart.journal"), compact_every=10**9)
+
+        start = time.perf_counter()
+        search = cart.search
+        print(f"index build over {args.products} products: {(time.perf_counter() - start) * 1000:.0f} ms, "
+              f"{len(search._vocabulary)} tokens")
+
+        queries = {
+            "single word": lambda: search.search("keyboard"),
+            "two words": lambda: search.search("wireless mouse"),
+            "prefix": lambda: search.search("blue"),
+            "word + filters": lambda: search.search("gaming", product_type="physical", max_price=5000, in_stock=True),
+            "price range only": lambda: search.search(min_price=1000, max_price=1100),
+            "suggest": lambda: search.suggest("po"),
+        }
+        for name, query in queries.items():
+            p50, p99 = timed(query, args.repeat)
+            print(f"{name:>18}: p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+
+        # A short prefix matching hundreds of tokens returns all of their
+        # products, and the total counts them all.
+        for i in range(300):
+            cart.add_product(PhysicalProduct(f"ZED{i}", f"Zenith{i} Lamp", 10.0, 1, 1.0))
+        page = search.search("zen", page_size=1000)
+        assert page.total == 300 and page.product_ids == sorted(f"ZED{i}" for i in range(300))
+        for bad in ({'page': 0}, {'page': -1}, {'page_size': 0}):
+            try:
+                search.search("keyboard", **bad)
+                raise AssertionError(f"search accepted {bad}")
+            except ValueError:
+                pass
+        print("prefix over 300 tokens finds all 300 products; page < 1 and page_size < 1 are rejected")
+
+        # Incremental maintenance: a new product and a stock-out show up without a rebuild.
+        cart.add_product(PhysicalProduct("NEW1", "Quantum Keyboard", 999.0, 1, 1.0))
+        assert "NEW1" in search.search("quantum").product_ids
+        cart.add_item("NEW1", 1)
+        assert "NEW1" not in search.search("quantum", in_stock=True).product_ids
+
+        # Replacing a product reindexes its name: the old words no longer find
+        # it, and a word only it used leaves the vocabulary.
+        cart.add_product(PhysicalProduct("NEW1", "Nebula Headset", 999.0, 5, 1.0))
+        assert "NEW1" not in search.search("quantum").product_ids and "quantum" not in search.suggest("qu")
+        assert "NEW1" in search.search("nebula head", in_stock=True).product_ids
+        print("incremental add/stock-out/replace reflected without rebuild")
+
+
+if __name__ == "__main__":
+    main()
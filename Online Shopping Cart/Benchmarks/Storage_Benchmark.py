@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Catalog_Benchmark import write_synthetic_catalog
+from Migrate_Storage import migrate_json_to_sqlite
+from Shopping_Cart import ShoppingCart
+from Storage_Backend import JsonStorage, SQLiteStorage
+
+
+def run_ops(cart, product_ids, n_ops, rng):
+    latencies = {"add_item": [], "update_quantity": [], "remove_item": []}
+    for _ in range(n_ops):
+        pid = rng.choice(product_ids)
+        start = time.perf_counter()
+        cart.add_item(pid, 1)
+        latencies["add_item"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        cart.update_quantity(pid, 2)
+        latencies["update_quantity"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        cart.remove_item(pid)
+        latencies["remove_item"].append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-operation latency: JSON+journal vs SQLite backend")
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--ops', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_file = os.path.join(tmp, "product.json")
+        cart_file = os.path.join(tmp, "cart.json")
+        journal_file = os.path.join(tmp, "cart.journal")
+        db_file = os.path.join(tmp, "shop.db")
+        write_synthetic_catalog(catalog_file, args.products)
+
+        start = time.perf_counter()
+        migrate_json_to_sqlite(catalog_file, cart_file, journal_file, db_file)
+        print(f"migrated {args.products} products to SQLite in {time.perf_counter() - start:.2f} s")
+        # Migration only reads the JSON side, and membership tests build no Products.
+        assert not os.path.exists(journal_file)
+        storage = SQLiteStorage(db_file)
+        catalog = storage.load_catalog(ShoppingCart._product_from_dict)
+        assert "P0000002" in catalog and "missing" not in catalog and catalog.loaded_count == 0
+        storage.close(None, [])
+
+        # Products whose synthetic stock (i % 50) is at least 2.
+        product_ids = [f"P{i:07d}" for i in range(args.products) if i % 50 >= 2]
+        backends = {
+            "json+journal": lambda: JsonStorage(catalog_file, cart_file, journal_file),
+            "sqlite": lambda: SQLiteStorage(db_file),
+        }
+        for name, make_storage in backends.items():
+            start = time.perf_counter()
+            cart = ShoppingCart(storage=make_storage())
+            startup = time.perf_counter() - start
+            latencies = run_ops(cart, product_ids, args.ops, random.Random(1))
+            cart.close()
+            summary = ", ".join(f"{op} p50 {statistics.median(v) * 1e6:.0f} us" for op, v in latencies.items())
+            print(f"{name:>13}: startup {startup * 1000:.0f} ms; {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Catalog_Benchmark import write_synthetic_catalog
+from Shopping_Cart import PhysicalProduct, DigitalProduct, ShoppingCart
+
+
+def brute_force_totals(cart):
+    # Recompute from scratch the way get_total used to, but in Decimal.
+    grand = weight = Decimal(0)
+    count = digital = 0
+    for item in cart._items.values():
+        price = Decimal(str(item.product.show_price))
+        grand += price * item.quantity
+        count += item.quantity
+        if isinstance(item.product, PhysicalProduct):
+            weight += Decimal(str(item.product.weight)) * item.quantity
+        elif isinstance(item.product, DigitalProduct):
+            digital += item.quantity
+    return grand, count, weight, digital
+
+
+def check_invariants(cart, rng, steps, product_ids):
+    # Randomized property check: after any sequence of mutations the running
+    # totals equal the brute-force sums.
+    for _ in range(steps):
+        pid = rng.choice(product_ids)
+        action = rng.random()
+        if action < 0.4:
+            cart.add_item(pid, rng.randint(1, 4))
+        elif action < 0.6:
+            cart.update_quantity(pid, rng.randint(0, 6))
+        elif action < 0.75:
+            cart.remove_item(pid)
+        else:
+            cart.apply_batch([{"product_id": rng.choice(product_ids), "quantity": rng.randint(0, 3),
+                               "op": rng.choice(("add", "set", "remove"))} for _ in range(rng.randint(1, 5))])
+        totals = cart.totals
+        expected = brute_force_totals(cart)
+        actual = (totals.grand_total, totals.item_count, totals.physical_weight, totals.digital_count)
+        assert actual == expected, f"running totals {actual} != brute force {expected}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Running cart totals and price index checks/timings")
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--steps', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_file = os.path.join(tmp, "product.json")
+        write_synthetic_catalog(catalog_file, args.products)
+        cart = ShoppingCart(catalog_file, os.path.join(tmp, "cart.json"),
+                            os.path.join(tmp, "cart.journal"), compact_every=10**9)
+
+        product_ids = [f"P{i:07d}" for i in rng.sample(range(args.products), 200)]
+        check_invariants(cart, rng, args.steps, product_ids)
+        print(f"totals matched brute force after {args.steps} random mutations "
+              f"({len(cart._items)} lines, total {cart.get_total()})")
+
+        # Zero and negative quantities are rejected before stock, totals or the journal move.
+        pid = product_ids[0]
+        before = (cart.totals.grand_total, cart.totals.item_count, cart.catalog[pid].show_quantity_available,
+                  cart._items[pid].quantity if pid in cart._items else 0)
+        assert not cart.add_item(pid, 0) and not cart.add_item(pid, -3)
+        assert before == (cart.totals.grand_total, cart.totals.item_count, cart.catalog[pid].show_quantity_available,
+                          cart._items[pid].quantity if pid in cart._items else 0)
+
+        start = time.perf_counter()
+        for _ in range(10_000):
+            cart.get_total()
+        read = (time.perf_counter() - start) / 10_000
+        start = time.perf_counter()
+        for _ in range(100):
+            brute_force_totals(cart)
+        brute = (time.perf_counter() - start) / 100
+        print(f"get_total read {read * 1e6:.2f} us vs brute-force sum {brute * 1e6:.1f} us")
+
+        catalog = cart.catalog
+        start = time.perf_counter()
+        catalog.price_range(0, 0)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(1000):
+            hits = catalog.price_range(1000.0, 1010.0, limit=50)
+            top = catalog.top_by_price(10)
+        query = (time.perf_counter() - start) / 1000
+        expected = sorted((catalog.price(pid), pid) for pid in catalog
+                          if 1000.0 <= catalog.price(pid) <= 1010.0)
+        assert [pid for _, pid in expected[:50]] == hits
+        assert [catalog.price(pid) for pid in top] == sorted((catalog.price(pid) for pid in catalog), reverse=True)[:10]
+        print(f"price index over {len(catalog)} products: build {build * 1000:.1f} ms, "
+              f"range+top-10 query {query * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
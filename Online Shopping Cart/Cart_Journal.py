@@ -0,0 +1,80 @@
+import json
+import os
+from os.path import exists
+
+
+class OperationJournal:
+    # Append-only log of catalog/cart mutations. Every entry carries the
+    # resulting absolute value next to the delta, so replaying an entry that
+    # already made it into a snapshot is harmless.
+
+    def __init__(self, journal_file='cart.journal', compact_every=500):
+        self._journal_file = journal_file
+        self._compact_every = compact_every
+        self._entries = self._recover()
+        # Opened on the first append or reset, so a storage that is only read
+        # (a migration, say) neither creates the file nor holds a handle.
+        self._file = None
+
+    def _writer(self):
+        if self._file is None:
+            self._file = open(self._journal_file, 'a', encoding='utf-8')
+        return self._file
+
+    def _recover(self):
+        if not exists(self._journal_file):
+            return 0
+
+        entries = 0
+        good_offset = 0
+        with open(self._journal_file, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                entries += 1
+                good_offset += len(line)
+
+        # Drop a record torn by a crash mid-write so new appends start on a clean line.
+        if good_offset != os.path.getsize(self._journal_file):
+            with open(self._journal_file, 'r+b') as file:
+                file.truncate(good_offset)
+        return entries
+
+    @property
+    def pending_entries(self):
+        return self._entries
+
+    def needs_compaction(self) -> bool:
+        return self._entries >= self._compact_every
+
+    def append(self, *ops) -> None:
+        if not ops:
+            return
+        file = self._writer()
+        file.write(''.join(json.dumps(op, separators=(',', ':')) + '\n' for op in ops))
+        file.flush()
+        os.fsync(file.fileno())
+        self._entries += len(ops)
+
+    def replay(self):
+        if not exists(self._journal_file):
+            return
+        with open(self._journal_file, 'r', encoding='utf-8') as file:
+            for line in file:
+                yield json.loads(line)
+
+    def reset(self) -> None:
+        # Only call once the snapshots holding every entry are safely on disk.
+        file = self._writer()
+        file.truncate(0)
+        file.flush()
+        os.fsync(file.fileno())
+        self._entries = 0
+
+    def close(self) -> None:
+        if self._file is not None and not self._file.closed:
+            self._file.close()
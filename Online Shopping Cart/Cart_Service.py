@@ -0,0 +1,218 @@
+import threading
+import time
+import uuid
+
+from Shopping_Cart import CartItem, CartTotals
+
+
+class CartSession:
+    __slots__ = ('session_id', '_items', 'totals', 'last_seen', 'lock', 'closed')
+
+    def __init__(self, session_id, now):
+        self.session_id = session_id
+        self._items = {}
+        # The same running Decimal totals ShoppingCart keeps, so both carts agree to the cent.
+        self.totals = CartTotals()
+        self.last_seen = now
+        self.lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def items(self):
+        return self._items
+
+    def get_total(self):
+        return self.totals.grand_total
+
+
+class CartService:
+    # Many carts against one shared catalog. Stock is reserved the moment a
+    # line is added (decrease_quantity under the SKU's lock) and handed back
+    # on removal or when a session sits idle longer than reservation_ttl.
+    # Locks are always taken session first, then SKU. An unknown or expired
+    # session id is treated like a closed one: operations that report success
+    # return False, and get_items, get_total and checkout return None.
+
+    def __init__(self, catalog, reservation_ttl=900, lock_stripes=256, clock=time.monotonic, ledger=None):
+        self.catalog = catalog
+        self.ledger = ledger
+        self._reservation_ttl = reservation_ttl
+        self._clock = clock
+        self._sku_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._reaper = None
+        self._stop_reaper = threading.Event()
+
+    def _sku_lock(self, product_id):
+        return self._sku_locks[hash(product_id) % len(self._sku_locks)]
+
+    def _product(self, product_id):
+        # A lazy catalog builds the Product on first lookup; doing that under
+        # the SKU lock keeps two threads from reserving against different copies.
+        with self._sku_lock(product_id):
+            return self.catalog.get(product_id)
+
+    def open_session(self):
+        session_id = uuid.uuid4().hex
+        with self._sessions_lock:
+            self._sessions[session_id] = CartSession(session_id, self._clock())
+        return session_id
+
+    def _session(self, session_id):
+        # last_seen is touched under the same lock the reaper checks it under,
+        # so a session is either seen as active or already gone.
+        with self._sessions_lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_seen = self._clock()
+        return session
+
+    def get_items(self, session_id):
+        session = self._session(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            return {pid: item.quantity for pid, item in session.items.items()}
+
+    def get_total(self, session_id):
+        session = self._session(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            return session.get_total()
+
+    def add_item(self, session_id, product_id, quantity):
+        product = self._product(product_id)
+        if not product or quantity <= 0:
+            return False
+
+        session = self._session(session_id)
+        if session is None:
+            return False
+        with session.lock:
+            if session.closed:
+                return False
+            with self._sku_lock(product_id):
+                if not product.decrease_quantity(quantity):
+                    return False
+            if product_id in session.items:
+                session.items[product_id].quantity += quantity
+            else:
+                session.items[product_id] = CartItem(product, quantity)
+            session.totals.apply(product, quantity)
+        return True
+
+    def update_quantity(self, session_id, product_id, new_quantity):
+        if new_quantity < 0:
+            return False
+
+        session = self._session(session_id)
+        if session is None:
+            return False
+        with session.lock:
+            item = session.items.get(product_id)
+            if item is None or session.closed:
+                return False
+            delta = new_quantity - item.quantity
+            with self._sku_lock(product_id):
+                if delta > 0 and not item.product.decrease_quantity(delta):
+                    return False
+                if delta < 0:
+                    item.product.increase_quantity(-delta)
+            if new_quantity == 0:
+                del session.items[product_id]
+            else:
+                item.quantity = new_quantity
+            session.totals.apply(item.product, delta)
+        return True
+
+    def remove_item(self, session_id, product_id):
+        session = self._session(session_id)
+        if session is None:
+            return False
+        with session.lock:
+            item = session.items.pop(product_id, None)
+            if item is None:
+                return False
+            self._release(item)
+            session.totals.apply(item.product, -item.quantity)
+        return True
+
+    def _release(self, item):
+        with self._sku_lock(item.product.show_product_id):
+            item.product.increase_quantity(item.quantity)
+
+    def checkout(self, session_id):
+        # Reserved stock is already deducted; checkout just closes the session.
+        session = self._session(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            lines = {pid: item.quantity for pid, item in session.items.items()}
+            total = session.get_total()
+            if self.ledger is not None:
+                self.ledger.record((item.product, item.quantity) for item in session.items.values())
+            session.items.clear()
+            session.totals.reset()
+            session.closed = True
+        with self._sessions_lock:
+            self._sessions.pop(session_id, None)
+        return lines, total
+
+    def close_session(self, session_id, if_idle_since=None):
+        # With if_idle_since, the session is only closed if it has not been
+        # used since then; the check and the removal happen under one lock.
+        with self._sessions_lock:
+            session = self._sessions.get(session_id)
+            if session is None or (if_idle_since is not None and session.last_seen >= if_idle_since):
+                return False
+            del self._sessions[session_id]
+        with session.lock:
+            for item in session.items.values():
+                self._release(item)
+            session.items.clear()
+            session.totals.reset()
+            session.closed = True
+        return True
+
+    def expire_abandoned(self):
+        cutoff = self._clock() - self._reservation_ttl
+        with self._sessions_lock:
+            expired = [sid for sid, s in self._sessions.items() if s.last_seen < cutoff]
+        return sum(1 for sid in expired if self.close_session(sid, if_idle_since=cutoff))
+
+    def start_reaper(self, interval=60):
+        if self._reaper is not None:
+            return
+        self._stop_reaper.clear()
+
+        def reap():
+            while not self._stop_reaper.wait(interval):
+                self.expire_abandoned()
+
+        self._reaper = threading.Thread(target=reap, name="cart-reservation-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        if self._reaper is None:
+            return
+        self._stop_reaper.set()
+        self._reaper.join()
+        self._reaper = None
+
+    @property
+    def session_count(self):
+        with self._sessions_lock:
+            return len(self._sessions)
+
+    def reserved_quantity(self, product_id):
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+        total = 0
+        for session in sessions:
+            with session.lock:
+                item = session.items.get(product_id)
+                if item is not None:
+                    total += item.quantity
+        return total
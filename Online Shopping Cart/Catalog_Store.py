@@ -0,0 +1,282 @@
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from os.path import exists
+
+PRODUCT_TYPES = ('product', 'physical', 'digital')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NOT_ON_DISK = -1
+_INDEX_VERSION = 1
+_INDEX_ARRAYS = ('_offsets', '_lengths', '_prices', '_stock', '_types')
+
+
+class CatalogStore:
+    # Dict-like view over product.json. A single scan records each product's
+    # byte span plus its price/stock/type in flat arrays; Product objects are
+    # only built (and then cached) when a product is actually looked up.
+    # The scan result is kept in a sidecar .idx file so later startups skip it.
+
+    def __init__(self, catalog_file, product_factory):
+        self._catalog_file = catalog_file
+        self._product_factory = product_factory
+        self._index = {}
+        self._ids = []
+        self._offsets = array('q')
+        self._lengths = array('q')
+        self._prices = array('d')
+        self._stock = array('q')
+        self._types = array('b')
+        self._loaded = {}
+        self._price_order = None
+        if exists(catalog_file) and not self._load_index_file():
+            self._build_index()
+            self._write_index_file()
+
+    @property
+    def _index_file(self):
+        return self._catalog_file + '.idx'
+
+    def _catalog_signature(self):
+        stat = os.stat(self._catalog_file)
+        return {"version": _INDEX_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load_index_file(self):
+        if not exists(self._index_file):
+            return False
+        with open(self._index_file, 'rb') as file:
+            try:
+                header = json.loads(file.readline())
+            except ValueError:
+                return False
+            if {k: header.get(k) for k in ("version", "size", "mtime_ns")} != self._catalog_signature():
+                return False
+            count = header["count"]
+            ids = file.read(header["ids_bytes"]).decode('utf-8').split('\n') if count else []
+            for name in _INDEX_ARRAYS:
+                values = array(getattr(self, name).typecode)
+                values.frombytes(file.read(count * values.itemsize))
+                setattr(self, name, values)
+        self._ids = ids
+        self._index = dict(zip(ids, range(count)))
+        return True
+
+    def _write_index_file(self):
+        ids = '\n'.join(self._index).encode('utf-8')
+        header = dict(self._catalog_signature(), count=len(self._index), ids_bytes=len(ids))
+        tmp_path = self._index_file + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(json.dumps(header).encode('utf-8') + b'\n')
+            file.write(ids)
+            for name in _INDEX_ARRAYS:
+                getattr(self, name).tofile(file)
+        os.replace(tmp_path, self._index_file)
+
+    def _build_index(self):
+        with open(self._catalog_file, 'rb') as file:
+            raw = file.read()
+        # latin-1 maps bytes 1:1 onto characters, so string offsets are file offsets.
+        text = raw.decode('latin-1')
+        decoder = json.JSONDecoder()
+
+        pos = _WHITESPACE.match(text, 0).end()
+        if text[pos:pos + 1] != '{':
+            raise ValueError(f"{self._catalog_file} is not a JSON object of products")
+        pos = _WHITESPACE.match(text, pos + 1).end()
+        if text[pos:pos + 1] == '}':
+            return
+
+        while True:
+            _, pos = decoder.raw_decode(text, pos)
+            pos = _WHITESPACE.match(text, pos).end()
+            if text[pos] != ':':
+                raise ValueError(f"Malformed catalog near byte {pos}")
+            start = _WHITESPACE.match(text, pos + 1).end()
+            p, end = decoder.raw_decode(text, start)
+
+            product_id = p["product_id"]
+            if not product_id.isascii():
+                product_id = json.loads(raw[start:end])["product_id"]
+            self._append(product_id, start, end - start, p["price"], p["quantity_available"],
+                         PRODUCT_TYPES.index(p.get("type", "product")))
+
+            pos = _WHITESPACE.match(text, end).end()
+            if text[pos] == '}':
+                break
+            if text[pos] != ',':
+                raise ValueError(f"Malformed catalog near byte {pos}")
+            pos = _WHITESPACE.match(text, pos + 1).end()
+
+    def _append(self, product_id, offset, length, price, stock, type_code):
+        if product_id in self._index:
+            # Later duplicates win, as they did with json.load.
+            i = self._index[product_id]
+            self._offsets[i], self._lengths[i] = offset, length
+            self._prices[i], self._stock[i], self._types[i] = price, stock, type_code
+            return
+        self._index[product_id] = len(self._ids)
+        self._ids.append(product_id)
+        self._offsets.append(offset)
+        self._lengths.append(length)
+        self._prices.append(price)
+        self._stock.append(stock)
+        self._types.append(type_code)
+
+    def _read_raw(self, i, file=None):
+        if file is not None:
+            file.seek(self._offsets[i])
+            return file.read(self._lengths[i])
+        with open(self._catalog_file, 'rb') as file:
+            file.seek(self._offsets[i])
+            return file.read(self._lengths[i])
+
+    def _materialize(self, product_id):
+        product = self._product_factory(json.loads(self._read_raw(self._index[product_id])))
+        self._loaded[product_id] = product
+        return product
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, product_id):
+        return product_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __getitem__(self, product_id):
+        product = self._loaded.get(product_id)
+        if product is None:
+            if product_id not in self._index:
+                raise KeyError(product_id)
+            product = self._materialize(product_id)
+        return product
+
+    def get(self, product_id, default=None):
+        if product_id in self._index:
+            return self[product_id]
+        return default
+
+    def __setitem__(self, product_id, product):
+        price, type_code = product.show_price, PRODUCT_TYPES.index(product.to_dict()["type"])
+        i = self._index.get(product_id)
+        if i is None:
+            self._append(product_id, _NOT_ON_DISK, 0, price, product.show_quantity_available, type_code)
+            if self._price_order is not None:
+                insort(self._price_order, (price, self._index[product_id]))
+        else:
+            # A replaced product keeps its slot; its on-disk record stays until
+            # the next snapshot re-serializes it from _loaded.
+            old_price = self._prices[i]
+            self._prices[i], self._stock[i], self._types[i] = price, product.show_quantity_available, type_code
+            if self._price_order is not None and old_price != price:
+                del self._price_order[bisect_left(self._price_order, (old_price, i))]
+                insort(self._price_order, (price, i))
+        self._loaded[product_id] = product
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self):
+        for product_id in self._index:
+            yield self[product_id]
+
+    def items(self):
+        for product_id in self._index:
+            yield product_id, self[product_id]
+
+    def iter_records(self):
+        # (product_id, dict) for every product without building Product objects.
+        source = open(self._catalog_file, 'rb') if exists(self._catalog_file) else None
+        try:
+            for i, product_id in enumerate(self._ids):
+                product = self._loaded.get(product_id)
+                if product is not None:
+                    yield product_id, product.to_dict()
+                else:
+                    yield product_id, json.loads(self._read_raw(i, source))
+        finally:
+            if source is not None:
+                source.close()
+
+    @property
+    def loaded_count(self):
+        return len(self._loaded)
+
+    def price(self, product_id):
+        product = self._loaded.get(product_id)
+        if product is not None:
+            return product.show_price
+        return self._prices[self._index[product_id]]
+
+    def stock(self, product_id):
+        product = self._loaded.get(product_id)
+        if product is not None:
+            return product.show_quantity_available
+        return self._stock[self._index[product_id]]
+
+    def product_type(self, product_id):
+        return PRODUCT_TYPES[self._types[self._index[product_id]]]
+
+    def _sorted_by_price(self):
+        # Built on first price query, then kept sorted as products are added
+        # or replaced. Cart operations only change stock, so nothing else re-sorts it.
+        if self._price_order is None:
+            self._price_order = sorted(zip(self._prices, range(len(self._prices))))
+        return self._price_order
+
+    def _ids_for(self, entries):
+        return [self._ids[i] for _, i in entries]
+
+    def price_range(self, low=None, high=None, limit=None):
+        order = self._sorted_by_price()
+        start = 0 if low is None else bisect_left(order, (low, -1))
+        end = len(order) if high is None else bisect_right(order, (high, len(order)))
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._ids_for(order[start:end])
+
+    def top_by_price(self, n, highest=True):
+        order = self._sorted_by_price()
+        if n <= 0:
+            return []
+        entries = order[max(len(order) - n, 0):][::-1] if highest else order[:n]
+        return self._ids_for(entries)
+
+    def write_snapshot(self, path):
+        # Untouched products are copied byte-for-byte from the current file;
+        # only materialized ones are re-serialized. Output matches json.dump(indent=4).
+        tmp_path = path + '.tmp'
+        source = open(self._catalog_file, 'rb') if exists(self._catalog_file) else None
+        new_offsets = array('q')
+        new_lengths = array('q')
+        try:
+            with open(tmp_path, 'wb') as out:
+                out.write(b'{' if self._index else b'{}')
+                for i, product_id in enumerate(self._index):
+                    product = self._loaded.get(product_id)
+                    if product is not None:
+                        body = json.dumps(product.to_dict(), indent=4).replace('\n', '\n    ').encode('utf-8')
+                        self._prices[i] = product.show_price
+                        self._stock[i] = product.show_quantity_available
+                    else:
+                        body = self._read_raw(i, source)
+                    out.write(b'\n    ' if i == 0 else b',\n    ')
+                    out.write(json.dumps(product_id).encode('utf-8') + b': ')
+                    new_offsets.append(out.tell())
+                    new_lengths.append(len(body))
+                    out.write(body)
+                if self._index:
+                    out.write(b'\n}')
+                out.flush()
+                os.fsync(out.fileno())
+        finally:
+            if source is not None:
+                source.close()
+        os.replace(tmp_path, path)
+        self._catalog_file = path
+        self._offsets = new_offsets
+        self._lengths = new_lengths
+        self._write_index_file()
@@ -0,0 +1,29 @@
+import argparse
+
+from Shopping_Cart import ShoppingCart
+from Storage_Backend import JsonStorage, SQLiteStorage
+
+
+def migrate_json_to_sqlite(product_catalog_file, cart_state_file, journal_file, database_file):
+    # Only read from, so its journal is never opened: no file is created and no handle is left behind.
+    json_storage = JsonStorage(product_catalog_file, cart_state_file, journal_file)
+    sqlite_storage = SQLiteStorage(database_file)
+    try:
+        sqlite_storage.import_json(json_storage, ShoppingCart._product_from_dict)
+    finally:
+        sqlite_storage.close(None, [])
+    return database_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy product.json/cart.json (and any journal tail) into SQLite")
+    parser.add_argument('--catalog', default='product.json')
+    parser.add_argument('--cart', default='cart.json')
+    parser.add_argument('--journal', default='cart.journal')
+    parser.add_argument('--db', default='shop.db')
+    args = parser.parse_args()
+
+    migrate_json_to_sqlite(args.catalog, args.cart, args.journal, args.db)
+    cart = ShoppingCart(storage=SQLiteStorage(args.db))
+    print(f"Migrated {len(cart.catalog)} products and {len(cart._items)} cart lines into {args.db}")
+    cart.close()
@@ -0,0 +1,316 @@
+import heapq
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+from os.path import exists
+
+_INDEX_VERSION = 1
+
+
+def _decimal(value):
+    return Decimal(str(value))
+
+
+class OrderLedger:
+    # Append-only record of checkouts. Each order is one JSON line written and
+    # fsynced before the cart is cleared, and is never rewritten. A sidecar
+    # .idx file holds each order's byte offset and timestamp plus the rollups
+    # below, checkpointed every checkpoint_every orders; on open only the
+    # ledger tail past the last checkpoint is replayed.
+    #
+    # Rollups are updated as each order is written, so queries never scan
+    # history: per-product units/revenue/orders, revenue per day and per hour,
+    # a running revenue total per day for date ranges, and products grouped
+    # by units sold for top-seller lists.
+
+    def __init__(self, ledger_file='orders.ledger', checkpoint_every=5000, sync=True, clock=time.time):
+        self._ledger_file = ledger_file
+        self._checkpoint_every = checkpoint_every
+        self._sync = sync
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._offsets = array('q')
+        self._placed_at = array('d')
+        self._products = {}
+        self._days = {}
+        self._hours = {}
+        self._day_keys = []
+        self._day_running = []
+        self._units_buckets = {}
+        self._units_order = []
+        self._since_checkpoint = 0
+        self._size = self._recover()
+        self._replay(self._load_index_file())
+        self._file = open(self._ledger_file, 'ab')
+        self._reader = None
+
+    @property
+    def _index_file(self):
+        return self._ledger_file + '.idx'
+
+    def _recover(self):
+        # Drop an order torn by a crash mid-write so new appends start on a clean line.
+        if not exists(self._ledger_file):
+            return 0
+        size = os.path.getsize(self._ledger_file)
+        with open(self._ledger_file, 'rb') as file:
+            file.seek(max(size - 1, 0))
+            if size == 0 or file.read(1) == b'\n':
+                return size
+            # Walk back to the last complete line.
+            position = size
+            while position > 0:
+                step = min(1 << 16, position)
+                file.seek(position - step)
+                block = file.read(step)
+                newline = block.rfind(b'\n')
+                if newline >= 0:
+                    position = position - step + newline + 1
+                    break
+                position -= step
+        with open(self._ledger_file, 'r+b') as file:
+            file.truncate(position)
+        return position
+
+    def _reset_index(self):
+        self._offsets = array('q')
+        self._placed_at = array('d')
+        self._products, self._days, self._hours = {}, {}, {}
+        self._day_keys, self._day_running = [], []
+        self._units_buckets, self._units_order = {}, []
+
+    def _load_index_file(self):
+        # Returns how many ledger bytes the loaded index covers; 0 when there
+        # is no usable index and the whole ledger has to be replayed.
+        if not exists(self._index_file):
+            return 0
+        with open(self._index_file, 'rb') as file:
+            try:
+                header = json.loads(file.readline())
+            except ValueError:
+                return 0
+            # The ledger only grows; an index covering more bytes than the
+            # ledger holds belongs to some other file.
+            if header.get("version") != _INDEX_VERSION or header["ledger_bytes"] > self._size:
+                return 0
+            rollups = json.loads(file.read(header["rollups_bytes"]))
+            count = header["count"]
+            self._offsets.frombytes(file.read(count * self._offsets.itemsize))
+            self._placed_at.frombytes(file.read(count * self._placed_at.itemsize))
+        if len(self._offsets) != count or len(self._placed_at) != count:
+            self._reset_index()
+            return 0
+
+        self._products = {pid: [units, Decimal(revenue), orders]
+                          for pid, (units, revenue, orders) in rollups["products"].items()}
+        self._days = {key: [Decimal(revenue), orders, units] for key, (revenue, orders, units) in rollups["days"].items()}
+        self._hours = {key: [Decimal(revenue), orders, units] for key, (revenue, orders, units) in rollups["hours"].items()}
+        running = Decimal(0)
+        for key in sorted(self._days):
+            running += self._days[key][0]
+            self._day_keys.append(key)
+            self._day_running.append(running)
+        for pid, (units, _, _) in self._products.items():
+            self._add_to_bucket(pid, units)
+        return header["ledger_bytes"]
+
+    def _replay(self, start):
+        # Apply the orders written after the last checkpoint.
+        if start >= self._size:
+            return
+        with open(self._ledger_file, 'rb') as file:
+            file.seek(start)
+            offset = start
+            for line in file:
+                self._apply(json.loads(line), offset)
+                offset += len(line)
+                self._since_checkpoint += 1
+
+    def _write_index_file(self):
+        rollups = json.dumps({
+            "products": {pid: [units, str(revenue), orders] for pid, (units, revenue, orders) in self._products.items()},
+            "days": {key: [str(revenue), orders, units] for key, (revenue, orders, units) in self._days.items()},
+            "hours": {key: [str(revenue), orders, units] for key, (revenue, orders, units) in self._hours.items()},
+        }, separators=(',', ':')).encode('utf-8')
+        header = {"version": _INDEX_VERSION, "ledger_bytes": self._size, "count": len(self._offsets),
+                  "rollups_bytes": len(rollups)}
+        tmp_path = self._index_file + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(json.dumps(header).encode('utf-8') + b'\n')
+            file.write(rollups)
+            self._offsets.tofile(file)
+            self._placed_at.tofile(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self._index_file)
+        self._since_checkpoint = 0
+
+    def _add_to_bucket(self, product_id, units):
+        bucket = self._units_buckets.get(units)
+        if bucket is None:
+            bucket = self._units_buckets[units] = {}
+            insort(self._units_order, units)
+        bucket[product_id] = None
+
+    def _move_bucket(self, product_id, old_units, new_units):
+        bucket = self._units_buckets[old_units]
+        del bucket[product_id]
+        if not bucket:
+            del self._units_buckets[old_units]
+            del self._units_order[bisect_left(self._units_order, old_units)]
+        self._add_to_bucket(product_id, new_units)
+
+    @staticmethod
+    def _bucket_keys(placed_at):
+        local = time.localtime(placed_at)
+        return time.strftime('%Y-%m-%d', local), time.strftime('%Y-%m-%dT%H', local)
+
+    def _apply(self, order, offset):
+        self._offsets.append(offset)
+        self._placed_at.append(order["placed_at"])
+        total = Decimal(order["total"])
+        units = order["item_count"]
+
+        for line in order["lines"]:
+            pid, quantity = line["product_id"], line["quantity"]
+            counters = self._products.get(pid)
+            if counters is None:
+                counters = self._products[pid] = [0, Decimal(0), 0]
+                self._add_to_bucket(pid, quantity)
+            else:
+                self._move_bucket(pid, counters[0], counters[0] + quantity)
+            counters[0] += quantity
+            counters[1] += Decimal(line["subtotal"])
+            counters[2] += 1
+
+        day, hour = self._bucket_keys(order["placed_at"])
+        for buckets, key in ((self._days, day), (self._hours, hour)):
+            rollup = buckets.setdefault(key, [Decimal(0), 0, 0])
+            rollup[0] += total
+            rollup[1] += 1
+            rollup[2] += units
+        # Orders are timestamped in increasing order, so a new day is always the last one.
+        if self._day_keys and self._day_keys[-1] == day:
+            self._day_running[-1] += total
+        else:
+            self._day_keys.append(day)
+            self._day_running.append((self._day_running[-1] if self._day_running else Decimal(0)) + total)
+
+    def record(self, lines, placed_at=None):
+        # lines: (product, quantity) pairs from a cart at checkout. Stock was
+        # taken by decrease_quantity as each line was added, so stock_delta is
+        # the quantity sold and stock_after the level left on the shelf.
+        with self._lock:
+            if placed_at is None:
+                placed_at = self._clock()
+            if self._placed_at:
+                placed_at = max(placed_at, self._placed_at[-1])
+            records = []
+            total = Decimal(0)
+            item_count = 0
+            for product, quantity in lines:
+                subtotal = _decimal(product.show_price) * quantity
+                records.append({"product_id": product.show_product_id, "name": product.show_name,
+                                "type": product.to_dict().get("type", "product"),
+                                "unit_price": str(_decimal(product.show_price)), "quantity": quantity,
+                                "subtotal": str(subtotal), "stock_delta": -quantity,
+                                "stock_after": product.show_quantity_available})
+                total += subtotal
+                item_count += quantity
+            if not records:
+                return None
+
+            order = {"order_id": len(self._offsets) + 1, "placed_at": placed_at, "lines": records,
+                     "item_count": item_count, "total": str(total)}
+            line = (json.dumps(order, separators=(',', ':')) + '\n').encode('utf-8')
+            self._file.write(line)
+            self._file.flush()
+            if self._sync:
+                os.fsync(self._file.fileno())
+            self._apply(order, self._size)
+            self._size += len(line)
+
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self._checkpoint_every:
+                self._write_index_file()
+            return order
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def get(self, order_id):
+        with self._lock:
+            if not 1 <= order_id <= len(self._offsets):
+                return None
+            if self._reader is None:
+                self._reader = open(self._ledger_file, 'rb')
+            self._reader.seek(self._offsets[order_id - 1])
+            return json.loads(self._reader.readline())
+
+    def orders_between(self, start, end):
+        # Orders placed in [start, end), as epoch seconds.
+        with self._lock:
+            first = bisect_left(self._placed_at, start)
+            last = bisect_left(self._placed_at, end)
+        for order_id in range(first + 1, last + 1):
+            yield self.get(order_id)
+
+    def product_sales(self, product_id):
+        with self._lock:
+            units, revenue, orders = self._products.get(product_id, (0, Decimal(0), 0))
+            return {"units": units, "revenue": revenue, "orders": orders}
+
+    def top_sellers(self, n=10):
+        # (product_id, units, revenue) by units sold, ties by product id.
+        result = []
+        with self._lock:
+            for units in reversed(self._units_order):
+                if len(result) >= n:
+                    break
+                for pid in heapq.nsmallest(n - len(result), self._units_buckets[units]):
+                    result.append((pid, units, self._products[pid][1]))
+        return result
+
+    def _bucket_rollup(self, buckets, key):
+        revenue, orders, units = buckets.get(key, (Decimal(0), 0, 0))
+        return {"revenue": revenue, "orders": orders, "units": units}
+
+    def day(self, day=None):
+        # day as 'YYYY-MM-DD' in local time; today by default.
+        with self._lock:
+            return self._bucket_rollup(self._days, day or self._bucket_keys(self._clock())[0])
+
+    def hour(self, hour=None):
+        # hour as 'YYYY-MM-DDTHH' in local time; the current hour by default.
+        with self._lock:
+            return self._bucket_rollup(self._hours, hour or self._bucket_keys(self._clock())[1])
+
+    def revenue_today(self):
+        return self.day()["revenue"]
+
+    def revenue_between(self, first_day, last_day):
+        # Revenue over the days first_day..last_day inclusive, from the running totals.
+        with self._lock:
+            i = bisect_left(self._day_keys, first_day)
+            j = bisect_right(self._day_keys, last_day)
+            if j <= i:
+                return Decimal(0)
+            return self._day_running[j - 1] - (self._day_running[i - 1] if i else Decimal(0))
+
+    def checkpoint(self):
+        with self._lock:
+            self._write_index_file()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._since_checkpoint:
+                self._write_index_file()
+            self._file.close()
+            if self._reader is not None:
+                self._reader.close()
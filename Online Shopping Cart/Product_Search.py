@@ -0,0 +1,134 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+class SearchPage:
+    __slots__ = ('product_ids', 'total', 'page', 'page_size')
+
+    def __init__(self, product_ids, total, page, page_size):
+        self.product_ids = product_ids
+        self.total = total
+        self.page = page
+        self.page_size = page_size
+
+    @property
+    def page_count(self):
+        return max(1, -(-self.total // self.page_size))
+
+
+class ProductSearch:
+    # Inverted index over product names. Built once from the catalog records
+    # (no Product objects are created) and then kept current from the cart's
+    # journal ops, so new products and stock-outs never need a rebuild.
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._postings = {}
+        # product_id -> its name's tokens, to drop them when the product is replaced
+        self._tokens = {}
+        self._vocabulary = []
+        self._out_of_stock = set()
+        for product_id, record in catalog.iter_records():
+            self._index_name(product_id, record["name"])
+            if record["quantity_available"] <= 0:
+                self._out_of_stock.add(product_id)
+
+    def _index_name(self, product_id, name):
+        tokens = set(tokenize(name))
+        for token in set(self._tokens.get(product_id, ())) - tokens:
+            ids = self._postings[token]
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+        self._tokens[product_id] = tuple(tokens)
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = {product_id}
+                insort(self._vocabulary, token)
+            else:
+                ids.add(product_id)
+
+    def apply_op(self, op):
+        if op['op'] == 'product':
+            product = op['product']
+            self._index_name(product['product_id'], product['name'])
+            self._update_stock(product['product_id'], product['quantity_available'])
+        elif op['op'] == 'stock':
+            self._update_stock(op['product_id'], op['quantity_available'])
+
+    def _update_stock(self, product_id, quantity_available):
+        if quantity_available > 0:
+            self._out_of_stock.discard(product_id)
+        else:
+            self._out_of_stock.add(product_id)
+
+    def suggest(self, prefix, limit=10):
+        prefix = prefix.lower()
+        start = bisect_left(self._vocabulary, prefix)
+        suggestions = []
+        for token in self._vocabulary[start:start + limit]:
+            if not token.startswith(prefix):
+                break
+            suggestions.append(token)
+        return suggestions
+
+    def _prefix_matches(self, prefix):
+        # Every vocabulary token starting with prefix sorts between prefix and
+        # prefix followed by the highest code point.
+        matches = set()
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_right(self._vocabulary, prefix + '\U0010ffff', start)
+        for token in self._vocabulary[start:end]:
+            matches |= self._postings[token]
+        return matches
+
+    def _candidates(self, query, min_price, max_price):
+        tokens = tokenize(query)
+        if not tokens:
+            if min_price is not None or max_price is not None:
+                return set(self._catalog.price_range(min_price, max_price))
+            return None
+
+        # Every complete word must match; the last word may still be being typed.
+        postings = [self._postings.get(t, set()) for t in tokens[:-1]]
+        postings.append(self._prefix_matches(tokens[-1]))
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def search(self, query='', product_type=None, min_price=None, max_price=None,
+               in_stock=None, page=1, page_size=20):
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be at least 1.")
+        candidates = self._candidates(query, min_price, max_price)
+        if candidates is None:
+            candidates = self._catalog.keys()
+
+        catalog = self._catalog
+        matched = []
+        for product_id in candidates:
+            if in_stock is not None and (product_id not in self._out_of_stock) != in_stock:
+                continue
+            if product_type is not None and catalog.product_type(product_id) != product_type:
+                continue
+            if min_price is not None or max_price is not None:
+                price = catalog.price(product_id)
+                if (min_price is not None and price < min_price) or (max_price is not None and price > max_price):
+                    continue
+            matched.append(product_id)
+
+        matched.sort()
+        start = (page - 1) * page_size
+        return SearchPage(matched[start:start + page_size], len(matched), page, page_size)
@@ -1,8 +1,15 @@
+import argparse
+from decimal import Decimal
 
-import json
-from os.path import exists
+import Cart_Metrics
+from Cart_Metrics import timed
+from Order_Ledger import OrderLedger
+from Product_Search import ProductSearch
+from Storage_Backend import JsonStorage
 
 class Product:
+    __slots__ = ('_product_id', '_name', '_price', '_quantity_available')
+
     def __init__(self, product_id: str, name: str, price: float, quantity_available:int):
         self._product_id = product_id
         self._name = name
@@ -55,6 +62,8 @@ class Product:
         }
 
 class PhysicalProduct(Product):
+    __slots__ = ('_weight',)
+
     def __init__(self, product_id, name, price, quantity_available, weight):
         super().__init__(product_id, name, price, quantity_available)
         self._weight = weight
@@ -73,6 +82,8 @@ class PhysicalProduct(Product):
         return data
 
 class DigitalProduct(Product):
+    __slots__ = ('_download_link',)
+
     def __init__(self, product_id, name, price, quantity_available, download_link):
         super().__init__(product_id, name, price, quantity_available)
         self._download_link = download_link
@@ -91,6 +102,8 @@ class DigitalProduct(Product):
         return data
 
 class CartItem:
+    __slots__ = ('_product', '_quantity')
+
     def __init__(self, product: Product, quantity: int):
         self._product = product
         self._quantity = quantity
@@ -121,66 +134,135 @@ class CartItem:
             "quantity": self._quantity
         }
 
+class CartTotals:
+    # Running cart aggregates, kept exact with Decimal and updated per line
+    # change so reading them never walks the cart.
+    __slots__ = ('grand_total', 'item_count', 'subtotals', 'physical_weight', 'digital_count')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.grand_total = Decimal(0)
+        self.item_count = 0
+        self.subtotals = {"product": Decimal(0), "physical": Decimal(0), "digital": Decimal(0)}
+        self.physical_weight = Decimal(0)
+        self.digital_count = 0
+
+    @staticmethod
+    def _decimal(value):
+        return Decimal(str(value))
+
+    def apply(self, product, delta):
+        if not delta:
+            return
+        amount = self._decimal(product.show_price) * delta
+        self.grand_total += amount
+        self.item_count += delta
+        if isinstance(product, PhysicalProduct):
+            self.subtotals["physical"] += amount
+            self.physical_weight += self._decimal(product.weight) * delta
+        elif isinstance(product, DigitalProduct):
+            self.subtotals["digital"] += amount
+            self.digital_count += delta
+        else:
+            self.subtotals["product"] += amount
+
+    def rebuild(self, items):
+        self.reset()
+        for item in items:
+            self.apply(item.product, item.quantity)
+
 class ShoppingCart:
     
-    def __init__(self, product_catalog_file='product.json', cart_state_file='cart.json'):
-        self._product_catalog_file = product_catalog_file
-        self._cart_state_file = cart_state_file
+    def __init__(self, product_catalog_file='product.json', cart_state_file='cart.json',
+                 journal_file='cart.journal', compact_every=500, storage=None, order_ledger_file='orders.ledger'):
+        if storage is None:
+            storage = JsonStorage(product_catalog_file, cart_state_file, journal_file, compact_every)
+        self._storage = storage
+        self._search = None
+        self._order_ledger_file = order_ledger_file
+        self._ledger = None
         self.catalog = self._load_catalog()
         self._items = {}
+        self._totals = CartTotals()
         self._load_cart_state()
+        self._totals.rebuild(self._items.values())
         self._admin_username = "admin"
         self._admin_password = "admin123"
 
+    @staticmethod
+    def _product_from_dict(p):
+        p_type = p.get('type')
+        if p_type == 'physical':
+            return PhysicalProduct(
+                p["product_id"], p["name"], p["price"], p["quantity_available"], p["weight"]
+            )
+        elif p_type == 'digital':
+            return DigitalProduct(
+                p["product_id"], p["name"], p["price"], p["quantity_available"], p["download_link"]
+            )
+        return Product(
+            p["product_id"], p["name"], p["price"], p["quantity_available"]
+        )
 
     def _load_catalog(self):
-        catalog = {}
-        if not exists(self._product_catalog_file):
-            return catalog
-
-        with open(self._product_catalog_file, 'r') as file:
-            products = json.load(file)
-            for p in products.values():
-                p_type = p.get('type')
-                if p_type == 'physical':
-                    product = PhysicalProduct(
-                        p["product_id"], p["name"], p["price"], p["quantity_available"], p["weight"]
-                    )
-                elif p_type == 'digital':
-                    product = DigitalProduct(
-                        p["product_id"], p["name"], p["price"], p["quantity_available"], p["download_link"]
-                    )
-                else:
-                    product = Product(
-                        p["product_id"], p["name"], p["price"], p["quantity_available"]
-                    )
-                catalog[product.show_product_id] = product
-        return catalog
-
+        return self._storage.load_catalog(self._product_from_dict)
 
     def _load_cart_state(self):
-        if not exists(self._cart_state_file):
-            return
-        with open(self._cart_state_file, 'r') as file:
-            cart_data = json.load(file)
-            for item in cart_data:
-                pid = item['product_id']
-                qty = item['quantity']
-                product = self.catalog.get(pid)
-                if product:
-                    self._items[pid] = CartItem(product, qty)
+        for pid, qty in self._storage.load_cart().items():
+            product = self.catalog.get(pid)
+            if product and qty > 0:
+                self._items[pid] = CartItem(product, qty)
 
+    @timed('save_catalog', storage=True)
     def _save_catalog(self):
-        with open(self._product_catalog_file, 'w') as file:
-            json.dump({p.show_product_id: p.to_dict() for p in self.catalog.values()}, file, indent=4)
+        self._storage.save_catalog(self.catalog)
 
+    @timed('save_cart_state', storage=True)
     def _save_cart_state(self):
-        with open(self._cart_state_file, 'w') as file:
-            json.dump([item.to_dict() for item in self._items.values()], file, indent=4)
+        self._storage.save_cart(self._items.values())
 
+    @timed('compact', storage=True)
+    def compact(self):
+        self._storage.compact(self.catalog, self._items.values())
+
+    def close(self):
+        self._storage.close(self.catalog, self._items.values())
+        if self._ledger is not None:
+            self._ledger.close()
+
+    @property
+    def ledger(self):
+        # Opened on first use so carts that never check out don't load order history.
+        if self._ledger is None:
+            self._ledger = OrderLedger(self._order_ledger_file)
+        return self._ledger
+
+    def _record(self, *ops):
+        self._storage.record(*ops)
+        if self._search is not None:
+            for op in ops:
+                self._search.apply_op(op)
+        if self._storage.needs_compaction():
+            self.compact()
+
+    @staticmethod
+    def _stock_op(product, delta):
+        return {"op": "stock", "product_id": product.show_product_id, "delta": delta,
+                "quantity_available": product.show_quantity_available}
+
+    @staticmethod
+    def _cart_op(product_id, quantity):
+        return {"op": "cart", "product_id": product_id, "quantity": quantity}
+
+    @timed('add_item')
     def add_item(self, product_id, quantity):
         product = self.catalog.get(product_id)
-        if not product or product.show_quantity_available < quantity:
+        if not product or quantity <= 0:
+            return False
+        if product.show_quantity_available < quantity:
+            Cart_Metrics.stock_out('add_item')
             return False
 
         if product_id in self._items:
@@ -188,19 +270,23 @@ class ShoppingCart:
         else:
             self._items[product_id] = CartItem(product, quantity)
         product.decrease_quantity(quantity)
-        self._save_cart_state()
-        self._save_catalog()
+        self._totals.apply(product, quantity)
+        self._record(self._stock_op(product, -quantity),
+                     self._cart_op(product_id, self._items[product_id].quantity))
         return True
 
+    @timed('remove_item')
     def remove_item(self, product_id):
         if product_id in self._items:
             item = self._items.pop(product_id)
             item.product.increase_quantity(item.quantity)
-            self._save_cart_state()
-            self._save_catalog()
+            self._totals.apply(item.product, -item.quantity)
+            self._record(self._stock_op(item.product, item.quantity),
+                         self._cart_op(product_id, 0))
             return True
         return False
 
+    @timed('update_quantity')
     def update_quantity(self, product_id, new_quantity):
         if product_id not in self._items or new_quantity < 0:
             return False
@@ -209,6 +295,7 @@ class ShoppingCart:
         delta = new_quantity - item.quantity
 
         if delta > 0 and item.product.show_quantity_available < delta:
+            Cart_Metrics.stock_out('update_quantity')
             return False
 
         if delta > 0:
@@ -217,16 +304,84 @@ class ShoppingCart:
             item.product.increase_quantity(-delta)
 
         item.quantity = new_quantity
+        self._totals.apply(item.product, delta)
 
         if new_quantity == 0:
             del self._items[product_id]
 
-        self._save_cart_state()
-        self._save_catalog()
+        self._record(self._stock_op(item.product, -delta),
+                     self._cart_op(product_id, new_quantity))
+        return True
+
+    def apply_batch(self, changes):
+        # changes: cart.json-style lines, {"product_id": ..., "quantity": ...},
+        # with an optional "op" of "add" (default), "set" or "remove".
+        # Either every line applies and the batch is journaled in one write, or nothing changes.
+        targets = {}
+        for change in changes:
+            op = change.get("op", "add")
+            pid = change["product_id"]
+            quantity = change.get("quantity", 0)
+            if pid not in self.catalog or quantity < 0 or op not in ("add", "set", "remove"):
+                return False
+            current = targets.get(pid, self._items[pid].quantity if pid in self._items else 0)
+            if op == "add":
+                if quantity == 0:
+                    return False
+                targets[pid] = current + quantity
+            elif op == "set":
+                targets[pid] = quantity
+            else:
+                targets[pid] = 0
+
+        deltas = {}
+        for pid, target in targets.items():
+            delta = target - (self._items[pid].quantity if pid in self._items else 0)
+            if delta > 0 and self.catalog[pid].show_quantity_available < delta:
+                Cart_Metrics.stock_out('apply_batch')
+                return False
+            if delta:
+                deltas[pid] = delta
+
+        ops = []
+        for pid, delta in deltas.items():
+            product = self.catalog[pid]
+            if delta > 0:
+                product.decrease_quantity(delta)
+            else:
+                product.increase_quantity(-delta)
+
+            target = targets[pid]
+            if target == 0:
+                del self._items[pid]
+            elif pid in self._items:
+                self._items[pid].quantity = target
+            else:
+                self._items[pid] = CartItem(product, target)
+            self._totals.apply(product, delta)
+            ops.append(self._stock_op(product, -delta))
+            ops.append(self._cart_op(pid, target))
+
+        self._record(*ops)
         return True
 
+    def checkout(self):
+        if not self._items:
+            return None
+        # The order is on disk before the cart is cleared, so a crash in between
+        # can at worst record the order twice, never lose it.
+        order = self.ledger.record((item.product, item.quantity) for item in self._items.values())
+        self._items.clear()
+        self._totals.reset()
+        self._record({"op": "cart_clear"})
+        return order
+
     def get_total(self):
-        return sum(item.calculate_subtotal() for item in self._items.values())
+        return self._totals.grand_total
+
+    @property
+    def totals(self):
+        return self._totals
 
     def display_cart(self):
         if not self._items:
@@ -246,6 +401,30 @@ class ShoppingCart:
             print(product.display_details())
             print()
     
+    @property
+    def search(self):
+        if self._search is None:
+            self._search = ProductSearch(self.catalog)
+        return self._search
+
+    def search_products(self):
+        query = self._input_or_menu("Search products (or type MENU to back to menu): ")
+        if query is None:
+            return
+        page = 1
+        while True:
+            results = self.search.search(query, page=page, page_size=10)
+            if not results.total:
+                print("No matching products.")
+                return
+            for product_id in results.product_ids:
+                print(self.catalog[product_id].display_details())
+                print()
+            print(f"Page {results.page} of {results.page_count} ({results.total} matches)")
+            if results.page >= results.page_count or input("Next page? (y/n): ").strip().lower() != 'y':
+                return
+            page += 1
+
     def _input_or_menu(self, prompt):
         value = input(prompt).strip()
         if value.upper() == "MENU":
@@ -286,10 +465,13 @@ class ShoppingCart:
             download_link = input("Enter Download Link: ").strip()
             product = DigitalProduct(product_id, name, price, quantity, download_link)
 
-        self.catalog[product_id] = product
-        self._save_catalog()
+        self.add_product(product)
         print("Product added successfully!")
 
+    def add_product(self, product):
+        self.catalog[product.show_product_id] = product
+        self._record({"op": "product", "product": product.to_dict()})
+
     def authenticate_admin(self):
         print("\nAdmin Authentication")
         username = input("Enter admin username: ").strip()
@@ -315,9 +497,10 @@ class ShoppingCart:
             print("6. Checkout")
             print("7. Add New Product to Store")
             print("8. Exit")
+            print("9. Search Products")
             print("\n================================\n")
 
-            choice = input("Enter your choice (1-8): ")
+            choice = input("Enter your choice (1-9): ")
 
             if choice == '1':
                 self.display_products()
@@ -380,16 +563,16 @@ class ShoppingCart:
                     print("Item not found in cart.")
 
             elif choice == '6':
-                total = self.get_total()
                 print("\nFinal Cart Summary:")
                 self.display_cart()
+                order = self.checkout()
+                if order is not None:
+                    print(f"Order #{order['order_id']} placed.")
                 print("Thank you for shopping with us!")
-                
-                self._items.clear()
-                self._save_cart_state()
 
             elif choice == '8':
                 print("Exiting program. Have a nice day!")
+                self.close()
                 break
 
             elif choice == '7':
@@ -398,8 +581,19 @@ class ShoppingCart:
                 else:
                     print("Access denied. Returning to main menu.")
 
-            else:
-                print("Invalid choice. Please select a number between 1 and 7.")
+            elif choice == '9':
+                self.search_products()
 
-cart = ShoppingCart()
-cart.run()
+            else:
+                print("Invalid choice. Please select a number between 1 and 9.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Online shopping cart")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="serve Prometheus metrics on 127.0.0.1:<port>/metrics")
+    args = parser.parse_args()
+    if args.metrics_port is not None:
+        Cart_Metrics.enable(args.metrics_port)
+
+    cart = ShoppingCart()
+    cart.run()
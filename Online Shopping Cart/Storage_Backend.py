@@ -0,0 +1,308 @@
+import json
+import os
+import sqlite3
+from os.path import exists
+
+from Cart_Journal import OperationJournal
+from Catalog_Store import CatalogStore
+
+# Every backend answers the same calls from ShoppingCart:
+#   load_catalog(product_factory) -> dict-like catalog
+#   load_cart() -> {product_id: quantity}
+#   record(*ops), needs_compaction(), compact(catalog, items),
+#   save_catalog(catalog), save_cart(items), close(catalog, items)
+# where ops are the journal entries built by ShoppingCart._stock_op/_cart_op.
+
+
+def write_json_snapshot(path, data):
+    # Write next to the target and swap it in, so a crash never leaves a half-written snapshot.
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file, indent=4)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class JsonStorage:
+    # product.json / cart.json snapshots plus the operation journal.
+
+    def __init__(self, product_catalog_file='product.json', cart_state_file='cart.json',
+                 journal_file='cart.journal', compact_every=500):
+        self._product_catalog_file = product_catalog_file
+        self._cart_state_file = cart_state_file
+        self._journal = OperationJournal(journal_file, compact_every)
+
+    def load_catalog(self, product_factory):
+        catalog = CatalogStore(self._product_catalog_file, product_factory)
+        for op in self._journal.replay():
+            if op['op'] == 'product':
+                product = product_factory(op['product'])
+                catalog[product.show_product_id] = product
+            elif op['op'] == 'stock':
+                product = catalog.get(op['product_id'])
+                if product:
+                    product.show_quantity_available = op['quantity_available']
+        return catalog
+
+    def load_cart(self):
+        lines = {}
+        if exists(self._cart_state_file):
+            with open(self._cart_state_file, 'r') as file:
+                for item in json.load(file):
+                    lines[item['product_id']] = item['quantity']
+
+        for op in self._journal.replay():
+            if op['op'] == 'cart':
+                if op['quantity'] == 0:
+                    lines.pop(op['product_id'], None)
+                else:
+                    lines[op['product_id']] = op['quantity']
+            elif op['op'] == 'cart_clear':
+                lines.clear()
+        return lines
+
+    def record(self, *ops):
+        self._journal.append(*ops)
+
+    def needs_compaction(self):
+        return self._journal.needs_compaction()
+
+    def save_catalog(self, catalog):
+        catalog.write_snapshot(self._product_catalog_file)
+
+    def save_cart(self, items):
+        write_json_snapshot(self._cart_state_file, [item.to_dict() for item in items])
+
+    def compact(self, catalog, items):
+        self.save_catalog(catalog)
+        self.save_cart(items)
+        self._journal.reset()
+
+    def close(self, catalog, items):
+        if self._journal.pending_entries:
+            self.compact(catalog, items)
+        self._journal.close()
+
+
+_PRODUCT_COLUMNS = "product_id, type, name, price, quantity_available, weight, download_link"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity_available INTEGER NOT NULL,
+    weight REAL,
+    download_link TEXT
+);
+CREATE INDEX IF NOT EXISTS products_price ON products (price);
+CREATE TABLE IF NOT EXISTS cart_items (
+    product_id TEXT PRIMARY KEY,
+    quantity INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+"""
+
+# Kept as module constants so the connection's statement cache reuses the
+# compiled statements on every call.
+_SELECT_PRODUCT = f"SELECT {_PRODUCT_COLUMNS} FROM products WHERE product_id = ?"
+_UPSERT_PRODUCT = f"INSERT OR REPLACE INTO products ({_PRODUCT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_UPDATE_STOCK = "UPDATE products SET quantity_available = ? WHERE product_id = ?"
+_UPSERT_CART = ("INSERT INTO cart_items (product_id, quantity, position) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(position), 0) + 1 FROM cart_items)) "
+                "ON CONFLICT (product_id) DO UPDATE SET quantity = excluded.quantity")
+_DELETE_CART = "DELETE FROM cart_items WHERE product_id = ?"
+
+
+def _product_row(p):
+    return (p["product_id"], p.get("type", "product"), p["name"], p["price"], p["quantity_available"],
+            p.get("weight"), p.get("download_link"))
+
+
+def _row_dict(row):
+    p = {"type": row[1], "product_id": row[0], "name": row[2], "price": row[3], "quantity_available": row[4]}
+    if row[1] == "physical":
+        p["weight"] = row[5]
+    elif row[1] == "digital":
+        p["download_link"] = row[6]
+    return p
+
+
+class SQLiteCatalog:
+    # Same dict-like surface as CatalogStore, backed by the products table.
+    # Looked-up products are cached so stock changes act on a single object.
+
+    def __init__(self, connection, product_factory):
+        self._conn = connection
+        self._product_factory = product_factory
+        self._loaded = {}
+        self._count = connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, product_id):
+        return product_id in self._loaded or self._conn.execute(
+            "SELECT 1 FROM products WHERE product_id = ? LIMIT 1", (product_id,)).fetchone() is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, product_id):
+        product = self.get(product_id)
+        if product is None:
+            raise KeyError(product_id)
+        return product
+
+    def get(self, product_id, default=None):
+        product = self._loaded.get(product_id)
+        if product is not None:
+            return product
+        row = self._conn.execute(_SELECT_PRODUCT, (product_id,)).fetchone()
+        if row is None:
+            return default
+        product = self._loaded[product_id] = self._product_factory(_row_dict(row))
+        return product
+
+    def __setitem__(self, product_id, product):
+        # The row itself is written when ShoppingCart records the "product" op.
+        if product_id not in self._loaded and self._conn.execute(
+                "SELECT 1 FROM products WHERE product_id = ?", (product_id,)).fetchone() is None:
+            self._count += 1
+        self._loaded[product_id] = product
+
+    def keys(self):
+        return [row[0] for row in self._conn.execute("SELECT product_id FROM products ORDER BY rowid")]
+
+    def values(self):
+        for product_id in self.keys():
+            yield self[product_id]
+
+    def items(self):
+        for product_id in self.keys():
+            yield product_id, self[product_id]
+
+    def iter_records(self):
+        for row in self._conn.execute(f"SELECT {_PRODUCT_COLUMNS} FROM products ORDER BY rowid"):
+            product = self._loaded.get(row[0])
+            yield row[0], product.to_dict() if product is not None else _row_dict(row)
+
+    @property
+    def loaded_count(self):
+        return len(self._loaded)
+
+    def _column(self, product_id, column):
+        row = self._conn.execute(f"SELECT {column} FROM products WHERE product_id = ?", (product_id,)).fetchone()
+        if row is None:
+            raise KeyError(product_id)
+        return row[0]
+
+    def price(self, product_id):
+        product = self._loaded.get(product_id)
+        return product.show_price if product is not None else self._column(product_id, "price")
+
+    def stock(self, product_id):
+        product = self._loaded.get(product_id)
+        if product is not None:
+            return product.show_quantity_available
+        return self._column(product_id, "quantity_available")
+
+    def product_type(self, product_id):
+        return self._column(product_id, "type")
+
+    def price_range(self, low=None, high=None, limit=None):
+        low = float('-inf') if low is None else low
+        high = float('inf') if high is None else high
+        return [row[0] for row in self._conn.execute(
+            "SELECT product_id FROM products WHERE price BETWEEN ? AND ? ORDER BY price, rowid LIMIT ?",
+            (low, high, -1 if limit is None else limit))]
+
+    def top_by_price(self, n, highest=True):
+        order = "DESC" if highest else "ASC"
+        return [row[0] for row in self._conn.execute(
+            f"SELECT product_id FROM products ORDER BY price {order}, rowid {order} LIMIT ?", (max(n, 0),))]
+
+
+class SQLiteStorage:
+    # Row-level persistence: each recorded op is one UPDATE/UPSERT/DELETE in a
+    # single transaction on one long-lived WAL-mode connection.
+
+    def __init__(self, database_file='shop.db', synchronous='FULL'):
+        self._conn = sqlite3.connect(database_file, isolation_level=None, cached_statements=256)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(_SCHEMA)
+
+    def load_catalog(self, product_factory):
+        return SQLiteCatalog(self._conn, product_factory)
+
+    def load_cart(self):
+        return dict(self._conn.execute("SELECT product_id, quantity FROM cart_items ORDER BY position"))
+
+    def record(self, *ops):
+        if not ops:
+            return
+        execute = self._conn.execute
+        execute("BEGIN")
+        try:
+            for op in ops:
+                kind = op['op']
+                if kind == 'stock':
+                    execute(_UPDATE_STOCK, (op['quantity_available'], op['product_id']))
+                elif kind == 'cart':
+                    if op['quantity'] == 0:
+                        execute(_DELETE_CART, (op['product_id'],))
+                    else:
+                        execute(_UPSERT_CART, (op['product_id'], op['quantity']))
+                elif kind == 'cart_clear':
+                    execute("DELETE FROM cart_items")
+                elif kind == 'product':
+                    execute(_UPSERT_PRODUCT, _product_row(op['product']))
+        except BaseException:
+            execute("ROLLBACK")
+            raise
+        execute("COMMIT")
+
+    def needs_compaction(self):
+        return False
+
+    def save_catalog(self, catalog):
+        self._bulk_write_products(p.to_dict() for p in catalog._loaded.values())
+
+    def save_cart(self, items):
+        self.replace_cart((item.product.show_product_id, item.quantity) for item in items)
+
+    def compact(self, catalog, items):
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self, catalog, items):
+        self.compact(catalog, items)
+        self._conn.close()
+
+    def _bulk_write_products(self, records):
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(_UPSERT_PRODUCT, (_product_row(p) for p in records))
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def replace_cart(self, lines):
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.execute("DELETE FROM cart_items")
+            self._conn.executemany("INSERT INTO cart_items (product_id, quantity, position) VALUES (?, ?, ?)",
+                                   ((pid, qty, n) for n, (pid, qty) in enumerate(lines, 1)))
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def import_json(self, json_storage, product_factory):
+        # Migration: everything JsonStorage would load, including an unreplayed journal tail.
+        catalog = json_storage.load_catalog(product_factory)
+        self._bulk_write_products(record for _, record in catalog.iter_records())
+        self.replace_cart(json_storage.load_cart().items())